@@ -0,0 +1,4 @@
+"""
+Benchmarks for the search, list and stats hot paths
+Run against a local mongod filled by benchmarks/generate_data.py
+"""
@@ -0,0 +1,165 @@
+"""
+Synthetic dataset generator
+Fills a separate database with novels, episodes, mappings, users and contributions
+
+Usage:
+    python -m benchmarks.generate_data --chapters 10000 --users 1000000 --contributions 100000 --drop
+"""
+import sys
+import random
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.settings import settings
+
+BENCH_DATABASE = "tien_nghich_bench"
+BATCH_SIZE = 10000
+
+
+def _insert_batched(collection, documents, label: str):
+    batch = []
+    total = 0
+    for doc in documents:
+        batch.append(doc)
+        if len(batch) >= BATCH_SIZE:
+            collection.insert_many(batch, ordered=False)
+            total += len(batch)
+            batch = []
+            print(f"   {label}: {total}...", end="\r")
+    if batch:
+        collection.insert_many(batch, ordered=False)
+        total += len(batch)
+    print(f"✅ {label}: {total}          ")
+
+
+def _links(rng: random.Random, kind: str, number: int, count: int):
+    from database.models import Link
+    return [
+        Link(source_name=f"Source{i}", url=f"https://example.com/{kind}/{number}/{i}")
+        for i in range(rng.randint(1, count))
+    ]
+
+
+def generate(db, chapters: int, episodes_3d: int, episodes_2d: int, users: int, contributions: int, seed: int):
+    from database.models import Novel, Episode, Mapping, User, Contribution
+    from utils.constants import (
+        CONTRIBUTION_TYPE_MAPPING,
+        CONTRIBUTION_TYPE_NOVEL_LINK,
+        CONTRIBUTION_TYPE_EPISODE_3D_LINK,
+        CONTRIBUTION_TYPE_EPISODE_2D_LINK,
+        STATUS_PENDING,
+        STATUS_APPROVED,
+        STATUS_REJECTED
+    )
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    _insert_batched(db.novels, (
+        Novel(chapter_number=n, title=f"Chương {n}", links=_links(rng, "chapter", n, 3)).to_dict()
+        for n in range(1, chapters + 1)
+    ), "novels")
+
+    _insert_batched(db.episodes_3d, (
+        Episode(episode_number=n, title=f"Tập {n}", links=_links(rng, "3d", n, 3)).to_dict()
+        for n in range(1, episodes_3d + 1)
+    ), "episodes_3d")
+
+    _insert_batched(db.episodes_2d, (
+        Episode(episode_number=n, title=f"Tập {n}", links=_links(rng, "2d", n, 3)).to_dict()
+        for n in range(1, episodes_2d + 1)
+    ), "episodes_2d")
+
+    # One mapping per 3D episode over consecutive chapter ranges,
+    # the first episodes_2d of them also carry a 2D episode
+    per_episode = max(1, chapters // max(1, episodes_3d))
+    _insert_batched(db.mappings, (
+        Mapping(
+            novel_chapters=list(range((n - 1) * per_episode + 1, min(n * per_episode, chapters) + 1)),
+            episode_3d=n,
+            episode_2d=n if n <= episodes_2d else None
+        ).to_dict()
+        for n in range(1, episodes_3d + 1)
+        if (n - 1) * per_episode < chapters
+    ), "mappings")
+
+    first_user_id = 10_000_000
+    _insert_batched(db.users, (
+        User(
+            user_id=first_user_id + i,
+            username=f"user{i}",
+            first_name=f"User {i}",
+            exp=rng.randint(0, 500),
+            last_active_at=now - timedelta(seconds=rng.randint(0, 60 * 86400))
+        ).to_dict()
+        for i in range(users)
+    ), "users")
+
+    contribution_types = [
+        CONTRIBUTION_TYPE_MAPPING,
+        CONTRIBUTION_TYPE_NOVEL_LINK,
+        CONTRIBUTION_TYPE_EPISODE_3D_LINK,
+        CONTRIBUTION_TYPE_EPISODE_2D_LINK
+    ]
+
+    def contribution(i: int):
+        contribution_type = rng.choice(contribution_types)
+        if contribution_type == CONTRIBUTION_TYPE_MAPPING:
+            start = rng.randint(1, max(1, chapters - 5))
+            data = {"novel_chapters": list(range(start, start + 3)), "episode_3d": rng.randint(1, max(1, episodes_3d))}
+        else:
+            data = {
+                "target_number": rng.randint(1, max(1, chapters)),
+                "link": {"source_name": "Bench", "url": f"https://example.com/contribution/{i}"}
+            }
+        status = rng.choices([STATUS_PENDING, STATUS_APPROVED, STATUS_REJECTED], [1, 6, 3])[0]
+        user_index = rng.randrange(max(1, users))
+        return Contribution(
+            user_id=first_user_id + user_index,
+            username=f"user{user_index}",
+            contribution_type=contribution_type,
+            data=data,
+            status=status,
+            submitted_at=now - timedelta(seconds=rng.randint(0, 90 * 86400))
+        ).to_dict()
+
+    _insert_batched(db.contributions, (contribution(i) for i in range(contributions)), "contributions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic benchmark dataset")
+    parser.add_argument("--db", default=BENCH_DATABASE, help="Target database (never the bot's own)")
+    parser.add_argument("--chapters", type=int, default=10000)
+    parser.add_argument("--episodes-3d", type=int, default=700)
+    parser.add_argument("--episodes-2d", type=int, default=300)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--contributions", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--drop", action="store_true", help="Drop the database first")
+    args = parser.parse_args()
+
+    if args.db == settings.MONGODB_DATABASE:
+        print(f"❌ Refusing to generate into the bot database '{args.db}'")
+        sys.exit(1)
+
+    # Must be set before the first connection
+    settings.MONGODB_DATABASE = args.db
+    from database.connection import db_connection
+
+    db = db_connection.get_database()
+    if args.drop:
+        db.client.drop_database(args.db)
+        db_connection.close()
+        db = db_connection.get_database()
+        print(f"🧹 Dropped {args.db}")
+
+    generate(db, args.chapters, args.episodes_3d, args.episodes_2d, args.users, args.contributions, args.seed)
+    print(f"🎉 Dataset ready in {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark harness
+Latency percentiles and Mongo command counts per call
+"""
+import time
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, List
+from pymongo import monitoring
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts Mongo commands sent by every client created after register()"""
+    
+    def __init__(self):
+        self.commands = Counter()
+        self._lock = threading.Lock()
+    
+    def register(self):
+        monitoring.register(self)
+    
+    def reset(self):
+        with self._lock:
+            self.commands = Counter()
+    
+    def snapshot(self) -> Counter:
+        with self._lock:
+            return Counter(self.commands)
+    
+    def started(self, event):
+        with self._lock:
+            self.commands[event.command_name] += 1
+    
+    def succeeded(self, event):
+        pass
+    
+    def failed(self, event):
+        pass
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(p / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_case(
+    fn: Callable[..., Any],
+    args_factory: Callable[[], tuple],
+    counter: CommandCounter,
+    iterations: int,
+    warmup: int
+) -> Dict[str, Any]:
+    """
+    Time fn(*args_factory()) `iterations` times after `warmup` untimed calls
+    Returns latency stats in milliseconds and Mongo commands per call
+    """
+    for _ in range(warmup):
+        fn(*args_factory())
+    
+    latencies = []
+    commands = Counter()
+    for _ in range(iterations):
+        args = args_factory()
+        counter.reset()
+        start = time.perf_counter()
+        fn(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+        commands.update(counter.snapshot())
+    
+    latencies.sort()
+    total_ops = sum(commands.values())
+    return {
+        "iterations": iterations,
+        "mean_ms": sum(latencies) / len(latencies),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": latencies[-1],
+        "mongo_ops_per_call": total_ops / iterations,
+        "mongo_ops_by_command": {name: count / iterations for name, count in sorted(commands.items())}
+    }
@@ -0,0 +1,187 @@
+"""
+Model allocation benchmark
+Memory and time to build models from raw documents, slotted/lazy models vs
+the previous dict-backed ones (eager Link objects, default timestamps)
+
+No database needed: documents are generated in memory, shaped like generate_data.
+
+Usage:
+    python -m benchmarks.model_allocations --count 100000
+"""
+import sys
+import gc
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database.models import Novel, User
+
+
+class DictLink:
+    """Baseline Link: instance __dict__"""
+    
+    def __init__(self, source_name: str, url: str):
+        self.source_name = source_name
+        self.url = url
+
+
+class DictNovel:
+    """Baseline Novel: instance __dict__, links hydrated eagerly, timestamps defaulted"""
+    
+    def __init__(self, chapter_number, title="", links=None, _id=None, created_at=None, updated_at=None):
+        self._id = _id
+        self.chapter_number = chapter_number
+        self.title = title
+        self.links = links or []
+        self.created_at = created_at or datetime.utcnow()
+        self.updated_at = updated_at or datetime.utcnow()
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            _id=data.get("_id"),
+            chapter_number=data.get("chapter_number"),
+            title=data.get("title", ""),
+            links=[DictLink(link.get("source_name", ""), link.get("url", "")) for link in data.get("links", [])],
+            created_at=data.get("created_at"),
+            updated_at=data.get("updated_at")
+        )
+
+
+class DictUser:
+    """Baseline User: instance __dict__, timestamps defaulted"""
+    
+    def __init__(self, user_id, username="", first_name="", last_name="", is_admin=False, exp=0,
+                 _id=None, created_at=None, updated_at=None, last_active_at=None):
+        self._id = _id
+        self.user_id = user_id
+        self.username = username
+        self.first_name = first_name
+        self.last_name = last_name
+        self.is_admin = is_admin
+        self.exp = exp
+        self.created_at = created_at or datetime.utcnow()
+        self.updated_at = updated_at or datetime.utcnow()
+        self.last_active_at = last_active_at or datetime.utcnow()
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            _id=data.get("_id"),
+            user_id=data.get("user_id"),
+            username=data.get("username", ""),
+            first_name=data.get("first_name", ""),
+            last_name=data.get("last_name", ""),
+            is_admin=data.get("is_admin", False),
+            exp=data.get("exp", 0),
+            created_at=data.get("created_at"),
+            updated_at=data.get("updated_at"),
+            last_active_at=data.get("last_active_at")
+        )
+
+
+def novel_docs(count: int, projected: bool):
+    """Chapter documents with 1-3 links; projected ones lack timestamps (catalog-style reads)"""
+    now = datetime.utcnow()
+    docs = []
+    for n in range(1, count + 1):
+        doc = {
+            "chapter_number": n,
+            "title": f"Chương {n}",
+            "links": [
+                {"source_name": f"Source{i}", "url": f"https://example.com/chapter/{n}/{i}"}
+                for i in range(n % 3 + 1)
+            ]
+        }
+        if not projected:
+            doc["created_at"] = now
+            doc["updated_at"] = now
+        docs.append(doc)
+    return docs
+
+
+def user_docs(count: int):
+    """User documents as stored by the bot"""
+    now = datetime.utcnow()
+    return [
+        {
+            "user_id": 100000 + n,
+            "username": f"user{n}",
+            "first_name": "Đạo hữu",
+            "last_name": "",
+            "is_admin": False,
+            "exp": n % 50,
+            "created_at": now,
+            "updated_at": now,
+            "last_active_at": now - timedelta(seconds=n)
+        }
+        for n in range(count)
+    ]
+
+
+def hydrated_novel(doc):
+    """Novel whose links are read, the worst case for lazy hydration"""
+    novel = Novel.from_dict(doc)
+    novel.links
+    return novel
+
+
+def allocated_bytes(build, docs) -> int:
+    """Bytes still held by the models built for every document"""
+    gc.collect()
+    tracemalloc.start()
+    start_bytes = tracemalloc.get_traced_memory()[0]
+    models = [build(doc) for doc in docs]
+    allocated = tracemalloc.get_traced_memory()[0] - start_bytes
+    tracemalloc.stop()
+    del models
+    return allocated
+
+
+def build_seconds(build, docs) -> float:
+    """Time to build a model for every document"""
+    gc.collect()
+    start = time.perf_counter()
+    models = [build(doc) for doc in docs]
+    elapsed = time.perf_counter() - start
+    del models
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare model allocation cost")
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    novels = novel_docs(args.count, projected=False)
+    projected = novel_docs(args.count, projected=True)
+    users = user_docs(args.count)
+
+    cases = [
+        ("novels", DictNovel.from_dict, Novel.from_dict, novels),
+        ("novels.projected", DictNovel.from_dict, Novel.from_dict, projected),
+        ("novels.links_read", DictNovel.from_dict, hydrated_novel, novels),
+        ("users", DictUser.from_dict, User.from_dict, users),
+    ]
+
+    print(f"📦 {args.count} documents per case (time without tracemalloc, memory kept by the models)")
+    for name, baseline, current, docs in cases:
+        base_time = build_seconds(baseline, docs)
+        new_time = build_seconds(current, docs)
+        base_bytes = allocated_bytes(baseline, docs)
+        new_bytes = allocated_bytes(current, docs)
+        print(
+            f"{name:<20} time {base_time * 1000:8.1f} → {new_time * 1000:8.1f} ms "
+            f"({(1 - new_time / base_time) * 100:5.1f}% saved)  "
+            f"memory {base_bytes / 2**20:7.1f} → {new_bytes / 2**20:7.1f} MiB "
+            f"({(1 - new_bytes / base_bytes) * 100:5.1f}% saved)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark runner
+Times the search, list, stats and pending-queue hot paths against a generated dataset
+
+Usage:
+    python -m benchmarks.run_benchmarks --iterations 200
+    python -m benchmarks.run_benchmarks --catalog --output benchmarks/results/catalog.json
+"""
+import sys
+import json
+import random
+import argparse
+import platform
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.settings import settings
+from benchmarks.harness import CommandCounter, run_case
+from benchmarks.generate_data import BENCH_DATABASE
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def _max_number(collection, field: str) -> int:
+    doc = collection.find_one({}, {field: 1}, sort=[(field, -1)])
+    return doc[field] if doc else 1
+
+
+def build_cases(db):
+    """(name, fn, args_factory) for every benchmarked call"""
+    from services import SearchService, AdminService, stats_service
+    from repositories import ContributionRepository
+    from repositories.mapping_repository import LIST_SORT
+    from utils.formatters import format_search_result
+
+    search_service = SearchService()
+    admin_service = AdminService()
+    contribution_repo = ContributionRepository()
+
+    max_chapter = _max_number(db.novels, "chapter_number")
+    max_3d = _max_number(db.episodes_3d, "episode_number")
+    max_2d = _max_number(db.episodes_2d, "episode_number")
+
+    # Key of an item halfway down /list, for a deep keyset page
+    middle = db.mappings.count_documents({}) // 2
+    deep = next(db.mappings.find({}, {"episode_3d": 1, "episode_2d": 1}).sort(LIST_SORT).skip(middle).limit(1), None)
+    deep_key = (deep.get("episode_3d"), deep.get("episode_2d"), deep["_id"]) if deep else None
+
+    rng = random.Random(7)
+    sample_results = [search_service.search_by_chapter(rng.randint(1, max_chapter)) for _ in range(20)]
+
+    def uncached_statistics():
+        stats_service.invalidate()
+        return admin_service.get_statistics()
+    
+    def format_result(result):
+        return format_search_result(
+            result["novels"], result["episodes_3d"], result["episodes_2d"],
+            result["mappings"], result["search_type"], result["search_value"]
+        )
+
+    return [
+        ("search.search_by_chapter", search_service.search_by_chapter, lambda: (rng.randint(1, max_chapter),)),
+        ("search.search_by_episode_3d", search_service.search_by_episode_3d, lambda: (rng.randint(1, max_3d),)),
+        ("search.search_by_episode_2d", search_service.search_by_episode_2d, lambda: (rng.randint(1, max_2d),)),
+        ("search.get_list_page.first", search_service.get_list_page, lambda: (10,)),
+        ("search.get_list_page.deep", search_service.get_list_page, lambda: (10, deep_key)),
+        ("admin.get_statistics", admin_service.get_statistics, lambda: ()),
+        ("admin.get_statistics.uncached", uncached_statistics, lambda: ()),
+        ("contributions.find_pending", contribution_repo.find_pending, lambda: ()),
+        ("contributions.find_pending_page", contribution_repo.find_pending_page, lambda: (11,)),
+        ("formatters.format_search_result", format_result, lambda: (rng.choice(sample_results),)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument("--db", default=BENCH_DATABASE)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--catalog", action="store_true", help="Serve lookups from the in-memory catalog")
+    parser.add_argument("--query-mode", choices=["default", "aggregate"], default=settings.SEARCH_QUERY_MODE)
+    parser.add_argument("--only", help="Run only cases whose name contains this text")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<timestamp>.json)")
+    args = parser.parse_args()
+
+    # Must be set before the first connection
+    settings.MONGODB_DATABASE = args.db
+    settings.CATALOG_CACHE_ENABLED = args.catalog
+    settings.SEARCH_QUERY_MODE = args.query_mode
+
+    counter = CommandCounter()
+    counter.register()
+
+    from database.connection import db_connection
+    from services import catalog_service
+
+    db = db_connection.get_database()
+    if args.catalog:
+        catalog_service.load()
+
+    dataset = {name: db[name].estimated_document_count() for name in sorted(db.list_collection_names())}
+    print(f"📦 Dataset {args.db}: {dataset}")
+
+    results = {}
+    for name, fn, args_factory in build_cases(db):
+        if args.only and args.only not in name:
+            continue
+        stats = run_case(fn, args_factory, counter, args.iterations, args.warmup)
+        results[name] = stats
+        print(
+            f"{name:<36} p50 {stats['p50_ms']:8.2f} ms  p95 {stats['p95_ms']:8.2f} ms  "
+            f"p99 {stats['p99_ms']:8.2f} ms  ops {stats['mongo_ops_per_call']:5.1f}"
+        )
+
+    report = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "database": args.db,
+        "settings": {
+            "catalog_cache": args.catalog,
+            "search_query_mode": args.query_mode,
+            "iterations": args.iterations,
+            "warmup": args.warmup
+        },
+        "dataset": dataset,
+        "results": results
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.utcnow():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"📁 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,57 @@ class Settings:
     MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
     MONGODB_DATABASE = os.getenv('MONGODB_DATABASE', 'tien_nghich_bot')
     
+    # Update Delivery: "polling" (one long-poll loop) or "webhook" (HTTP endpoint + worker processes)
+    BOT_MODE = os.getenv('BOT_MODE', 'polling').lower()
+    WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')
+    WEBHOOK_LISTEN = os.getenv('WEBHOOK_LISTEN', '0.0.0.0')
+    WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', '8443'))
+    WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/telegram')
+    WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', '')
+    WEBHOOK_WORKERS = int(os.getenv('WEBHOOK_WORKERS', str(os.cpu_count() or 1)))
+    
+    # Catalog Cache Configuration
+    CATALOG_CACHE_ENABLED = os.getenv('CATALOG_CACHE_ENABLED', 'false').lower() == 'true'
+    CATALOG_VERSION_CHECK_INTERVAL = int(os.getenv('CATALOG_VERSION_CHECK_INTERVAL', '30'))
+    
+    # Search Query Mode: "default" (one query per relation) or "aggregate" (single $lookup pipeline)
+    SEARCH_QUERY_MODE = os.getenv('SEARCH_QUERY_MODE', 'default').lower()
+    
+    # Rendered Response Cache Configuration
+    RENDER_CACHE_SIZE = int(os.getenv('RENDER_CACHE_SIZE', '1000'))
+    
+    # Inline Mode (@bot query): results per answer, cached queries, Telegram-side cache (seconds)
+    INLINE_RESULTS_LIMIT = int(os.getenv('INLINE_RESULTS_LIMIT', '20'))
+    INLINE_CACHE_SIZE = int(os.getenv('INLINE_CACHE_SIZE', '2000'))
+    INLINE_CACHE_TIME = int(os.getenv('INLINE_CACHE_TIME', '300'))
+    
+    # User Activity Tracking (write-behind buffer)
+    ACTIVITY_THROTTLE_SECONDS = int(os.getenv('ACTIVITY_THROTTLE_SECONDS', '60'))
+    ACTIVITY_FLUSH_INTERVAL = int(os.getenv('ACTIVITY_FLUSH_INTERVAL', '5'))
+    
+    # Persist user_data and conversation states in MongoDB (seconds between write rounds)
+    PERSISTENCE_ENABLED = os.getenv('PERSISTENCE_ENABLED', 'true').lower() == 'true'
+    PERSISTENCE_UPDATE_INTERVAL = float(os.getenv('PERSISTENCE_UPDATE_INTERVAL', '5'))
+    # Seconds before a user's stored user_data is checked again for writes by other processes
+    PERSISTENCE_REFRESH_INTERVAL = float(os.getenv('PERSISTENCE_REFRESH_INTERVAL', '5'))
+    
+    # Statistics: cache TTL and full recount interval of the materialized counters (seconds)
+    STATS_CACHE_TTL = int(os.getenv('STATS_CACHE_TTL', '30'))
+    STATS_REBUILD_INTERVAL = int(os.getenv('STATS_REBUILD_INTERVAL', '3600'))
+    
+    # Admin Set Refresh Interval (seconds)
+    ADMIN_REFRESH_INTERVAL = int(os.getenv('ADMIN_REFRESH_INTERVAL', '300'))
+    
+    # Broadcast Configuration (Telegram allows ~30 messages/second per bot)
+    BROADCAST_RATE_LIMIT = float(os.getenv('BROADCAST_RATE_LIMIT', '25'))
+    BROADCAST_CONCURRENCY = int(os.getenv('BROADCAST_CONCURRENCY', '10'))
+    BROADCAST_BATCH_SIZE = int(os.getenv('BROADCAST_BATCH_SIZE', '100'))
+    BROADCAST_PROGRESS_INTERVAL = int(os.getenv('BROADCAST_PROGRESS_INTERVAL', '3'))
+    
+    # Prometheus metrics endpoint (0 = disabled)
+    METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+    METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+    
     @classmethod
     def validate(cls):
         """Validate required settings"""
@@ -31,6 +82,15 @@ class Settings:
         if cls.ADMIN_ID == 0:
             raise ValueError("ADMIN_ID is required in .env file")
         
+        if cls.BOT_MODE not in ("polling", "webhook"):
+            raise ValueError("BOT_MODE must be 'polling' or 'webhook'")
+        
+        if cls.WEBHOOK_WORKERS < 1:
+            raise ValueError("WEBHOOK_WORKERS must be at least 1")
+        
+        if not 1 <= cls.INLINE_RESULTS_LIMIT <= 50:
+            raise ValueError("INLINE_RESULTS_LIMIT must be between 1 and 50")
+        
         return True
 
 
@@ -5,6 +5,7 @@ Provides singleton connection to MongoDB
 from pymongo import MongoClient
 from pymongo.database import Database
 from config.settings import settings
+from utils.metrics import mongo_listener
 
 
 class DatabaseConnection:
@@ -26,7 +27,7 @@ class DatabaseConnection:
         """
         if self._client is None:
             try:
-                self._client = MongoClient(settings.MONGODB_URI)
+                self._client = MongoClient(settings.MONGODB_URI, event_listeners=[mongo_listener])
                 self._db = self._client[settings.MONGODB_DATABASE]
                 
                 # Test connection
@@ -56,19 +57,50 @@ class DatabaseConnection:
             self._db.episodes_2d.create_index("episode_number", unique=True)
             
             # Mappings indexes
-            self._db.mappings.create_index("novel_chapters")
+            self._db.mappings.create_index([("chapter_start", 1), ("chapter_end", 1)])
             self._db.mappings.create_index("episode_3d")
             self._db.mappings.create_index("episode_2d")
+            self._db.mappings.create_index([("episode_3d", -1), ("episode_2d", -1), ("_id", -1)])
             
             # Contributions indexes
-            self._db.contributions.create_index("status")
+            self._db.contributions.create_index([("status", 1), ("submitted_at", -1), ("_id", -1)])
+            # One pending contribution per content fingerprint (duplicates merge into it)
+            self._db.contributions.create_index(
+                "fingerprint",
+                unique=True,
+                partialFilterExpression={"status": "pending", "fingerprint": {"$exists": True}}
+            )
             self._db.contributions.create_index("user_id")
             self._db.contributions.create_index([("submitted_at", -1)])
             
+            # Users indexes
+            self._db.users.create_index("user_id")
+            self._db.users.create_index([("last_active_at", -1)])
+            
+            # Broadcast jobs indexes
+            self._db.broadcast_jobs.create_index("status")
+            
+            # Bot persistence indexes
+            self._db.bot_persistence.create_index("kind")
+            
             print("✅ Database indexes created successfully")
             
         except Exception as e:
             print(f"⚠️  Warning: Error creating indexes: {e}")
+        
+        try:
+            # One mapping per 3D / 2D episode, so concurrent upserts can't insert twice
+            # (missing episodes are stored as null and stay out of the index)
+            for field in ("episode_3d", "episode_2d"):
+                self._db.mappings.create_index(
+                    field,
+                    name=f"{field}_unique",
+                    unique=True,
+                    partialFilterExpression={field: {"$type": "number"}}
+                )
+        except Exception as e:
+            # Fails while older duplicate mappings for an episode remain, merge them first
+            print(f"⚠️  Warning: Error creating unique mapping indexes: {e}")
     
     def get_database(self) -> Database:
         """Get database instance"""
@@ -1,14 +1,21 @@
 """
 Data models and schemas
 Defines the structure of data objects
+
+Models use __slots__ and from_dict skips __init__: bulk reads (catalog load,
+broadcast user lists) build no instance dicts, no default timestamps and no
+Link objects until the links are actually read.
 """
 from datetime import datetime
 from typing import List, Optional, Dict, Any
+from utils.validators import normalize_url
 
 
 class Link:
     """Link model for storing URLs with source names"""
     
+    __slots__ = ("source_name", "url")
+    
     def __init__(self, source_name: str, url: str):
         self.source_name = source_name
         self.url = url
@@ -16,7 +23,9 @@ class Link:
     def to_dict(self) -> Dict[str, str]:
         return {
             "source_name": self.source_name,
-            "url": self.url
+            "url": self.url,
+            # Normalized URL, lets writes skip duplicates atomically
+            "url_key": normalize_url(self.url)
         }
     
     @classmethod
@@ -27,9 +36,36 @@ class Link:
         )
 
 
-class Novel:
+class LinkedModel:
+    """Base for documents with a links array, hydrated into Link objects on first read"""
+    
+    __slots__ = ("_links", "_raw_links")
+    
+    @property
+    def links(self) -> List[Link]:
+        links = self._links
+        if links is None:
+            raw_links = self._raw_links
+            if raw_links is None:
+                # A concurrent first read hydrated them in between
+                return self._links
+            links = [Link.from_dict(link) for link in raw_links]
+            self._links = links
+            # Set after _links, so readers that find it cleared see the list
+            self._raw_links = None
+        return links
+    
+    @links.setter
+    def links(self, links: List[Link]):
+        self._links = links
+        self._raw_links = None
+
+
+class Novel(LinkedModel):
     """Novel chapter model"""
     
+    __slots__ = ("_id", "chapter_number", "title", "created_at", "updated_at")
+    
     def __init__(
         self,
         chapter_number: int,
@@ -42,9 +78,11 @@ class Novel:
         self._id = _id
         self.chapter_number = chapter_number
         self.title = title
-        self.links = links or []
-        self.created_at = created_at or datetime.utcnow()
-        self.updated_at = updated_at or datetime.utcnow()
+        self._raw_links = None
+        self._links = links or []
+        now = None if created_at and updated_at else datetime.utcnow()
+        self.created_at = created_at or now
+        self.updated_at = updated_at or now
     
     def to_dict(self) -> Dict[str, Any]:
         data = {
@@ -60,19 +98,22 @@ class Novel:
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Novel':
-        return cls(
-            _id=data.get("_id"),
-            chapter_number=data.get("chapter_number"),
-            title=data.get("title", ""),
-            links=[Link.from_dict(link) for link in data.get("links", [])],
-            created_at=data.get("created_at"),
-            updated_at=data.get("updated_at")
-        )
+        novel = cls.__new__(cls)
+        novel._id = data.get("_id")
+        novel.chapter_number = data.get("chapter_number")
+        novel.title = data.get("title", "")
+        novel._raw_links = data.get("links", [])
+        novel._links = None
+        novel.created_at = data.get("created_at")
+        novel.updated_at = data.get("updated_at")
+        return novel
 
 
-class Episode:
+class Episode(LinkedModel):
     """Episode model (for both 3D and 2D)"""
     
+    __slots__ = ("_id", "episode_number", "title", "created_at", "updated_at")
+    
     def __init__(
         self,
         episode_number: int,
@@ -85,9 +126,11 @@ class Episode:
         self._id = _id
         self.episode_number = episode_number
         self.title = title
-        self.links = links or []
-        self.created_at = created_at or datetime.utcnow()
-        self.updated_at = updated_at or datetime.utcnow()
+        self._raw_links = None
+        self._links = links or []
+        now = None if created_at and updated_at else datetime.utcnow()
+        self.created_at = created_at or now
+        self.updated_at = updated_at or now
     
     def to_dict(self) -> Dict[str, Any]:
         data = {
@@ -103,18 +146,30 @@ class Episode:
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Episode':
-        return cls(
-            _id=data.get("_id"),
-            episode_number=data.get("episode_number"),
-            title=data.get("title", ""),
-            links=[Link.from_dict(link) for link in data.get("links", [])],
-            created_at=data.get("created_at"),
-            updated_at=data.get("updated_at")
-        )
+        episode = cls.__new__(cls)
+        episode._id = data.get("_id")
+        episode.episode_number = data.get("episode_number")
+        episode.title = data.get("title", "")
+        episode._raw_links = data.get("links", [])
+        episode._links = None
+        episode.created_at = data.get("created_at")
+        episode.updated_at = data.get("updated_at")
+        return episode
 
 
 class Mapping:
-    """Mapping between novel chapters and episodes"""
+    """
+    Mapping between novel chapters and episodes
+    
+    Stored as a compact [chapter_start, chapter_end] range. The explicit
+    novel_chapters list is only persisted when the chapters have gaps; for
+    plain ranges it is built on first read (formatting, applying a contribution).
+    """
+    
+    __slots__ = (
+        "_id", "_novel_chapters", "chapter_start", "chapter_end",
+        "episode_3d", "episode_2d", "created_at", "updated_at"
+    )
     
     def __init__(
         self,
@@ -129,36 +184,83 @@ class Mapping:
         self.novel_chapters = novel_chapters
         self.episode_3d = episode_3d
         self.episode_2d = episode_2d
-        self.created_at = created_at or datetime.utcnow()
-        self.updated_at = updated_at or datetime.utcnow()
+        now = None if created_at and updated_at else datetime.utcnow()
+        self.created_at = created_at or now
+        self.updated_at = updated_at or now
+    
+    @property
+    def novel_chapters(self) -> List[int]:
+        chapters = self._novel_chapters
+        if chapters is None:
+            if self.chapter_start is None:
+                chapters = []
+            else:
+                chapters = list(range(self.chapter_start, self.chapter_end + 1))
+            self._novel_chapters = chapters
+        return chapters
+    
+    @novel_chapters.setter
+    def novel_chapters(self, novel_chapters: List[int]):
+        self._novel_chapters = novel_chapters
+        self.chapter_start = min(novel_chapters) if novel_chapters else None
+        self.chapter_end = max(novel_chapters) if novel_chapters else None
+    
+    def is_contiguous(self) -> bool:
+        """True when the chapters are exactly chapter_start..chapter_end"""
+        if not self._novel_chapters:
+            return True
+        return len(set(self._novel_chapters)) == self.chapter_end - self.chapter_start + 1
+    
+    def covers(self, chapter_number: int) -> bool:
+        """Check if the mapping includes a chapter"""
+        if self.chapter_start is None:
+            return False
+        if self.is_contiguous():
+            return self.chapter_start <= chapter_number <= self.chapter_end
+        return chapter_number in self._novel_chapters
     
     def to_dict(self) -> Dict[str, Any]:
         data = {
-            "novel_chapters": self.novel_chapters,
+            "chapter_start": self.chapter_start,
+            "chapter_end": self.chapter_end,
             "episode_3d": self.episode_3d,
             "episode_2d": self.episode_2d,
             "created_at": self.created_at,
             "updated_at": self.updated_at
         }
+        if not self.is_contiguous():
+            data["novel_chapters"] = self._novel_chapters
         if self._id:
             data["_id"] = self._id
         return data
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Mapping':
-        return cls(
-            _id=data.get("_id"),
-            novel_chapters=data.get("novel_chapters", []),
-            episode_3d=data.get("episode_3d"),
-            episode_2d=data.get("episode_2d"),
-            created_at=data.get("created_at"),
-            updated_at=data.get("updated_at")
-        )
+        mapping = cls.__new__(cls)
+        mapping._id = data.get("_id")
+        novel_chapters = data.get("novel_chapters")
+        if novel_chapters is not None and data.get("chapter_start") is None:
+            # Expanded list written before the range fields existed
+            mapping.novel_chapters = novel_chapters
+        else:
+            mapping._novel_chapters = novel_chapters
+            mapping.chapter_start = data.get("chapter_start")
+            mapping.chapter_end = data.get("chapter_end")
+        mapping.episode_3d = data.get("episode_3d")
+        mapping.episode_2d = data.get("episode_2d")
+        mapping.created_at = data.get("created_at")
+        mapping.updated_at = data.get("updated_at")
+        return mapping
 
 
 class Contribution:
     """User contribution model"""
     
+    __slots__ = (
+        "_id", "user_id", "username", "contribution_type", "data", "status", "admin_note",
+        "submitted_at", "reviewed_at", "reviewed_by", "fingerprint", "submitters"
+    )
+    
     def __init__(
         self,
         user_id: int,
@@ -170,7 +272,9 @@ class Contribution:
         _id: Optional[Any] = None,
         submitted_at: Optional[datetime] = None,
         reviewed_at: Optional[datetime] = None,
-        reviewed_by: Optional[int] = None
+        reviewed_by: Optional[int] = None,
+        fingerprint: Optional[str] = None,
+        submitters: Optional[List[int]] = None
     ):
         self._id = _id
         self.user_id = user_id
@@ -182,6 +286,9 @@ class Contribution:
         self.submitted_at = submitted_at or datetime.utcnow()
         self.reviewed_at = reviewed_at
         self.reviewed_by = reviewed_by
+        # Content hash shared by duplicate submissions, and everyone who sent it
+        self.fingerprint = fingerprint
+        self.submitters = submitters or [user_id]
     
     def to_dict(self) -> Dict[str, Any]:
         data = {
@@ -193,31 +300,41 @@ class Contribution:
             "admin_note": self.admin_note,
             "submitted_at": self.submitted_at,
             "reviewed_at": self.reviewed_at,
-            "reviewed_by": self.reviewed_by
+            "reviewed_by": self.reviewed_by,
+            "submitters": self.submitters
         }
+        if self.fingerprint:
+            data["fingerprint"] = self.fingerprint
         if self._id:
             data["_id"] = self._id
         return data
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Contribution':
-        return cls(
-            _id=data.get("_id"),
-            user_id=data.get("user_id"),
-            username=data.get("username", ""),
-            contribution_type=data.get("contribution_type"),
-            data=data.get("data", {}),
-            status=data.get("status", "pending"),
-            admin_note=data.get("admin_note", ""),
-            submitted_at=data.get("submitted_at"),
-            reviewed_at=data.get("reviewed_at"),
-            reviewed_by=data.get("reviewed_by")
-        )
+        contribution = cls.__new__(cls)
+        contribution._id = data.get("_id")
+        contribution.user_id = data.get("user_id")
+        contribution.username = data.get("username", "")
+        contribution.contribution_type = data.get("contribution_type")
+        contribution.data = data.get("data", {})
+        contribution.status = data.get("status", "pending")
+        contribution.admin_note = data.get("admin_note", "")
+        contribution.submitted_at = data.get("submitted_at")
+        contribution.reviewed_at = data.get("reviewed_at")
+        contribution.reviewed_by = data.get("reviewed_by")
+        contribution.fingerprint = data.get("fingerprint")
+        contribution.submitters = data.get("submitters") or [contribution.user_id]
+        return contribution
 
 
 class User:
     """User model"""
     
+    __slots__ = (
+        "_id", "user_id", "username", "first_name", "last_name", "is_admin", "exp",
+        "created_at", "updated_at", "last_active_at"
+    )
+    
     def __init__(
         self,
         user_id: int,
@@ -238,9 +355,10 @@ class User:
         self.last_name = last_name
         self.is_admin = is_admin
         self.exp = exp
-        self.created_at = created_at or datetime.utcnow()
-        self.updated_at = updated_at or datetime.utcnow()
-        self.last_active_at = last_active_at or datetime.utcnow()
+        now = None if created_at and updated_at and last_active_at else datetime.utcnow()
+        self.created_at = created_at or now
+        self.updated_at = updated_at or now
+        self.last_active_at = last_active_at or now
     
     def to_dict(self) -> Dict[str, Any]:
         data = {
@@ -260,16 +378,96 @@ class User:
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'User':
+        user = cls.__new__(cls)
+        user._id = data.get("_id")
+        user.user_id = data.get("user_id")
+        user.username = data.get("username", "")
+        user.first_name = data.get("first_name", "")
+        user.last_name = data.get("last_name", "")
+        user.is_admin = data.get("is_admin", False)
+        user.exp = data.get("exp", 0)
+        user.created_at = data.get("created_at")
+        user.updated_at = data.get("updated_at")
+        user.last_active_at = data.get("last_active_at")
+        return user
+
+
+class BroadcastJob:
+    """Broadcast job with its resume checkpoint"""
+    
+    __slots__ = (
+        "_id", "text", "admin_chat_id", "status", "last_user_id", "sent_count", "failed_count",
+        "blocked_count", "total", "status_message_id", "created_at", "updated_at", "finished_at"
+    )
+    
+    def __init__(
+        self,
+        text: str,
+        admin_chat_id: int,
+        status: str = "running",
+        last_user_id: Optional[int] = None,
+        sent_count: int = 0,
+        failed_count: int = 0,
+        blocked_count: int = 0,
+        total: int = 0,
+        status_message_id: Optional[int] = None,
+        _id: Optional[Any] = None,
+        created_at: Optional[datetime] = None,
+        updated_at: Optional[datetime] = None,
+        finished_at: Optional[datetime] = None
+    ):
+        self._id = _id
+        self.text = text
+        self.admin_chat_id = admin_chat_id
+        self.status = status
+        self.last_user_id = last_user_id
+        self.sent_count = sent_count
+        self.failed_count = failed_count
+        self.blocked_count = blocked_count
+        self.total = total
+        self.status_message_id = status_message_id
+        now = None if created_at and updated_at else datetime.utcnow()
+        self.created_at = created_at or now
+        self.updated_at = updated_at or now
+        self.finished_at = finished_at
+    
+    @property
+    def processed_count(self) -> int:
+        return self.sent_count + self.failed_count + self.blocked_count
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "text": self.text,
+            "admin_chat_id": self.admin_chat_id,
+            "status": self.status,
+            "last_user_id": self.last_user_id,
+            "sent_count": self.sent_count,
+            "failed_count": self.failed_count,
+            "blocked_count": self.blocked_count,
+            "total": self.total,
+            "status_message_id": self.status_message_id,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "finished_at": self.finished_at
+        }
+        if self._id:
+            data["_id"] = self._id
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BroadcastJob':
         return cls(
             _id=data.get("_id"),
-            user_id=data.get("user_id"),
-            username=data.get("username", ""),
-            first_name=data.get("first_name", ""),
-            last_name=data.get("last_name", ""),
-            is_admin=data.get("is_admin", False),
-            exp=data.get("exp", 0),
+            text=data.get("text", ""),
+            admin_chat_id=data.get("admin_chat_id"),
+            status=data.get("status", "running"),
+            last_user_id=data.get("last_user_id"),
+            sent_count=data.get("sent_count", 0),
+            failed_count=data.get("failed_count", 0),
+            blocked_count=data.get("blocked_count", 0),
+            total=data.get("total", 0),
+            status_message_id=data.get("status_message_id"),
             created_at=data.get("created_at"),
             updated_at=data.get("updated_at"),
-            last_active_at=data.get("last_active_at")
+            finished_at=data.get("finished_at")
         )
-
@@ -9,12 +9,18 @@ from .search_handler import (
     handle_list_callback
 )
 from .contribute_handler import contribution_conv_handler
+from .inline_handler import inline_query_handler
 from .admin_handler import (
     admin_stats_command,
+    admin_metrics_command,
     admin_pending_command,
     admin_review_command,
     admin_approve_command,
     admin_reject_command,
+    admin_approve_user_command,
+    admin_approve_ids_command,
+    admin_reject_ids_command,
+    admin_reject_duplicates_command,
     admin_help_command,
     handle_admin_callback,
     admin_dashboard_command,
@@ -34,12 +40,18 @@ __all__ = [
     'handle_search_callback',
     'list_command',
     'handle_list_callback',
+    'inline_query_handler',
     'contribution_conv_handler',
     'admin_stats_command',
+    'admin_metrics_command',
     'admin_pending_command',
     'admin_review_command',
     'admin_approve_command',
     'admin_reject_command',
+    'admin_approve_user_command',
+    'admin_approve_ids_command',
+    'admin_reject_ids_command',
+    'admin_reject_duplicates_command',
     'admin_help_command',
     'handle_admin_callback',
     'admin_dashboard_command',
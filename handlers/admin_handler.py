@@ -2,11 +2,23 @@
 Admin handler
 Handles admin commands for reviewing contributions
 """
+from collections import Counter
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, filters, ConversationHandler, CommandHandler, CallbackQueryHandler, MessageHandler
-from services import ContributionService, AdminService, UserService
-from utils.formatters import format_contribution_for_admin, format_contribution_list
+from services import ContributionService, AdminService, UserService, broadcast_service, permission_service
+from services.contribution_service import encode_pending_cursor, decode_pending_cursor
+from utils.formatters import (
+    format_contribution_for_admin,
+    format_contribution_list,
+    format_metrics,
+    format_statistics,
+    format_bulk_review_result,
+    format_review_notification
+)
 from utils.constants import *
+from utils.async_utils import run_blocking
+from utils.render_cache import render_cache
+from utils.metrics import metrics
 from config.settings import settings
 
 
@@ -14,6 +26,9 @@ contribution_service = ContributionService()
 admin_service = AdminService()
 user_service = UserService()
 
+# Review queue page size
+PENDING_PAGE_SIZE = 10
+
 # Conversation states
 BROADCAST_ASK_CONTENT = 0
 BROADCAST_CONFIRM = 1
@@ -46,10 +61,16 @@ async def admin_dashboard_command(update: Update, context: ContextTypes.DEFAULT_
 
 
 def is_admin(user_id: int) -> bool:
-    """Check if user is admin"""
+    """Check if user is admin (in-memory admin set, no I/O)"""
     return user_service.is_admin(user_id)
 
 
+async def refresh_admin_set():
+    """Reload the admin set when another worker added or removed an admin (throttled)"""
+    if permission_service.check_due():
+        await run_blocking(permission_service.ensure_fresh)
+
+
 async def admin_check(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
     """
     Check if user is admin and reply if not
@@ -58,6 +79,7 @@ async def admin_check(update: Update, context: ContextTypes.DEFAULT_TYPE) -> boo
     if not update.effective_user:
         return False
         
+    await refresh_admin_set()
     if not is_admin(update.effective_user.id):
         # Silent ignore or reply? Silent is better for security
         return False
@@ -84,12 +106,12 @@ async def add_admin_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         new_admin_id = int(context.args[0])
         
         # Verify user exists (optional, but good)
-        user = user_service.user_repo.get_by_id(new_admin_id)
+        user = await admin_service.async_user_repo.get_by_id(new_admin_id, ["username"])
         if not user:
              await update.message.reply_text(f"{EMOJI_WARNING} User ID {new_admin_id} chưa từng tương tác với bot. Họ cần start bot trước.")
              return
 
-        if user_service.set_admin_status(new_admin_id, True):
+        if await run_blocking(user_service.set_admin_status, new_admin_id, True):
              await update.message.reply_text(f"{EMOJI_CHECK} Đã thêm user `{new_admin_id}` ({user.username}) làm Admin.", parse_mode='Markdown')
         else:
              await update.message.reply_text(f"{EMOJI_CROSS} Tâm ma quấy nhiễu khi thêm hộ pháp.")
@@ -120,7 +142,7 @@ async def remove_admin_command(update: Update, context: ContextTypes.DEFAULT_TYP
             await update.message.reply_text(f"{EMOJI_CROSS} Không thể xóa Super Admin.")
             return
             
-        if user_service.set_admin_status(target_id, False):
+        if await run_blocking(user_service.set_admin_status, target_id, False):
              await update.message.reply_text(f"{EMOJI_CHECK} Đã xóa quyền Admin của user `{target_id}`.", parse_mode='Markdown')
         else:
              await update.message.reply_text(f"{EMOJI_CROSS} Tâm ma quấy nhiễu khi xóa hộ pháp.")
@@ -139,35 +161,8 @@ async def admin_stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         return
     
     try:
-        stats = admin_service.get_statistics()
-        
-        top_users = stats.get('top_contributors', [])
-        leaderboard_text = ""
-        if top_users:
-            leaderboard_text = "\n🏆 **TOP ĐÓNG GÓP:**\n"
-            for i, user in enumerate(top_users, 1):
-                # Retrieve user exp
-                user_obj = admin_service.user_repo.get_by_id(user.get('_id'))
-                exp = user_obj.exp if user_obj else 0
-                leaderboard_text += f"{i}. {user.get('username', 'Unknown')} - {user.get('count', 0)} lần ({exp} EXP)\n"
-        
-        message = f"""
-{EMOJI_ADMIN} **THỐNG KÊ HỆ THỐNG**
-
-📊 **Dữ liệu:**
-{EMOJI_BOOK} **Tiểu thuyết:** {stats.get('total_novels', 0)} chương
-{EMOJI_FILM_3D} **Phim 3D:** {stats.get('total_episodes_3d', 0)} tập
-{EMOJI_FILM_2D} **Phim 2D:** {stats.get('total_episodes_2d', 0)} tập
-{EMOJI_LINK} **Mappings:** {stats.get('total_mappings', 0)} liên kết
-{EMOJI_PENDING} **Đóng góp chờ duyệt:** {stats.get('pending_contributions', 0)}
-
-👥 **Người dùng:**
-• Tổng số: {stats.get('total_users', 0)}
-• Hôm nay: {stats.get('active_today', 0)}
-• 7 ngày qua: {stats.get('active_week', 0)}
-• 30 ngày qua: {stats.get('active_month', 0)}
-{leaderboard_text}
-"""
+        stats = await admin_service.get_statistics_async()
+        message = format_statistics(stats, render_cache.stats())
         
         await update.message.reply_text(
             message,
@@ -181,40 +176,24 @@ async def admin_stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         )
 
 
+async def admin_metrics_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /metrics command - Show handler latency and Mongo query metrics"""
+    if not await admin_check(update, context):
+        return
+    
+    await update.message.reply_text(
+        format_metrics(metrics.snapshot()),
+        parse_mode='Markdown'
+    )
+
+
 async def admin_pending_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /pending command - List pending contributions"""
     if not await admin_check(update, context):
         return
     
     try:
-        contributions = contribution_service.get_pending_contributions()
-        
-        message = format_contribution_list(contributions)
-        
-        # Create buttons for list
-        keyboard = []
-        if contributions:
-            # Chunk or limits? Let's show all for now, assuming logic handles formatting
-            for i, contrib in enumerate(contributions, 1):
-                row = [
-                    InlineKeyboardButton(f"✅ #{i}", callback_data=f"approvelist_{contrib._id}"),
-                    InlineKeyboardButton(f"❌ #{i}", callback_data=f"rejectlist_{contrib._id}")
-                ]
-                keyboard.append(row)
-        
-        # Add refresh/close buttons
-        keyboard.append([
-            InlineKeyboardButton("🔄 Làm mới", callback_data="admin_pending"),
-            InlineKeyboardButton("❌ Đóng", callback_data="admin_close")
-        ])
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(
-            message,
-            parse_mode='Markdown',
-            reply_markup=reply_markup
-        )
+        await show_pending_page(update, context)
         
     except Exception as e:
         print(f"Error in admin_pending_command: {e}")
@@ -223,6 +202,88 @@ async def admin_pending_command(update: Update, context: ContextTypes.DEFAULT_TY
         )
 
 
+async def show_pending_page(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    page: int = 0,
+    after: str = None,
+    before: str = None,
+    is_callback: bool = False,
+    notice: str = ""
+):
+    """
+    Show one page of the review queue
+    Pages are read by keyset cursors carried in the nav buttons; the current
+    view is kept in user_data so approve/reject re-reads only this page.
+    """
+    result = await run_blocking(
+        contribution_service.get_pending_page,
+        PENDING_PAGE_SIZE,
+        decode_pending_cursor(after) if after else None,
+        decode_pending_cursor(before) if before else None
+    )
+    contributions = result["items"]
+    
+    # Page emptied by approvals (or stale cursor): start over
+    if not contributions and page > 0:
+        return await show_pending_page(update, context, is_callback=is_callback, notice=notice)
+    
+    if before:
+        has_prev, has_next = result["has_more"] or page > 0, True
+    else:
+        has_prev, has_next = page > 0, result["has_more"]
+    
+    context.user_data['pending_view'] = {"page": page, "after": after, "before": before}
+    
+    total = await admin_service.get_pending_count_async()
+    total_pages = max(1, -(-total // PENDING_PAGE_SIZE))
+    start = page * PENDING_PAGE_SIZE + 1
+    message = format_contribution_list(contributions, total, start, page, total_pages)
+    if notice:
+        message = f"{notice}\n\n{message}"
+    
+    keyboard = []
+    for i, contrib in enumerate(contributions, start):
+        keyboard.append([
+            InlineKeyboardButton(f"✅ #{i}", callback_data=f"approvelist_{contrib._id}"),
+            InlineKeyboardButton(f"❌ #{i}", callback_data=f"rejectlist_{contrib._id}")
+        ])
+    
+    nav_row = []
+    if has_prev and contributions:
+        cursor = encode_pending_cursor(contributions[0])
+        nav_row.append(InlineKeyboardButton("⬅️ Trước", callback_data=f"admin_pending_p_{page - 1}_{cursor}"))
+    if has_next and contributions:
+        cursor = encode_pending_cursor(contributions[-1])
+        nav_row.append(InlineKeyboardButton("Sau ➡️", callback_data=f"admin_pending_n_{page + 1}_{cursor}"))
+    if nav_row:
+        keyboard.append(nav_row)
+    
+    keyboard.append([
+        InlineKeyboardButton("🔄 Làm mới", callback_data="admin_pending"),
+        InlineKeyboardButton("❌ Đóng", callback_data="admin_close")
+    ])
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    
+    if is_callback:
+        await update.callback_query.edit_message_text(message, parse_mode='Markdown', reply_markup=reply_markup)
+    else:
+        await update.message.reply_text(message, parse_mode='Markdown', reply_markup=reply_markup)
+
+
+async def show_current_pending_page(update: Update, context: ContextTypes.DEFAULT_TYPE, notice: str = ""):
+    """Re-read the review queue page the admin is looking at"""
+    view = context.user_data.get('pending_view') or {}
+    await show_pending_page(
+        update, context,
+        view.get("page", 0),
+        after=view.get("after"),
+        before=view.get("before"),
+        is_callback=True,
+        notice=notice
+    )
+
+
 async def admin_review_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /review_<id> command - Review a specific contribution"""
     if not await admin_check(update, context):
@@ -238,7 +299,7 @@ async def admin_review_command(update: Update, context: ContextTypes.DEFAULT_TYP
             return
         
         contribution_id = context.args[0]
-        contribution = contribution_service.get_contribution_by_id(contribution_id)
+        contribution = await run_blocking(contribution_service.get_contribution_by_id, contribution_id)
         
         if not contribution:
             await update.message.reply_text(
@@ -290,7 +351,7 @@ async def admin_approve_command(update: Update, context: ContextTypes.DEFAULT_TY
         contribution_id = context.args[0]
         
         # Get contribution details first
-        contribution = contribution_service.get_contribution_by_id(contribution_id)
+        contribution = await run_blocking(contribution_service.get_contribution_by_id, contribution_id)
         if not contribution:
             await update.message.reply_text(
                 f"{EMOJI_CROSS} Không tìm thấy đóng góp với ID: `{contribution_id}`",
@@ -299,7 +360,8 @@ async def admin_approve_command(update: Update, context: ContextTypes.DEFAULT_TY
             return
         
         # Approve
-        success, message = contribution_service.approve_contribution(
+        success, message = await run_blocking(
+            contribution_service.approve_contribution,
             contribution_id=contribution_id,
             admin_id=update.effective_user.id
         )
@@ -308,16 +370,17 @@ async def admin_approve_command(update: Update, context: ContextTypes.DEFAULT_TY
             f"{EMOJI_CHECK if success else EMOJI_CROSS} {message}"
         )
         
-        # Notify the contributor
+        # Notify the contributor (and everyone who sent the same)
         if success:
-            try:
-                await context.bot.send_message(
-                    chat_id=contribution.user_id,
-                    text=f"{EMOJI_CHECK} Cống hiến của đạo hữu đã được chưởng môn phê duyệt!\n\n"
-                         f"Đa tạ đạo hữu đã cống hiến cho tông môn! 🎉"
-                )
-            except Exception as e:
-                print(f"Error notifying contributor: {e}")
+            for user_id in contribution.submitters:
+                try:
+                    await context.bot.send_message(
+                        chat_id=user_id,
+                        text=f"{EMOJI_CHECK} Cống hiến của đạo hữu đã được chưởng môn phê duyệt!\n\n"
+                             f"Đa tạ đạo hữu đã cống hiến cho tông môn! 🎉"
+                    )
+                except Exception as e:
+                    print(f"Error notifying contributor: {e}")
         
     except Exception as e:
         print(f"Error in admin_approve_command: {e}")
@@ -343,7 +406,7 @@ async def admin_reject_command(update: Update, context: ContextTypes.DEFAULT_TYP
         contribution_id = context.args[0]
         
         # Get contribution details first
-        contribution = contribution_service.get_contribution_by_id(contribution_id)
+        contribution = await run_blocking(contribution_service.get_contribution_by_id, contribution_id)
         if not contribution:
             await update.message.reply_text(
                 f"{EMOJI_CROSS} Không tìm thấy đóng góp với ID: `{contribution_id}`",
@@ -352,7 +415,8 @@ async def admin_reject_command(update: Update, context: ContextTypes.DEFAULT_TYP
             return
         
         # Reject
-        success, message = contribution_service.reject_contribution(
+        success, message = await run_blocking(
+            contribution_service.reject_contribution,
             contribution_id=contribution_id,
             admin_id=update.effective_user.id
         )
@@ -361,16 +425,17 @@ async def admin_reject_command(update: Update, context: ContextTypes.DEFAULT_TYP
             f"{EMOJI_CHECK if success else EMOJI_CROSS} {message}"
         )
         
-        # Notify the contributor
+        # Notify the contributor (and everyone who sent the same)
         if success:
-            try:
-                await context.bot.send_message(
-                    chat_id=contribution.user_id,
-                    text=f"{EMOJI_CROSS} Cống hiến của đạo hữu đã bị từ chối.\n\n"
-                         f"Xin đạo hữu kiểm tra lại manh mối và cống hiến lại nếu cần."
-                )
-            except Exception as e:
-                print(f"Error notifying contributor: {e}")
+            for user_id in contribution.submitters:
+                try:
+                    await context.bot.send_message(
+                        chat_id=user_id,
+                        text=f"{EMOJI_CROSS} Cống hiến của đạo hữu đã bị từ chối.\n\n"
+                             f"Xin đạo hữu kiểm tra lại manh mối và cống hiến lại nếu cần."
+                    )
+                except Exception as e:
+                    print(f"Error notifying contributor: {e}")
         
     except Exception as e:
         print(f"Error in admin_reject_command: {e}")
@@ -379,11 +444,133 @@ async def admin_reject_command(update: Update, context: ContextTypes.DEFAULT_TYP
         )
 
 
+async def notify_contributors(context: ContextTypes.DEFAULT_TYPE, approved: list, rejected: list):
+    """Send each contributor one message for all of their reviewed contributions"""
+    approved_counts = Counter(user_id for c in approved for user_id in c.submitters)
+    rejected_counts = Counter(user_id for c in rejected for user_id in c.submitters)
+    for user_id in set(approved_counts) | set(rejected_counts):
+        try:
+            await context.bot.send_message(
+                chat_id=user_id,
+                text=format_review_notification(approved_counts[user_id], rejected_counts[user_id])
+            )
+        except Exception as e:
+            print(f"Error notifying contributor {user_id}: {e}")
+
+
+async def run_bulk_review(update: Update, context: ContextTypes.DEFAULT_TYPE, contributions: list, approve: bool):
+    """Approve or reject a set of contributions in one pass and report the outcome"""
+    if not contributions:
+        await update.message.reply_text(f"{EMOJI_INFO} Không có đóng góp nào phù hợp.")
+        return
+    
+    if approve:
+        result = await run_blocking(contribution_service.bulk_approve, contributions, update.effective_user.id)
+    else:
+        result = await run_blocking(contribution_service.bulk_reject, contributions, update.effective_user.id)
+    
+    await update.message.reply_text(format_bulk_review_result(approve, result), parse_mode='Markdown')
+    
+    if approve:
+        await notify_contributors(context, result["done"], [])
+    else:
+        await notify_contributors(context, [], result["done"])
+
+
+async def admin_approve_user_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /approveuser <user_id> command - Approve all pending link contributions of a user"""
+    if not await admin_check(update, context):
+        return
+    
+    try:
+        if not context.args or not context.args[0].isdigit():
+            await update.message.reply_text(
+                f"{EMOJI_INFO} Vui lòng cung cấp ID người dùng.\n\n"
+                f"Ví dụ: `/approveuser 123456789`",
+                parse_mode='Markdown'
+            )
+            return
+        
+        contributions = await run_blocking(contribution_service.get_pending_links_by_user, int(context.args[0]))
+        await run_bulk_review(update, context, contributions, approve=True)
+        
+    except Exception as e:
+        print(f"Error in admin_approve_user_command: {e}")
+        await update.message.reply_text(
+            f"{EMOJI_CROSS} Tâm ma quấy nhiễu khi thẩm định."
+        )
+
+
+async def admin_approve_ids_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /approveids <id> <id> ... command - Approve the selected contributions"""
+    if not await admin_check(update, context):
+        return
+    
+    try:
+        if not context.args:
+            await update.message.reply_text(
+                f"{EMOJI_INFO} Vui lòng cung cấp ID các đóng góp.\n\n"
+                f"Ví dụ: `/approveids <ID1> <ID2>`",
+                parse_mode='Markdown'
+            )
+            return
+        
+        contributions = await run_blocking(contribution_service.get_contributions_by_ids, context.args)
+        await run_bulk_review(update, context, contributions, approve=True)
+        
+    except Exception as e:
+        print(f"Error in admin_approve_ids_command: {e}")
+        await update.message.reply_text(
+            f"{EMOJI_CROSS} Tâm ma quấy nhiễu khi thẩm định."
+        )
+
+
+async def admin_reject_ids_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /rejectids <id> <id> ... command - Reject the selected contributions"""
+    if not await admin_check(update, context):
+        return
+    
+    try:
+        if not context.args:
+            await update.message.reply_text(
+                f"{EMOJI_INFO} Vui lòng cung cấp ID các đóng góp.\n\n"
+                f"Ví dụ: `/rejectids <ID1> <ID2>`",
+                parse_mode='Markdown'
+            )
+            return
+        
+        contributions = await run_blocking(contribution_service.get_contributions_by_ids, context.args)
+        await run_bulk_review(update, context, contributions, approve=False)
+        
+    except Exception as e:
+        print(f"Error in admin_reject_ids_command: {e}")
+        await update.message.reply_text(
+            f"{EMOJI_CROSS} Tâm ma quấy nhiễu khi từ chối."
+        )
+
+
+async def admin_reject_duplicates_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /rejectdups command - Reject every pending duplicate"""
+    if not await admin_check(update, context):
+        return
+    
+    try:
+        contributions = await run_blocking(contribution_service.find_duplicate_contributions)
+        await run_bulk_review(update, context, contributions, approve=False)
+        
+    except Exception as e:
+        print(f"Error in admin_reject_duplicates_command: {e}")
+        await update.message.reply_text(
+            f"{EMOJI_CROSS} Tâm ma quấy nhiễu khi từ chối."
+        )
+
+
 async def handle_admin_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle admin callback queries (approve/reject)"""
     query = update.callback_query
     await query.answer()
     
+    await refresh_admin_set()
     if not is_admin(update.effective_user.id):
         await query.edit_message_text(f"{EMOJI_CROSS} Đạo hữu không có quyền thực hiện hành động này.")
         return
@@ -396,62 +583,25 @@ async def handle_admin_callback(update: Update, context: ContextTypes.DEFAULT_TY
         return
         
     if data == "admin_stats":
-        stats = admin_service.get_statistics()
-        top_users = stats.get('top_contributors', [])
-        leaderboard_text = ""
-        if top_users:
-            leaderboard_text = "\n🏆 **TOP ĐÓNG GÓP:**\n"
-            for i, user in enumerate(top_users, 1):
-                # Retrieve user exp
-                user_obj = admin_service.user_repo.get_by_id(user.get('_id'))
-                exp = user_obj.exp if user_obj else 0
-                leaderboard_text += f"{i}. {user.get('username', 'Unknown')} - {user.get('count', 0)} lần ({exp} EXP)\n"
-                
-        message = f"""
-{EMOJI_ADMIN} **THỐNG KÊ HỆ THỐNG**
-
-📊 **Dữ liệu:**
-{EMOJI_BOOK} **Tiểu thuyết:** {stats.get('total_novels', 0)} chương
-{EMOJI_FILM_3D} **Phim 3D:** {stats.get('total_episodes_3d', 0)} tập
-{EMOJI_FILM_2D} **Phim 2D:** {stats.get('total_episodes_2d', 0)} tập
-{EMOJI_LINK} **Mappings:** {stats.get('total_mappings', 0)} liên kết
-{EMOJI_PENDING} **Đóng góp chờ duyệt:** {stats.get('pending_contributions', 0)}
-
-👥 **Người dùng:**
-• Tổng số: {stats.get('total_users', 0)}
-• Hôm nay: {stats.get('active_today', 0)}
-• 7 ngày qua: {stats.get('active_week', 0)}
-• 30 ngày qua: {stats.get('active_month', 0)}
-{leaderboard_text}
-"""
+        stats = await admin_service.get_statistics_async()
+        message = format_statistics(stats, render_cache.stats())
         await query.edit_message_text(message, parse_mode='Markdown')
         return
 
     if data == "admin_pending":
-        contributions = contribution_service.get_pending_contributions()
-        message = format_contribution_list(contributions)
-        
-        # Create buttons for list
-        keyboard = []
-        if contributions:
-            for i, contrib in enumerate(contributions, 1):
-                row = [
-                    InlineKeyboardButton(f"✅ #{i}", callback_data=f"approvelist_{contrib._id}"),
-                    InlineKeyboardButton(f"❌ #{i}", callback_data=f"rejectlist_{contrib._id}")
-                ]
-                keyboard.append(row)
-        
-        # Add refresh/close buttons
-        keyboard.append([
-            InlineKeyboardButton("🔄 Làm mới", callback_data="admin_pending"),
-            InlineKeyboardButton("❌ Đóng", callback_data="admin_close")
-        ])
+        await show_pending_page(update, context, is_callback=True)
+        return
         
-        await query.edit_message_text(
-            message, 
-            parse_mode='Markdown',
-            reply_markup=InlineKeyboardMarkup(keyboard)
-        )
+    if data.startswith("admin_pending_n_") or data.startswith("admin_pending_p_"):
+        # admin_pending_<n|p>_<page>_<cursor>
+        _, _, direction, page, cursor = data.split('_', 4)
+        try:
+            if direction == "n":
+                await show_pending_page(update, context, int(page), after=cursor, is_callback=True)
+            else:
+                await show_pending_page(update, context, int(page), before=cursor, is_callback=True)
+        except ValueError:
+            await show_pending_page(update, context, is_callback=True)
         return
 
     
@@ -471,45 +621,30 @@ async def handle_admin_callback(update: Update, context: ContextTypes.DEFAULT_TY
     
     try:
         # Get contribution first to notify user
-        contribution = contribution_service.get_contribution_by_id(contribution_id)
+        contribution = await run_blocking(contribution_service.get_contribution_by_id, contribution_id)
         
         if not contribution:
             if "list" in action:
-                # If list action, just refresh list
-                contributions = contribution_service.get_pending_contributions()
-                message = format_contribution_list(contributions)
-                
-                # Rebuild keyboard
-                keyboard = []
-                for i, contrib in enumerate(contributions, 1):
-                    row = [
-                        InlineKeyboardButton(f"✅ #{i}", callback_data=f"approvelist_{contrib._id}"),
-                        InlineKeyboardButton(f"❌ #{i}", callback_data=f"rejectlist_{contrib._id}")
-                    ]
-                    keyboard.append(row)
-                keyboard.append([
-                    InlineKeyboardButton("🔄 Làm mới", callback_data="admin_pending"),
-                    InlineKeyboardButton("❌ Đóng", callback_data="admin_close")
-                ])
-                
-                await query.edit_message_text(
-                    f"{EMOJI_CROSS} Không tìm thấy đóng góp này (có thể đã được xử lý).\n\n{message}",
-                    parse_mode='Markdown',
-                    reply_markup=InlineKeyboardMarkup(keyboard)
+                # If list action, just refresh the current page
+                await show_current_pending_page(
+                    update, context,
+                    f"{EMOJI_CROSS} Không tìm thấy đóng góp này (có thể đã được xử lý)."
                 )
             else:
                 await query.edit_message_text(f"{EMOJI_CROSS} Không tìm thấy đóng góp này.")
             return
 
         if action.startswith("approve"):
-            success, message = contribution_service.approve_contribution(
+            success, message = await run_blocking(
+                contribution_service.approve_contribution,
                 contribution_id=contribution_id,
                 admin_id=update.effective_user.id
             )
             emoji = EMOJI_CHECK
             result_text = "✅ ĐÃ DUYỆT"
         else: # reject
-            success, message = contribution_service.reject_contribution(
+            success, message = await run_blocking(
+                contribution_service.reject_contribution,
                 contribution_id=contribution_id,
                 admin_id=update.effective_user.id
             )
@@ -519,27 +654,10 @@ async def handle_admin_callback(update: Update, context: ContextTypes.DEFAULT_TY
         if success:
             # Handle list update vs single view update
             if "list" in action:
-                 # Refresh list
-                contributions = contribution_service.get_pending_contributions()
-                new_list_text = format_contribution_list(contributions)
-                
-                 # Rebuild keyboard
-                keyboard = []
-                for i, contrib in enumerate(contributions, 1):
-                    row = [
-                        InlineKeyboardButton(f"✅ #{i}", callback_data=f"approvelist_{contrib._id}"),
-                        InlineKeyboardButton(f"❌ #{i}", callback_data=f"rejectlist_{contrib._id}")
-                    ]
-                    keyboard.append(row)
-                keyboard.append([
-                    InlineKeyboardButton("🔄 Làm mới", callback_data="admin_pending"),
-                    InlineKeyboardButton("❌ Đóng", callback_data="admin_close")
-                ])
-                
-                await query.edit_message_text(
-                    text=f"{emoji} {result_text} đóng góp của {contribution.username}.\n\n{new_list_text}",
-                    parse_mode='Markdown',
-                    reply_markup=InlineKeyboardMarkup(keyboard)
+                # Refresh the current page
+                await show_current_pending_page(
+                    update, context,
+                    f"{emoji} {result_text} đóng góp của {contribution.username}."
                 )
             else:
                 # Single view update (existing logic)
@@ -558,13 +676,14 @@ async def handle_admin_callback(update: Update, context: ContextTypes.DEFAULT_TY
                 notify_text = (f"{EMOJI_CROSS} Cống hiến của đạo hữu đã bị từ chối.\n\n"
                                f"Xin đạo hữu kiểm tra lại manh mối.")
                                
-            try:
-                await context.bot.send_message(
-                    chat_id=contribution.user_id,
-                    text=notify_text
-                )
-            except Exception as e:
-                print(f"Error notifying contributor: {e}")
+            for user_id in contribution.submitters:
+                try:
+                    await context.bot.send_message(
+                        chat_id=user_id,
+                        text=notify_text
+                    )
+                except Exception as e:
+                    print(f"Error notifying contributor: {e}")
                 
         else:
             await context.bot.send_message(
@@ -590,6 +709,7 @@ async def admin_help_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 **Xem thống kê:**
 `/stats` - Xem thống kê tổng quan
+`/metrics` - Xem hiệu năng handler và truy vấn
 
 **Quản lý đóng góp:**
 `/pending` - Danh sách đóng góp chờ duyệt
@@ -597,10 +717,17 @@ async def admin_help_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
 `/approve_<ID>` - Duyệt đóng góp
 `/reject_<ID>` - Từ chối đóng góp
 
+**Duyệt hàng loạt:**
+`/approveuser <user_id>` - Duyệt mọi link chờ duyệt của một người
+`/approveids <ID1> <ID2> ...` - Duyệt các đóng góp đã chọn
+`/rejectids <ID1> <ID2> ...` - Từ chối các đóng góp đã chọn
+`/rejectdups` - Từ chối mọi đóng góp trùng lặp
+
 **Lưu ý:**
 • Thay `<ID>` bằng ID thực tế của đóng góp
 • Khi có đóng góp mới, bot sẽ tự động thông báo
 • Đạo hữu cống hiến sẽ nhận thông báo khi được duyệt/từ chối
+• Duyệt hàng loạt gộp thông báo thành một tin cho mỗi người
 """
     
     await update.message.reply_text(
@@ -614,8 +741,8 @@ async def broadcast_ask_content(update: Update, context: ContextTypes.DEFAULT_TY
     text = update.message.text
     context.user_data['broadcast_content'] = text
     
-    # Get user count
-    user_count = user_service.count_users()
+    # Get recipient count (users who blocked the bot are skipped)
+    user_count = await broadcast_service.count_recipients()
     
     keyboard = [
         [
@@ -653,32 +780,17 @@ async def broadcast_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.edit_message_text(f"{EMOJI_CROSS} Thất bại: Không tìm thấy nội dung.")
         return ConversationHandler.END
         
-    # Start broadcasting
+    # Start broadcasting in the background, progress is shown in this message
     await query.edit_message_text(f"⏳ Đang gửi thông báo... Vui lòng đợi.")
     
-    users = user_service.get_all_users()
-    success_count = 0
-    fail_count = 0
-    
-    for user in users:
-        try:
-            await context.bot.send_message(
-                chat_id=user.user_id,
-                text=f"{EMOJI_ADMIN} **TRUYỀN ÂM TỪ CHƯỞNG MÔN**\n\n{content}",
-                parse_mode='Markdown'
-            )
-            success_count += 1
-        except Exception as e:
-            fail_count += 1
-            print(f"Failed to send to {user.user_id}: {e}")
-            
-    await context.bot.send_message(
-        chat_id=query.message.chat_id,
-        text=f"{EMOJI_CHECK} **KẾT QUẢ GỬI THÔNG BÁO**\n\n"
-             f"✅ Thành công: {success_count}\n"
-             f"❌ Thất bại: {fail_count}",
-        parse_mode='Markdown'
+    job = await broadcast_service.start_job(
+        context.bot,
+        text=f"{EMOJI_ADMIN} **TRUYỀN ÂM TỪ CHƯỞNG MÔN**\n\n{content}",
+        admin_chat_id=query.message.chat_id,
+        status_message_id=query.message.message_id
     )
+    if not job:
+        await query.edit_message_text(f"{EMOJI_CROSS} Thất bại: Không tạo được lệnh truyền âm.")
     
     context.user_data.clear()
     return ConversationHandler.END
@@ -698,5 +810,7 @@ broadcast_conv_handler = ConversationHandler(
         BROADCAST_ASK_CONTENT: [MessageHandler(filters.TEXT & ~filters.COMMAND, broadcast_ask_content)],
         BROADCAST_CONFIRM: [CallbackQueryHandler(broadcast_confirm, pattern='^broadcast_(confirm|cancel)$')]
     },
-    fallbacks=[CommandHandler("cancel", broadcast_cancel)]
+    fallbacks=[CommandHandler("cancel", broadcast_cancel)],
+    name="broadcast",
+    persistent=settings.PERSISTENCE_ENABLED
 )
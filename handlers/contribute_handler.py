@@ -14,6 +14,7 @@ from telegram.ext import (
 from services import ContributionService
 from utils.validators import *
 from utils.constants import *
+from utils.async_utils import run_blocking
 from config.settings import settings
 
 
@@ -251,7 +252,8 @@ async def mapping_get_2d(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
     username = f"@{user.username}" if user.username else user.first_name
     
-    success, message, contribution = contribution_service.submit_mapping_contribution(
+    success, message, contribution = await run_blocking(
+        contribution_service.submit_mapping_contribution,
         user_id=user.id,
         username=username,
         novel_chapters=chapters,
@@ -360,7 +362,8 @@ async def link_get_url(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
     username = f"@{user.username}" if user.username else user.first_name
     
-    success, message, contribution = contribution_service.submit_link_contribution(
+    success, message, contribution = await run_blocking(
+        contribution_service.submit_link_contribution,
         user_id=user.id,
         username=username,
         target_type=context.user_data['target_type'],
@@ -443,4 +446,6 @@ contribution_conv_handler = ConversationHandler(
         ],
     },
     fallbacks=[CommandHandler('cancel', cancel_contribution)],
+    name="contribution",
+    persistent=settings.PERSISTENCE_ENABLED,
 )
@@ -0,0 +1,58 @@
+"""
+Inline handler
+Answers @bot queries in any chat from the in-memory chapter index
+"""
+from telegram import (
+    Update,
+    InlineQueryResultArticle,
+    InputTextMessageContent,
+    InlineQueryResultsButton
+)
+from telegram.ext import ContextTypes
+from services.chapter_index_service import chapter_index_service
+from utils.formatters import format_novel_info, format_inline_description
+from utils.async_utils import run_blocking
+from config.settings import settings
+
+
+async def inline_query_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle inline queries: `@bot 123` or `@bot ly hương`"""
+    query = update.inline_query
+    
+    try:
+        if not chapter_index_service.loaded or chapter_index_service.check_due():
+            await run_blocking(chapter_index_service.ensure_fresh)
+        
+        offset = int(query.offset) if query.offset.isdigit() else 0
+        matches = chapter_index_service.search(query.query)
+        page = matches[offset:offset + settings.INLINE_RESULTS_LIMIT]
+        
+        results = []
+        for novel in chapter_index_service.get_novels(page):
+            title = f"Chương {novel.chapter_number}"
+            if novel.title:
+                title += f" - {novel.title}"
+            results.append(InlineQueryResultArticle(
+                id=str(novel.chapter_number),
+                title=title,
+                description=format_inline_description(novel),
+                input_message_content=InputTextMessageContent(
+                    format_novel_info(novel),
+                    parse_mode='Markdown',
+                    disable_web_page_preview=True
+                )
+            ))
+        
+        next_offset = offset + settings.INLINE_RESULTS_LIMIT
+        await query.answer(
+            results,
+            # Same query, same answer for everyone: Telegram may serve it without asking again
+            cache_time=settings.INLINE_CACHE_TIME,
+            is_personal=False,
+            next_offset=str(next_offset) if next_offset < len(matches) else "",
+            button=None if results or offset else InlineQueryResultsButton(
+                text="Không tìm thấy, mở bot để dò xét", start_parameter="inline"
+            )
+        )
+    except Exception as e:
+        print(f"Error in inline_query_handler: {e}")
@@ -2,10 +2,15 @@
 Search handler
 Handles search commands (/chapter, /3d, /2d)
 """
+import math
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from services import SearchService
+from services import SearchService, catalog_service
+from services.search_service import encode_list_cursor, decode_list_cursor
+from repositories.mapping_repository import LAST_PAGE
 from utils.formatters import format_search_result
+from utils.render_cache import render_cache, result_cache_tags
+from utils.async_utils import run_blocking
 from utils.validators import validate_chapter_number, validate_episode_number
 from utils.constants import *
 
@@ -99,28 +104,71 @@ async def search_2d_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def list_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /list command"""
-    await show_list_page(update, context, page=0)
+    await show_list_page(update, context)
 
 
 async def handle_list_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle list pagination"""
+    """
+    Handle list pagination
+    Callback data: list_page_first, list_page_last,
+    list_page_n_<page>_<cursor> (next) or list_page_p_<page>_<cursor> (previous)
+    """
     query = update.callback_query
     await query.answer()
     
-    data = query.data
+    data = query.data[len("list_page_"):]
     try:
-        page = int(data.split('_')[-1])
-        await show_list_page(update, context, page=page, is_callback=True)
+        if data == "last":
+            await show_list_page(update, context, last=True, is_callback=True)
+            return
+        
+        parts = data.split('_', 2)
+        if len(parts) == 3 and parts[0] in ("n", "p"):
+            direction, page, cursor = parts
+            key = decode_list_cursor(cursor)
+            if direction == "n":
+                await show_list_page(update, context, page=int(page), after=key, is_callback=True)
+            else:
+                await show_list_page(update, context, page=int(page), before=key, is_callback=True)
+            return
+        
+        # list_page_first, or a button from before keyset pagination
+        await show_list_page(update, context, is_callback=True)
     except Exception as e:
         print(f"Error in list callback: {e}")
 
 
-async def show_list_page(update: Update, context: ContextTypes.DEFAULT_TYPE, page: int = 0, is_callback: bool = False):
+async def show_list_page(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    page: int = 0,
+    after=None,
+    before=None,
+    last: bool = False,
+    is_callback: bool = False
+):
     """Show list page"""
     ITEMS_PER_PAGE = 10
-    offset = page * ITEMS_PER_PAGE
     
-    items = search_service.get_full_list(limit=ITEMS_PER_PAGE, offset=offset)
+    total = await search_service.count_mappings_async()
+    total_pages = max(1, math.ceil(total / ITEMS_PER_PAGE))
+    
+    if last:
+        # Size the last page so earlier pages line up with the first one
+        page = total_pages - 1
+        limit = total - page * ITEMS_PER_PAGE if total else ITEMS_PER_PAGE
+        result = await search_service.get_list_page_async(limit=limit, before=LAST_PAGE)
+        has_prev, has_next = result["has_more"], False
+    elif before is not None:
+        result = await search_service.get_list_page_async(limit=ITEMS_PER_PAGE, before=before)
+        has_prev, has_next = result["has_more"], True
+    else:
+        result = await search_service.get_list_page_async(limit=ITEMS_PER_PAGE, after=after)
+        has_prev, has_next = after is not None, result["has_more"]
+    
+    items = result["items"]
+    if not has_prev:
+        page = 0
     
     if not items and page > 0:
         if is_callback:
@@ -137,7 +185,7 @@ async def show_list_page(update: Update, context: ContextTypes.DEFAULT_TYPE, pag
 
     # Format list
     text = f"{EMOJI_BOOK} **DANH MỤC TÀNG KINH CÁC**\n"
-    text += f"(Trang {page + 1})\n\n"
+    text += f"(Trang {page + 1}/{max(total_pages, page + 1)})\n\n"
     
     for item in items:
         mapping = item["mapping"]
@@ -166,9 +214,9 @@ async def show_list_page(update: Update, context: ContextTypes.DEFAULT_TYPE, pag
         
         # Format Chapter
         txt_chap = "--"
-        if mapping.novel_chapters:
-            start = mapping.novel_chapters[0]
-            end = mapping.novel_chapters[-1]
+        if mapping.chapter_start is not None:
+            start = mapping.chapter_start
+            end = mapping.chapter_end
             chap_range = f"{start}" if start == end else f"{start}-{end}"
             
             if novel and novel.links:
@@ -185,13 +233,17 @@ async def show_list_page(update: Update, context: ContextTypes.DEFAULT_TYPE, pag
     keyboard = []
     nav_row = []
     
-    if page > 0:
-        nav_row.append(InlineKeyboardButton("⬅️ Trước", callback_data=f"list_page_{page-1}"))
+    # Keyset cursors: first/last item of this page
+    first_cursor = encode_list_cursor(items[0]["mapping"])
+    last_cursor = encode_list_cursor(items[-1]["mapping"])
     
-    # Check if there might be more (simple check: if we got full limit, likely more)
-    # Better: items count == limit
-    if len(items) == ITEMS_PER_PAGE:
-        nav_row.append(InlineKeyboardButton("Sau ➡️", callback_data=f"list_page_{page+1}"))
+    if has_prev:
+        nav_row.append(InlineKeyboardButton("⏮", callback_data="list_page_first"))
+        nav_row.append(InlineKeyboardButton("⬅️ Trước", callback_data=f"list_page_p_{page - 1}_{first_cursor}"))
+    
+    if has_next:
+        nav_row.append(InlineKeyboardButton("Sau ➡️", callback_data=f"list_page_n_{page + 1}_{last_cursor}"))
+        nav_row.append(InlineKeyboardButton("⏭", callback_data="list_page_last"))
         
     if nav_row:
         keyboard.append(nav_row)
@@ -218,34 +270,73 @@ async def show_list_page(update: Update, context: ContextTypes.DEFAULT_TYPE, pag
 
 # CORE SEARCH LOGIC
 
-async def perform_search_chapter(update: Update, context: ContextTypes.DEFAULT_TYPE, chapter_num: int, is_callback: bool):
+def render_search_result(result: dict):
+    """
+    Render a search result into (text, reply_markup)
+    Pure function of the result, so the output can be cached
+    """
+    search_type = result["search_type"]
+    search_value = result["search_value"]
+    
+    text = format_search_result(result["novels"], result["episodes_3d"], result["episodes_2d"], result["mappings"], search_type, search_value)
+    
+    keyboard = []
+    row1 = []
+    if search_type != SEARCH_TYPE_3D and result["episodes_3d"]:
+        ep_num = result["episodes_3d"][0].episode_number
+        row1.append(InlineKeyboardButton(f"🎬 Xem 3D tập {ep_num}", callback_data=f"nav_3d_{ep_num}"))
+    if search_type != SEARCH_TYPE_2D and result["episodes_2d"]:
+        ep_num = result["episodes_2d"][0].episode_number
+        row1.append(InlineKeyboardButton(f"📺 Xem 2D tập {ep_num}", callback_data=f"nav_2d_{ep_num}"))
+    if search_type != SEARCH_TYPE_CHAPTER and result["novels"]:
+        chap_num = result["novels"][0].chapter_number
+        row1.append(InlineKeyboardButton(f"📖 Đọc chương {chap_num}", callback_data=f"nav_chapter_{chap_num}"))
+    if row1: keyboard.append(row1)
+    
+    row2 = []
+    if search_value > 1:
+        row2.append(InlineKeyboardButton("⬅️ Trước", callback_data=f"nav_{search_type}_{search_value - 1}"))
+    row2.append(InlineKeyboardButton("Sau ➡️", callback_data=f"nav_{search_type}_{search_value + 1}"))
+    keyboard.append(row2)
+    
+    if not result["novels"] and not result["episodes_3d"] and not result["episodes_2d"]:
+        keyboard.append([InlineKeyboardButton("➕ Cống hiến ngay", callback_data="contribute")])
+    
+    return text, InlineKeyboardMarkup(keyboard)
+
+
+async def get_rendered_search(search_type: str, search_value: int):
+    """Rendered (text, reply_markup) for a search, served from the render cache when possible"""
+    if catalog_service.check_due():
+        await run_blocking(catalog_service.ensure_fresh)
+    
+    key = (search_type, search_value)
+    cached = render_cache.get(key, catalog_service.version)
+    if cached:
+        return cached
+    
+    if search_type == SEARCH_TYPE_CHAPTER:
+        result = await search_service.search_by_chapter_async(search_value)
+    elif search_type == SEARCH_TYPE_3D:
+        result = await search_service.search_by_episode_3d_async(search_value)
+    else:
+        result = await search_service.search_by_episode_2d_async(search_value)
+    
+    rendered = render_search_result(result)
+    
+    # Empty results are not cached: they may come from a failed query
+    if result["novels"] or result["episodes_3d"] or result["episodes_2d"]:
+        render_cache.put(key, rendered, result_cache_tags(result), catalog_service.version)
+    
+    return rendered
+
+
+async def perform_search(update: Update, context: ContextTypes.DEFAULT_TYPE, search_type: str, search_value: int, is_callback: bool):
     try:
         if not is_callback:
             await update.message.chat.send_action(action="typing")
         
-        result = search_service.search_by_chapter(chapter_num)
-        text = format_search_result(result["novels"], result["episodes_3d"], result["episodes_2d"], result["mappings"], result["search_type"], result["search_value"])
-        
-        keyboard = []
-        row1 = []
-        if result["episodes_3d"]:
-            ep_num = result["episodes_3d"][0].episode_number
-            row1.append(InlineKeyboardButton(f"🎬 Xem 3D tập {ep_num}", callback_data=f"nav_3d_{ep_num}"))
-        if result["episodes_2d"]:
-            ep_num = result["episodes_2d"][0].episode_number
-            row1.append(InlineKeyboardButton(f"📺 Xem 2D tập {ep_num}", callback_data=f"nav_2d_{ep_num}"))
-        if row1: keyboard.append(row1)
-        
-        row2 = []
-        if chapter_num > 1:
-            row2.append(InlineKeyboardButton("⬅️ Trước", callback_data=f"nav_chapter_{chapter_num - 1}"))
-        row2.append(InlineKeyboardButton("Sau ➡️", callback_data=f"nav_chapter_{chapter_num + 1}"))
-        keyboard.append(row2)
-        
-        if not result["novels"] and not result["episodes_3d"] and not result["episodes_2d"]:
-            keyboard.append([InlineKeyboardButton("➕ Cống hiến ngay", callback_data="contribute")])
-            
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        text, reply_markup = await get_rendered_search(search_type, search_value)
         
         if is_callback:
             await update.callback_query.answer()
@@ -258,89 +349,17 @@ async def perform_search_chapter(update: Update, context: ContextTypes.DEFAULT_T
             await update.message.reply_text(text, parse_mode='Markdown', disable_web_page_preview=True, reply_markup=reply_markup)
             
     except Exception as e:
-        print(f"Error search chapter: {e}")
+        print(f"Error search {search_type}: {e}")
         if is_callback: await update.callback_query.answer("Tẩu hỏa nhập ma (Lỗi tra cứu)")
 
 
+async def perform_search_chapter(update: Update, context: ContextTypes.DEFAULT_TYPE, chapter_num: int, is_callback: bool):
+    await perform_search(update, context, SEARCH_TYPE_CHAPTER, chapter_num, is_callback)
+
+
 async def perform_search_3d(update: Update, context: ContextTypes.DEFAULT_TYPE, episode_num: int, is_callback: bool):
-    try:
-        if not is_callback:
-            await update.message.chat.send_action(action="typing")
-            
-        result = search_service.search_by_episode_3d(episode_num)
-        text = format_search_result(result["novels"], result["episodes_3d"], result["episodes_2d"], result["mappings"], result["search_type"], result["search_value"])
-        
-        keyboard = []
-        row1 = []
-        if result["episodes_2d"]:
-            ep_num = result["episodes_2d"][0].episode_number
-            row1.append(InlineKeyboardButton(f"📺 Xem 2D tập {ep_num}", callback_data=f"nav_2d_{ep_num}"))
-        if result["novels"]:
-             chap_num = result["novels"][0].chapter_number
-             row1.append(InlineKeyboardButton(f"📖 Đọc chương {chap_num}", callback_data=f"nav_chapter_{chap_num}"))
-        if row1: keyboard.append(row1)
-        
-        row2 = []
-        if episode_num > 1:
-            row2.append(InlineKeyboardButton("⬅️ Trước", callback_data=f"nav_3d_{episode_num - 1}"))
-        row2.append(InlineKeyboardButton("Sau ➡️", callback_data=f"nav_3d_{episode_num + 1}"))
-        keyboard.append(row2)
-        
-        if not result["novels"] and not result["episodes_3d"] and not result["episodes_2d"]:
-            keyboard.append([InlineKeyboardButton("➕ Cống hiến ngay", callback_data="contribute")])
-            
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        if is_callback:
-            await update.callback_query.answer()
-            try:
-                await update.callback_query.edit_message_text(text, parse_mode='Markdown', disable_web_page_preview=True, reply_markup=reply_markup)
-            except Exception: pass
-        else:
-            await update.message.reply_text(text, parse_mode='Markdown', disable_web_page_preview=True, reply_markup=reply_markup)
-            
-    except Exception as e:
-        print(f"Error search 3d: {e}")
-        if is_callback: await update.callback_query.answer("Tẩu hỏa nhập ma (Lỗi tra cứu)")
+    await perform_search(update, context, SEARCH_TYPE_3D, episode_num, is_callback)
 
 
 async def perform_search_2d(update: Update, context: ContextTypes.DEFAULT_TYPE, episode_num: int, is_callback: bool):
-    try:
-        if not is_callback:
-            await update.message.chat.send_action(action="typing")
-            
-        result = search_service.search_by_episode_2d(episode_num)
-        text = format_search_result(result["novels"], result["episodes_3d"], result["episodes_2d"], result["mappings"], result["search_type"], result["search_value"])
-        
-        keyboard = []
-        row1 = []
-        if result["episodes_3d"]:
-            ep_num = result["episodes_3d"][0].episode_number
-            row1.append(InlineKeyboardButton(f"🎬 Xem 3D tập {ep_num}", callback_data=f"nav_3d_{ep_num}"))
-        if result["novels"]:
-             chap_num = result["novels"][0].chapter_number
-             row1.append(InlineKeyboardButton(f"📖 Đọc chương {chap_num}", callback_data=f"nav_chapter_{chap_num}"))
-        if row1: keyboard.append(row1)
-        
-        row2 = []
-        if episode_num > 1:
-            row2.append(InlineKeyboardButton("⬅️ Trước", callback_data=f"nav_2d_{episode_num - 1}"))
-        row2.append(InlineKeyboardButton("Sau ➡️", callback_data=f"nav_2d_{episode_num + 1}"))
-        keyboard.append(row2)
-        
-        if not result["novels"] and not result["episodes_3d"] and not result["episodes_2d"]:
-            keyboard.append([InlineKeyboardButton("➕ Cống hiến ngay", callback_data="contribute")])
-            
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        if is_callback:
-            await update.callback_query.answer()
-            try:
-                await update.callback_query.edit_message_text(text, parse_mode='Markdown', disable_web_page_preview=True, reply_markup=reply_markup)
-            except Exception: pass
-        else:
-            await update.message.reply_text(text, parse_mode='Markdown', disable_web_page_preview=True, reply_markup=reply_markup)
-            
-    except Exception as e:
-        print(f"Error search 2d: {e}")
-        if is_callback: await update.callback_query.answer("Tẩu hỏa nhập ma (Lỗi tra cứu)")
+    await perform_search(update, context, SEARCH_TYPE_2D, episode_num, is_callback)
@@ -166,6 +166,10 @@ Ví dụ: `/3d 10`
 `/2d <số tập>`
 Ví dụ: `/2d 5`
 
+*Dò xét ở bất kỳ cuộc trò chuyện nào:*
+Gõ `@tên_bot` kèm số chương hoặc tên chương
+Ví dụ: `@tên_bot 123`, `@tên_bot ly huong`
+
 Bot sẽ hiển thị manh mối và ngọc giản nếu có.
 """
     elif data == "help_contribute":
@@ -3,9 +3,18 @@ Main entry point for Tien Nghich Telegram Bot
 """
 import logging
 import telegram
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler, filters
+from telegram.ext import Application, CommandHandler, CallbackQueryHandler, InlineQueryHandler, filters
 from config.settings import settings
 from database.connection import db_connection
+from services import (
+    catalog_service,
+    chapter_index_service,
+    activity_buffer,
+    permission_service,
+    broadcast_service,
+    mongo_persistence
+)
+from utils.metrics import instrument_handlers, metrics_server
 from handlers import (
     start_command,
     help_command,
@@ -15,13 +24,19 @@ from handlers import (
     handle_search_callback,
     list_command,
     handle_list_callback,
+    inline_query_handler,
     contribution_conv_handler,
     admin_stats_command,
+    admin_metrics_command,
     admin_pending_command,
     admin_review_command,
     admin_approve_command,
     admin_reject_command,
     admin_reject_command,
+    admin_approve_user_command,
+    admin_approve_ids_command,
+    admin_reject_ids_command,
+    admin_reject_duplicates_command,
     admin_help_command,
     handle_admin_callback,
     admin_dashboard_command,
@@ -61,16 +76,24 @@ def setup_handlers(application: Application):
     application.add_handler(CommandHandler("list", list_command))
     application.add_handler(CallbackQueryHandler(handle_list_callback, pattern="^list_page_"))
     
+    # Inline mode (@bot query in any chat)
+    application.add_handler(InlineQueryHandler(inline_query_handler))
+    
     # Contribution conversation handler (must be added before other handlers)
     application.add_handler(contribution_conv_handler)
     
     # Admin commands
     application.add_handler(CommandHandler("stats", admin_stats_command))
+    application.add_handler(CommandHandler("metrics", admin_metrics_command))
     application.add_handler(CommandHandler("pending", admin_pending_command))
     application.add_handler(CommandHandler("review", admin_review_command))
     application.add_handler(CommandHandler("review", admin_review_command))
     application.add_handler(CommandHandler("approve", admin_approve_command))
     application.add_handler(CommandHandler("reject", admin_reject_command))
+    application.add_handler(CommandHandler("approveuser", admin_approve_user_command))
+    application.add_handler(CommandHandler("approveids", admin_approve_ids_command))
+    application.add_handler(CommandHandler("rejectids", admin_reject_ids_command))
+    application.add_handler(CommandHandler("rejectdups", admin_reject_duplicates_command))
     application.add_handler(CommandHandler("adminhelp", admin_help_command))
     application.add_handler(CommandHandler("add_admin", add_admin_command))
     application.add_handler(CommandHandler("remove_admin", remove_admin_command))
@@ -84,6 +107,13 @@ def setup_handlers(application: Application):
     # Admin callback handler
     application.add_handler(CallbackQueryHandler(handle_admin_callback, pattern="^(approve|reject|admin|approvelist|rejectlist)_"))
     
+    # Message handler for smart input (must stay last)
+    from handlers.message_handler import message_handler
+    application.add_handler(telegram.ext.MessageHandler(telegram.ext.filters.TEXT & ~telegram.ext.filters.COMMAND, message_handler))
+    
+    # Record latency and Mongo commands of every handler above
+    instrument_handlers(application)
+    
     logger.info("✅ All handlers registered successfully")
 
 
@@ -91,6 +121,10 @@ async def post_init(application: Application):
     """Initialize after application starts"""
     logger.info("🚀 Bot is starting up...")
     
+    # In webhook mode every worker runs post_init, one-off duties belong to worker 0
+    worker_index = application.bot_data.get("worker_index", 0)
+    primary = worker_index == 0
+    
     # Set bot commands
     from telegram import BotCommand
     commands = [
@@ -102,8 +136,9 @@ async def post_init(application: Application):
         BotCommand("list", "Danh mục Tàng Kinh Các"),
         BotCommand("help", "Bí kíp sử dụng")
     ]
-    await application.bot.set_my_commands(commands)
-    logger.info("✅ Bot commands menu set successfully")
+    if primary:
+        await application.bot.set_my_commands(commands)
+        logger.info("✅ Bot commands menu set successfully")
     
     # Connect to database
     try:
@@ -113,6 +148,46 @@ async def post_init(application: Application):
         logger.error(f"❌ Failed to connect to database: {e}")
         raise
     
+    # Load in-memory catalog
+    if settings.CATALOG_CACHE_ENABLED:
+        if catalog_service.load():
+            logger.info("✅ Catalog cache loaded")
+        else:
+            logger.warning("⚠️  Catalog cache could not be loaded, falling back to database queries")
+    
+    # Build chapter index for inline queries
+    if chapter_index_service.load():
+        logger.info("✅ Chapter index built")
+    else:
+        logger.warning("⚠️  Chapter index could not be built, will retry on first inline query")
+    
+    # Load admin set for permission checks
+    if permission_service.load():
+        logger.info("✅ Admin set loaded")
+    else:
+        logger.warning("⚠️  Admin set could not be loaded, will retry on first check")
+    permission_service.start()
+    
+    # Start write-behind flush of user activity
+    activity_buffer.start()
+    
+    # Start Prometheus metrics endpoint (one port per worker)
+    if settings.METRICS_PORT:
+        metrics_port = settings.METRICS_PORT + worker_index
+        try:
+            metrics_server.start(settings.METRICS_HOST, metrics_port)
+            logger.info(f"📈 Metrics served on http://{settings.METRICS_HOST}:{metrics_port}/metrics")
+        except OSError as e:
+            logger.warning(f"⚠️  Could not start metrics server: {e}")
+    
+    if not primary:
+        return
+    
+    # Resume broadcasts interrupted by a restart
+    resumed = await broadcast_service.resume_jobs(application.bot)
+    if resumed:
+        logger.info(f"📢 Resumed {resumed} broadcast job(s)")
+    
     # Send startup message to admin
     try:
         await application.bot.send_message(
@@ -128,6 +203,19 @@ async def post_shutdown(application: Application):
     """Cleanup after application stops"""
     logger.info("🛑 Bot is shutting down...")
     
+    await permission_service.stop()
+    metrics_server.stop()
+    
+    # Stop broadcasts, they resume from their checkpoint on next start
+    await broadcast_service.stop()
+    
+    # Drain buffered user activity before the connection goes away
+    try:
+        await activity_buffer.stop()
+        logger.info("✅ User activity flushed")
+    except Exception as e:
+        logger.error(f"❌ Error flushing user activity: {e}")
+    
     # Close database connection
     try:
         db_connection.close()
@@ -146,6 +234,26 @@ async def post_shutdown(application: Application):
     #     logger.warning(f"⚠️  Could not send shutdown notification to admin: {e}")
 
 
+def build_application() -> Application:
+    """Create the bot application with all handlers"""
+    builder = (
+        Application.builder()
+        .token(settings.TELEGRAM_BOT_TOKEN)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+    )
+    
+    # user_data and conversation states survive restarts
+    if settings.PERSISTENCE_ENABLED:
+        builder = builder.persistence(mongo_persistence)
+    
+    application = builder.build()
+    
+    # Setup handlers
+    setup_handlers(application)
+    return application
+
+
 def main():
     """Main function to run the bot"""
     
@@ -157,30 +265,22 @@ def main():
         logger.error(f"❌ Configuration error: {e}")
         return
     
-    # Create application
-    logger.info("📦 Creating bot application...")
-    application = (
-        Application.builder()
-        .token(settings.TELEGRAM_BOT_TOKEN)
-        .post_init(post_init)
-        .post_shutdown(post_shutdown)
-        .build()
-    )
+    logger.info(f"👨‍💼 Admin ID: {settings.ADMIN_ID}")
+    logger.info(f"💾 Database: {settings.MONGODB_DATABASE}")
     
-    # Setup handlers
-    setup_handlers(application)
+    if settings.BOT_MODE == "webhook":
+        from webhook import run_webhook
+        run_webhook()
+        return
     
-    # Register message handler for smart input
-    from handlers.message_handler import message_handler
-    application.add_handler(telegram.ext.MessageHandler(telegram.ext.filters.TEXT & ~telegram.ext.filters.COMMAND, message_handler))
+    # Create application
+    logger.info("📦 Creating bot application...")
+    application = build_application()
     
     # Start bot
     logger.info("🚀 Starting bot polling...")
-    logger.info(f"👨‍💼 Admin ID: {settings.ADMIN_ID}")
-    logger.info(f"💾 Database: {settings.MONGODB_DATABASE}")
-    
     application.run_polling(
-        allowed_updates=["message", "callback_query"]
+        allowed_updates=["message", "callback_query", "inline_query"]
     )
 
 
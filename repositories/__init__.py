@@ -3,11 +3,31 @@ from .episode_repository import EpisodeRepository
 from .mapping_repository import MappingRepository
 from .contribution_repository import ContributionRepository
 from .user_repository import UserRepository
+from .meta_repository import MetaRepository
+from .broadcast_repository import BroadcastRepository
+from .persistence_repository import PersistenceRepository
+from .async_repositories import (
+    AsyncNovelRepository,
+    AsyncEpisodeRepository,
+    AsyncMappingRepository,
+    AsyncContributionRepository,
+    AsyncUserRepository,
+    AsyncBroadcastRepository
+)
 
 __all__ = [
     'NovelRepository',
     'EpisodeRepository',
     'MappingRepository',
     'ContributionRepository',
-    'UserRepository'
+    'UserRepository',
+    'MetaRepository',
+    'BroadcastRepository',
+    'PersistenceRepository',
+    'AsyncNovelRepository',
+    'AsyncEpisodeRepository',
+    'AsyncMappingRepository',
+    'AsyncContributionRepository',
+    'AsyncUserRepository',
+    'AsyncBroadcastRepository'
 ]
@@ -0,0 +1,76 @@
+"""
+Async repositories
+Awaitable versions of the repositories for use inside bot handlers
+"""
+from utils.async_utils import run_blocking
+from .novel_repository import NovelRepository
+from .episode_repository import EpisodeRepository
+from .mapping_repository import MappingRepository
+from .contribution_repository import ContributionRepository
+from .user_repository import UserRepository
+from .broadcast_repository import BroadcastRepository
+
+
+class AsyncRepository:
+    """
+    Async facade over a blocking repository
+    Every public method becomes a coroutine that runs in the thread pool,
+    so concurrent queries share the pymongo connection pool instead of the event loop
+    """
+    
+    def __init__(self, repository):
+        self.sync = repository
+    
+    def __getattr__(self, name):
+        attr = getattr(self.sync, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+        
+        async def call(*args, **kwargs):
+            return await run_blocking(attr, *args, **kwargs)
+        
+        call.__name__ = name
+        call.__doc__ = attr.__doc__
+        return call
+
+
+class AsyncNovelRepository(AsyncRepository):
+    """Async repository for novel chapters"""
+    
+    def __init__(self):
+        super().__init__(NovelRepository())
+
+
+class AsyncEpisodeRepository(AsyncRepository):
+    """Async repository for episodes (both 3D and 2D)"""
+    
+    def __init__(self, episode_type: str):
+        super().__init__(EpisodeRepository(episode_type))
+
+
+class AsyncMappingRepository(AsyncRepository):
+    """Async repository for mappings"""
+    
+    def __init__(self):
+        super().__init__(MappingRepository())
+
+
+class AsyncContributionRepository(AsyncRepository):
+    """Async repository for user contributions"""
+    
+    def __init__(self):
+        super().__init__(ContributionRepository())
+
+
+class AsyncUserRepository(AsyncRepository):
+    """Async repository for users"""
+    
+    def __init__(self):
+        super().__init__(UserRepository())
+
+
+class AsyncBroadcastRepository(AsyncRepository):
+    """Async repository for broadcast jobs"""
+    
+    def __init__(self):
+        super().__init__(BroadcastRepository())
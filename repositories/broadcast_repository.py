@@ -0,0 +1,59 @@
+"""
+Broadcast repository
+Handles database operations for broadcast jobs and their checkpoints
+"""
+from typing import Optional, List
+from database.connection import get_db
+from database.models import BroadcastJob
+from datetime import datetime
+from utils.constants import BROADCAST_STATUS_RUNNING
+
+
+class BroadcastRepository:
+    """Repository for broadcast jobs"""
+    
+    def __init__(self):
+        self.db = get_db()
+        self.collection = self.db.broadcast_jobs
+    
+    def create(self, job: BroadcastJob) -> Optional[BroadcastJob]:
+        """Create a new broadcast job"""
+        try:
+            result = self.collection.insert_one(job.to_dict())
+            job._id = result.inserted_id
+            return job
+        except Exception as e:
+            print(f"Error creating broadcast job: {e}")
+            return None
+    
+    def save_checkpoint(self, job: BroadcastJob) -> bool:
+        """Persist progress so the job can resume after a restart"""
+        try:
+            job.updated_at = datetime.utcnow()
+            self.collection.update_one(
+                {"_id": job._id},
+                {"$set": {
+                    "status": job.status,
+                    "last_user_id": job.last_user_id,
+                    "sent_count": job.sent_count,
+                    "failed_count": job.failed_count,
+                    "blocked_count": job.blocked_count,
+                    "total": job.total,
+                    "status_message_id": job.status_message_id,
+                    "updated_at": job.updated_at,
+                    "finished_at": job.finished_at
+                }}
+            )
+            return True
+        except Exception as e:
+            print(f"Error saving broadcast checkpoint: {e}")
+            return False
+    
+    def find_running(self) -> List[BroadcastJob]:
+        """Find jobs that were interrupted before finishing"""
+        try:
+            cursor = self.collection.find({"status": BROADCAST_STATUS_RUNNING}).sort("created_at", 1)
+            return [BroadcastJob.from_dict(data) for data in cursor]
+        except Exception as e:
+            print(f"Error finding running broadcast jobs: {e}")
+            return []
@@ -2,12 +2,30 @@
 Contribution repository
 Handles database operations for user contributions
 """
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from database.connection import get_db
 from database.models import Contribution
 from datetime import datetime
 from utils.constants import STATUS_PENDING, STATUS_APPROVED, STATUS_REJECTED
+from .meta_repository import MetaRepository
+from .projections import build_projection
+
+# Review queue order (newest first) and the fields its list shows
+PENDING_SORT = [("submitted_at", -1), ("_id", -1)]
+PENDING_LIST_PROJECTION = {"user_id": 1, "username": 1, "contribution_type": 1, "submitted_at": 1, "submitters": 1}
+
+# Outcomes of ContributionRepository.submit
+SUBMIT_CREATED = "created"
+SUBMIT_MERGED = "merged"
+SUBMIT_DUPLICATE = "duplicate"
+
+
+def status_counter(status: str) -> str:
+    """Name of the materialized stats counter for a contribution status"""
+    return f"contributions_{status}"
 
 
 class ContributionRepository:
@@ -22,11 +40,63 @@ class ContributionRepository:
         try:
             result = self.collection.insert_one(contribution.to_dict())
             contribution._id = result.inserted_id
+            MetaRepository().increment_stats({status_counter(contribution.status): 1})
             return contribution
         except Exception as e:
             print(f"Error creating contribution: {e}")
             return None
     
+    def submit(self, contribution: Contribution) -> Tuple[Optional[Contribution], str]:
+        """
+        Insert a pending contribution, or merge the submitter into the pending
+        one with the same fingerprint, in a single upsert on the partial unique
+        (fingerprint) index
+        
+        Returns (contribution, outcome): SUBMIT_CREATED with the new contribution,
+        SUBMIT_MERGED or SUBMIT_DUPLICATE (submitter already listed) with the
+        pending one, (None, "") on error
+        """
+        try:
+            doc = contribution.to_dict()
+            doc["_id"] = doc.get("_id") or ObjectId()
+            for field in ("fingerprint", "status", "submitters"):
+                doc.pop(field, None)
+            
+            # Two tries: losing an insert race to another submitter lands in the except
+            for _ in range(2):
+                try:
+                    previous = self.collection.find_one_and_update(
+                        {
+                            "fingerprint": contribution.fingerprint,
+                            "status": STATUS_PENDING,
+                            "submitters": {"$ne": contribution.user_id}
+                        },
+                        {"$setOnInsert": doc, "$push": {"submitters": contribution.user_id}},
+                        upsert=True,
+                        return_document=ReturnDocument.BEFORE
+                    )
+                except DuplicateKeyError:
+                    # The pending copy exists but already lists this user, or was just inserted
+                    existing = self.collection.find_one(
+                        {"fingerprint": contribution.fingerprint, "status": STATUS_PENDING}
+                    )
+                    if existing and contribution.user_id in existing.get("submitters", []):
+                        return Contribution.from_dict(existing), SUBMIT_DUPLICATE
+                    continue
+                
+                if previous is None:
+                    contribution._id = doc["_id"]
+                    MetaRepository().increment_stats({status_counter(STATUS_PENDING): 1})
+                    return contribution, SUBMIT_CREATED
+                
+                previous.setdefault("submitters", [previous.get("user_id")]).append(contribution.user_id)
+                return Contribution.from_dict(previous), SUBMIT_MERGED
+            
+            return None, ""
+        except Exception as e:
+            print(f"Error submitting contribution: {e}")
+            return None, ""
+    
     def find_by_id(self, contribution_id: str) -> Optional[Contribution]:
         """Find contribution by ID"""
         try:
@@ -38,11 +108,12 @@ class ContributionRepository:
             print(f"Error finding contribution: {e}")
             return None
     
-    def find_pending(self) -> List[Contribution]:
-        """Find all pending contributions"""
+    def find_pending(self, fields: Optional[List[str]] = None) -> List[Contribution]:
+        """Find all pending contributions (only `fields` when given)"""
         try:
             cursor = self.collection.find(
-                {"status": STATUS_PENDING}
+                {"status": STATUS_PENDING},
+                build_projection(fields)
             ).sort("submitted_at", -1)
             
             return [Contribution.from_dict(data) for data in cursor]
@@ -50,6 +121,62 @@ class ContributionRepository:
             print(f"Error finding pending contributions: {e}")
             return []
     
+    def find_by_ids(self, contribution_ids: List[str]) -> List[Contribution]:
+        """Find many contributions by ID in one query (invalid IDs are ignored)"""
+        try:
+            ids = [ObjectId(_id) for _id in contribution_ids if ObjectId.is_valid(_id)]
+            cursor = self.collection.find({"_id": {"$in": ids}}).sort(PENDING_SORT)
+            return [Contribution.from_dict(data) for data in cursor]
+        except Exception as e:
+            print(f"Error finding contributions: {e}")
+            return []
+    
+    def find_pending_by_user(self, user_id: int, contribution_types: Optional[List[str]] = None) -> List[Contribution]:
+        """Find a user's pending contributions, optionally only some types"""
+        try:
+            query = {"status": STATUS_PENDING, "user_id": user_id}
+            if contribution_types:
+                query["contribution_type"] = {"$in": contribution_types}
+            cursor = self.collection.find(query).sort(PENDING_SORT)
+            return [Contribution.from_dict(data) for data in cursor]
+        except Exception as e:
+            print(f"Error finding pending contributions of user {user_id}: {e}")
+            return []
+    
+    def find_pending_page(
+        self,
+        limit: int = 10,
+        after: Optional[Tuple] = None,
+        before: Optional[Tuple] = None
+    ) -> List[Contribution]:
+        """
+        Get one page of the review queue with only the list fields
+        
+        Keyset pagination on the (status, submitted_at, _id) index: `after`/`before`
+        are the (submitted_at, _id) key of the last/first item of the neighbouring
+        page. Results are always in queue order. The `data` field is not loaded.
+        """
+        try:
+            query = {"status": STATUS_PENDING}
+            key = before if before is not None else after
+            if key is not None:
+                op = "$gt" if before is not None else "$lt"
+                submitted_at, _id = key
+                query["$or"] = [
+                    {"submitted_at": {op: submitted_at}},
+                    {"submitted_at": submitted_at, "_id": {op: _id}}
+                ]
+            
+            sort = [(field, 1) for field, _ in PENDING_SORT] if before is not None else PENDING_SORT
+            cursor = self.collection.find(query, PENDING_LIST_PROJECTION).sort(sort).limit(limit)
+            contributions = [Contribution.from_dict(data) for data in cursor]
+            if before is not None:
+                contributions.reverse()
+            return contributions
+        except Exception as e:
+            print(f"Error finding pending contributions page: {e}")
+            return []
+    
     def find_by_user(self, user_id: int) -> List[Contribution]:
         """Find all contributions by a user"""
         try:
@@ -74,21 +201,34 @@ class ContributionRepository:
             print(f"Error finding contributions by status: {e}")
             return []
     
+    def _set_status(self, contribution_id: str, status: str, admin_id: int, note: str) -> bool:
+        """
+        Move a pending contribution to a review status, in one conditional update
+        Returns False if it is gone or was already reviewed (e.g. by a parallel approval)
+        """
+        result = self.collection.update_one(
+            {"_id": ObjectId(contribution_id), "status": STATUS_PENDING},
+            {
+                "$set": {
+                    "status": status,
+                    "reviewed_at": datetime.utcnow(),
+                    "reviewed_by": admin_id,
+                    "admin_note": note
+                }
+            }
+        )
+        if result.modified_count == 0:
+            return False
+        MetaRepository().increment_stats({
+            status_counter(STATUS_PENDING): -1,
+            status_counter(status): 1
+        })
+        return True
+    
     def approve(self, contribution_id: str, admin_id: int, note: str = "") -> bool:
         """Approve a contribution"""
         try:
-            result = self.collection.update_one(
-                {"_id": ObjectId(contribution_id)},
-                {
-                    "$set": {
-                        "status": STATUS_APPROVED,
-                        "reviewed_at": datetime.utcnow(),
-                        "reviewed_by": admin_id,
-                        "admin_note": note
-                    }
-                }
-            )
-            return result.modified_count > 0
+            return self._set_status(contribution_id, STATUS_APPROVED, admin_id, note)
         except Exception as e:
             print(f"Error approving contribution: {e}")
             return False
@@ -96,27 +236,99 @@ class ContributionRepository:
     def reject(self, contribution_id: str, admin_id: int, note: str = "") -> bool:
         """Reject a contribution"""
         try:
-            result = self.collection.update_one(
-                {"_id": ObjectId(contribution_id)},
+            return self._set_status(contribution_id, STATUS_REJECTED, admin_id, note)
+        except Exception as e:
+            print(f"Error rejecting contribution: {e}")
+            return False
+    
+    def bulk_set_status(self, contribution_ids: List, status: str, admin_id: int, note: str = "") -> List[ObjectId]:
+        """
+        Review many pending contributions in one update_many
+        Contributions no longer pending are left alone. Returns the IDs that changed
+        """
+        if not contribution_ids:
+            return []
+        try:
+            ids = [ObjectId(_id) for _id in contribution_ids]
+            reviewed_at = datetime.utcnow()
+            result = self.collection.update_many(
+                {"_id": {"$in": ids}, "status": STATUS_PENDING},
                 {
                     "$set": {
-                        "status": STATUS_REJECTED,
-                        "reviewed_at": datetime.utcnow(),
+                        "status": status,
+                        "reviewed_at": reviewed_at,
                         "reviewed_by": admin_id,
                         "admin_note": note
                     }
                 }
             )
-            return result.modified_count > 0
+            if result.modified_count == 0:
+                return []
+            MetaRepository().increment_stats({
+                status_counter(STATUS_PENDING): -result.modified_count,
+                status_counter(status): result.modified_count
+            })
+            if result.modified_count == len(ids):
+                return ids
+            
+            # Some were reviewed concurrently: ours carry this update's timestamp
+            cursor = self.collection.find(
+                {"_id": {"$in": ids}, "status": status, "reviewed_by": admin_id, "reviewed_at": reviewed_at},
+                {"_id": 1}
+            )
+            return [doc["_id"] for doc in cursor]
         except Exception as e:
-            print(f"Error rejecting contribution: {e}")
-            return False
-    
+            print(f"Error setting contributions to {status}: {e}")
+            return []
+
+    def release(self, contribution_ids: List, admin_id: int) -> int:
+        """
+        Undo approvals whose data could not be applied: back to pending
+        A copy submitted again meanwhile holds the pending fingerprint, then
+        the released one is rejected as merged into it. Returns how many went back
+        """
+        released = 0
+        for _id in contribution_ids:
+            query = {"_id": ObjectId(_id), "status": STATUS_APPROVED, "reviewed_by": admin_id}
+            try:
+                result = self.collection.update_one(
+                    query,
+                    {
+                        "$set": {"status": STATUS_PENDING, "admin_note": ""},
+                        "$unset": {"reviewed_at": "", "reviewed_by": ""}
+                    }
+                )
+                if result.modified_count:
+                    released += 1
+                    MetaRepository().increment_stats({
+                        status_counter(STATUS_APPROVED): -1,
+                        status_counter(STATUS_PENDING): 1
+                    })
+            except DuplicateKeyError:
+                result = self.collection.update_one(
+                    query,
+                    {"$set": {"status": STATUS_REJECTED, "admin_note": "Trùng lặp với cống hiến đang chờ"}}
+                )
+                if result.modified_count:
+                    MetaRepository().increment_stats({
+                        status_counter(STATUS_APPROVED): -1,
+                        status_counter(STATUS_REJECTED): 1
+                    })
+            except Exception as e:
+                print(f"Error releasing contribution {_id}: {e}")
+        return released
+
     def delete(self, contribution_id: str) -> bool:
         """Delete a contribution"""
         try:
-            result = self.collection.delete_one({"_id": ObjectId(contribution_id)})
-            return result.deleted_count > 0
+            deleted = self.collection.find_one_and_delete(
+                {"_id": ObjectId(contribution_id)},
+                projection={"status": 1}
+            )
+            if deleted is None:
+                return False
+            MetaRepository().increment_stats({status_counter(deleted.get("status")): -1})
+            return True
         except Exception as e:
             print(f"Error deleting contribution: {e}")
             return False
@@ -135,8 +347,9 @@ class ContributionRepository:
     
     def get_top_contributors(self, limit: int = 5) -> List[dict]:
         """
-        Get top contributors based on approved contributions
-        Returns list of dicts: {'_id': user_id, 'username': str, 'count': int}
+        Get top contributors based on approved contributions, with their EXP
+        looked up from users in the same aggregation
+        Returns list of dicts: {'_id': user_id, 'username': str, 'count': int, 'exp': int}
         """
         try:
             pipeline = [
@@ -147,10 +360,30 @@ class ContributionRepository:
                     "count": {"$sum": 1}
                 }},
                 {"$sort": {"count": -1}},
-                {"$limit": limit}
+                {"$limit": limit},
+                {"$lookup": {
+                    "from": "users",
+                    "localField": "_id",
+                    "foreignField": "user_id",
+                    "as": "user"
+                }},
+                {"$project": {
+                    "username": 1,
+                    "count": 1,
+                    "exp": {"$ifNull": [{"$arrayElemAt": ["$user.exp", 0]}, 0]}
+                }}
             ]
             
             return list(self.collection.aggregate(pipeline))
         except Exception as e:
             print(f"Error getting top contributors: {e}")
             return []
+    
+    def count_all_by_status(self) -> dict:
+        """Count contributions of every status in one aggregation: {status: count}"""
+        try:
+            pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+            return {doc["_id"]: doc["count"] for doc in self.collection.aggregate(pipeline)}
+        except Exception as e:
+            print(f"Error counting contributions by status: {e}")
+            return {}
@@ -2,10 +2,15 @@
 Episode repository
 Handles database operations for 3D and 2D episodes
 """
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Tuple
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from database.connection import get_db
 from database.models import Episode, Link
 from datetime import datetime
+from .meta_repository import MetaRepository
+from .projections import build_projection
 
 
 class EpisodeRepository:
@@ -28,10 +33,10 @@ class EpisodeRepository:
         else:
             raise ValueError("episode_type must be '3d' or '2d'")
     
-    def find_by_episode_number(self, episode_number: int) -> Optional[Episode]:
-        """Find episode by episode number"""
+    def find_by_episode_number(self, episode_number: int, fields: Optional[List[str]] = None) -> Optional[Episode]:
+        """Find episode by episode number (only `fields` when given)"""
         try:
-            data = self.collection.find_one({"episode_number": episode_number})
+            data = self.collection.find_one({"episode_number": episode_number}, build_projection(fields))
             if data:
                 return Episode.from_dict(data)
             return None
@@ -39,11 +44,21 @@ class EpisodeRepository:
             print(f"Error finding {self.episode_type} episode: {e}")
             return None
     
-    def find_by_episode_numbers(self, episode_numbers: List[int]) -> List[Episode]:
-        """Find multiple episodes by episode numbers"""
+    def find_by_episode_numbers(
+        self,
+        episode_numbers: List[int],
+        links_limit: Optional[int] = None,
+        fields: Optional[List[str]] = None
+    ) -> List[Episode]:
+        """
+        Find multiple episodes by episode numbers
+        links_limit returns only the first N links of each episode ($slice),
+        fields only those fields
+        """
         try:
             cursor = self.collection.find(
-                {"episode_number": {"$in": episode_numbers}}
+                {"episode_number": {"$in": episode_numbers}},
+                build_projection(fields, links_limit)
             ).sort("episode_number", 1)
             
             return [Episode.from_dict(data) for data in cursor]
@@ -51,17 +66,40 @@ class EpisodeRepository:
             print(f"Error finding {self.episode_type} episodes: {e}")
             return []
     
+    def find_all(self, fields: Optional[List[str]] = None) -> List[Episode]:
+        """Find all episodes (only `fields` when given)"""
+        try:
+            cursor = self.collection.find({}, build_projection(fields))
+            return [Episode.from_dict(data) for data in cursor]
+        except Exception as e:
+            print(f"Error finding all {self.episode_type} episodes: {e}")
+            return []
+    
     def create(self, episode: Episode) -> Optional[Episode]:
-        """Create a new episode"""
+        """
+        Create a new episode
+        One insert-only upsert: an existing episode is returned unchanged
+        """
         try:
-            # Check if episode already exists
-            existing = self.find_by_episode_number(episode.episode_number)
+            data = episode.to_dict()
+            data.setdefault("_id", ObjectId())
+            try:
+                existing = self.collection.find_one_and_update(
+                    {"episode_number": episode.episode_number},
+                    {"$setOnInsert": data},
+                    upsert=True,
+                    return_document=ReturnDocument.BEFORE
+                )
+            except DuplicateKeyError:
+                # Inserted concurrently by another writer
+                existing = self.collection.find_one({"episode_number": episode.episode_number})
+            
             if existing:
                 print(f"{self.episode_type.upper()} episode {episode.episode_number} already exists")
-                return existing
+                return Episode.from_dict(existing)
             
-            result = self.collection.insert_one(episode.to_dict())
-            episode._id = result.inserted_id
+            episode._id = data["_id"]
+            MetaRepository().increment_stats({self.collection.name: 1})
             return episode
         except Exception as e:
             print(f"Error creating {self.episode_type} episode: {e}")
@@ -80,44 +118,86 @@ class EpisodeRepository:
             print(f"Error updating {self.episode_type} episode: {e}")
             return False
     
+    def _link_update(self, episode_number: int, link: Link) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Filter and update adding a link unless the episode already has its URL
+        (exact or normalized). Used with upsert=True, a missing episode is created;
+        when the URL is there the upsert hits the unique episode_number index instead
+        """
+        doc = link.to_dict()
+        now = datetime.utcnow()
+        return (
+            {"episode_number": episode_number, "links.url": {"$ne": doc["url"]}, "links.url_key": {"$ne": doc["url_key"]}},
+            {
+                "$addToSet": {"links": doc},
+                "$set": {"updated_at": now},
+                "$setOnInsert": {"title": "", "created_at": now}
+            }
+        )
+    
     def add_link(self, episode_number: int, link: Link) -> bool:
-        """Add a link to an episode"""
+        """
+        Add a link to an episode, creating it if needed, in one atomic upsert
+        Returns True if the link was added (False if the URL is already there)
+        """
         try:
-            # Check if link already exists
-            episode = self.find_by_episode_number(episode_number)
-            if episode:
-                # Check for duplicate URL
-                for existing_link in episode.links:
-                    if existing_link.url == link.url:
-                        print(f"Link already exists for {self.episode_type} episode {episode_number}")
-                        return False
-                
-                # Add new link
-                result = self.collection.update_one(
-                    {"episode_number": episode_number},
-                    {
-                        "$push": {"links": link.to_dict()},
-                        "$set": {"updated_at": datetime.utcnow()}
-                    }
-                )
-                return result.modified_count > 0
-            else:
-                # Create new episode with the link
-                new_episode = Episode(
-                    episode_number=episode_number,
-                    links=[link]
-                )
-                result = self.create(new_episode)
-                return result is not None
-                
+            query, update = self._link_update(episode_number, link)
+            # A duplicate key on the first try can also be a concurrent create of the episode
+            for _ in range(2):
+                try:
+                    result = self.collection.update_one(query, update, upsert=True)
+                except DuplicateKeyError:
+                    continue
+                if result.upserted_id is not None:
+                    MetaRepository().increment_stats({self.collection.name: 1})
+                return result.upserted_id is not None or result.modified_count > 0
+            
+            print(f"Link already exists for {self.episode_type} episode {episode_number}")
+            return False
         except Exception as e:
             print(f"Error adding link to {self.episode_type} episode: {e}")
             return False
     
+    def bulk_add_links(self, links: List[Tuple[int, Link]]) -> List[bool]:
+        """
+        add_link for many (episode_number, link) pairs in one unordered bulk_write
+        Returns, per input pair, whether its link was added (False for a URL
+        the episode already has, or one repeated earlier in the batch)
+        """
+        try:
+            ops = [UpdateOne(*self._link_update(number, link), upsert=True) for number, link in links]
+            added = [True] * len(ops)
+            retry = list(range(len(ops)))
+            
+            # Duplicate keys are retried once, like add_link
+            for attempt in range(2):
+                if not retry:
+                    break
+                indexes, retry = retry, []
+                try:
+                    result = self.collection.bulk_write([ops[i] for i in indexes], ordered=False)
+                    upserted = result.upserted_count
+                except BulkWriteError as e:
+                    upserted = e.details.get("nUpserted", 0)
+                    for error in e.details.get("writeErrors", []):
+                        index = indexes[error["index"]]
+                        if error.get("code") == 11000 and attempt == 0:
+                            retry.append(index)
+                        else:
+                            added[index] = False
+                if upserted:
+                    MetaRepository().increment_stats({self.collection.name: upserted})
+            
+            return added
+        except Exception as e:
+            print(f"Error bulk adding links to {self.episode_type} episodes: {e}")
+            return [False] * len(links)
+    
     def delete_by_episode_number(self, episode_number: int) -> bool:
         """Delete an episode"""
         try:
             result = self.collection.delete_one({"episode_number": episode_number})
+            MetaRepository().increment_stats({self.collection.name: -result.deleted_count})
             return result.deleted_count > 0
         except Exception as e:
             print(f"Error deleting {self.episode_type} episode: {e}")
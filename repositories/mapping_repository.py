@@ -2,10 +2,49 @@
 Mapping repository
 Handles database operations for mappings between novels and episodes
 """
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Tuple
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from database.connection import get_db
-from database.models import Mapping
+from database.models import Mapping, Novel, Episode
 from datetime import datetime
+from .meta_repository import MetaRepository
+from .projections import build_projection
+
+
+# /list order, covered by the (episode_3d, episode_2d, _id) index
+LIST_SORT = [("episode_3d", -1), ("episode_2d", -1), ("_id", -1)]
+
+# Marker for get_mappings_page(before=...) to read the end of the list
+LAST_PAGE = ()
+
+
+def _keyset_filter(key: Tuple, forward: bool) -> Dict[str, Any]:
+    """
+    Filter for the items strictly after (forward) or before a list key
+    in LIST_SORT order. Null episodes sort lowest, as in Mongo.
+    """
+    def beyond(field, value):
+        if forward:
+            if value is None:
+                return None  # nothing sorts below null
+            if field == "_id":
+                return {field: {"$lt": value}}
+            return {"$or": [{field: {"$lt": value}}, {field: None}]}
+        if value is None:
+            return {field: {"$ne": None}}
+        return {field: {"$gt": value}}
+    
+    branches = []
+    equal = {}
+    for (field, _), value in zip(LIST_SORT, key):
+        condition = beyond(field, value)
+        if condition is not None:
+            branches.append({**equal, **condition} if equal else condition)
+        equal[field] = value
+    
+    return {"$or": branches} if branches else {"_id": None}
 
 
 class MappingRepository:
@@ -15,21 +54,57 @@ class MappingRepository:
         self.db = get_db()
         self.collection = self.db.mappings
     
-    def find_by_chapter(self, chapter_number: int) -> List[Mapping]:
-        """Find all mappings that include a specific chapter"""
+    def _max_chapter_span(self) -> Optional[int]:
+        """Widest mapping range, recorded in meta (None if unknown)"""
         try:
-            cursor = self.collection.find(
-                {"novel_chapters": chapter_number}
-            )
-            return [Mapping.from_dict(data) for data in cursor]
+            meta = MetaRepository()
+            span = meta.get_max_chapter_span()
+            if span is None:
+                # Not recorded yet (mappings written by older versions): one full pass
+                docs = list(self.collection.aggregate([
+                    {"$group": {"_id": None, "span": {"$max": {"$subtract": ["$chapter_end", "$chapter_start"]}}}}
+                ]))
+                span = (docs[0].get("span") if docs else None) or 0
+                meta.raise_max_chapter_span(span)
+            return span
+        except Exception as e:
+            print(f"Error getting max chapter span: {e}")
+            return None
+    
+    def _record_spans(self, mappings: List[Mapping]) -> bool:
+        """Raise the recorded widest range before the mappings are written, so readers never miss them"""
+        spans = [m.chapter_end - m.chapter_start for m in mappings if m.chapter_start is not None]
+        return not spans or MetaRepository().raise_max_chapter_span(max(spans))
+    
+    def find_by_chapter(self, chapter_number: int, fields: Optional[List[str]] = None) -> List[Mapping]:
+        """
+        Find all mappings that include a specific chapter
+        Range predicate on the (chapter_start, chapter_end) index. chapter_start
+        is also bounded below by the widest recorded range, so the index scan
+        only covers mappings starting that close to the chapter, not every
+        mapping before it (one extra read of the bound in meta).
+        `fields` must keep the chapter range fields (see MAPPING_VIEW_FIELDS)
+        """
+        try:
+            query = {
+                "chapter_start": {"$lte": chapter_number},
+                "chapter_end": {"$gte": chapter_number}
+            }
+            span = self._max_chapter_span()
+            if span is not None:
+                query["chapter_start"]["$gte"] = chapter_number - span
+            cursor = self.collection.find(query, build_projection(fields))
+            mappings = [Mapping.from_dict(data) for data in cursor]
+            # Ranges with gaps keep an explicit chapter list
+            return [m for m in mappings if m.covers(chapter_number)]
         except Exception as e:
             print(f"Error finding mappings by chapter: {e}")
             return []
     
-    def find_by_episode_3d(self, episode_number: int) -> Optional[Mapping]:
-        """Find mapping by 3D episode number"""
+    def find_by_episode_3d(self, episode_number: int, fields: Optional[List[str]] = None) -> Optional[Mapping]:
+        """Find mapping by 3D episode number (only `fields` when given)"""
         try:
-            data = self.collection.find_one({"episode_3d": episode_number})
+            data = self.collection.find_one({"episode_3d": episode_number}, build_projection(fields))
             if data:
                 return Mapping.from_dict(data)
             return None
@@ -37,10 +112,10 @@ class MappingRepository:
             print(f"Error finding mapping by 3D episode: {e}")
             return None
     
-    def find_by_episode_2d(self, episode_number: int) -> Optional[Mapping]:
-        """Find mapping by 2D episode number"""
+    def find_by_episode_2d(self, episode_number: int, fields: Optional[List[str]] = None) -> Optional[Mapping]:
+        """Find mapping by 2D episode number (only `fields` when given)"""
         try:
-            data = self.collection.find_one({"episode_2d": episode_number})
+            data = self.collection.find_one({"episode_2d": episode_number}, build_projection(fields))
             if data:
                 return Mapping.from_dict(data)
             return None
@@ -48,47 +123,211 @@ class MappingRepository:
             print(f"Error finding mapping by 2D episode: {e}")
             return None
     
+    def find_relations_by_episode(self, episode_type: str, episode_number: int) -> Optional[Dict[str, Any]]:
+        """
+        Resolve a mapping and everything it references in one aggregate pipeline
+        
+        Returns None if no mapping has this episode, otherwise:
+            {"mapping": Mapping, "novels": [Novel], "episode_3d": Episode|None, "episode_2d": Episode|None}
+        """
+        try:
+            field = "episode_3d" if episode_type == "3d" else "episode_2d"
+            pipeline = [
+                {"$match": {field: episode_number}},
+                {"$limit": 1},
+                # Expand the compact range so the lookup can use the chapter_number index
+                {"$addFields": {
+                    "chapters": {"$ifNull": [
+                        "$novel_chapters",
+                        {"$range": ["$chapter_start", {"$add": ["$chapter_end", 1]}]}
+                    ]}
+                }},
+                {"$lookup": {
+                    "from": "novels",
+                    "localField": "chapters",
+                    "foreignField": "chapter_number",
+                    "as": "novels"
+                }},
+                {"$lookup": {
+                    "from": "episodes_3d",
+                    "localField": "episode_3d",
+                    "foreignField": "episode_number",
+                    "as": "episodes_3d"
+                }},
+                {"$lookup": {
+                    "from": "episodes_2d",
+                    "localField": "episode_2d",
+                    "foreignField": "episode_number",
+                    "as": "episodes_2d"
+                }},
+                # Only the fields the search formatter renders
+                {"$project": {
+                    "chapter_start": 1,
+                    "chapter_end": 1,
+                    "novel_chapters": 1,
+                    "episode_3d": 1,
+                    "episode_2d": 1,
+                    "novels.chapter_number": 1,
+                    "novels.title": 1,
+                    "novels.links": 1,
+                    "episodes_3d.episode_number": 1,
+                    "episodes_3d.title": 1,
+                    "episodes_3d.links": 1,
+                    "episodes_2d.episode_number": 1,
+                    "episodes_2d.title": 1,
+                    "episodes_2d.links": 1
+                }}
+            ]
+            
+            docs = list(self.collection.aggregate(pipeline))
+            if not docs:
+                return None
+            
+            data = docs[0]
+            novels = sorted(
+                (Novel.from_dict(n) for n in data.get("novels", [])),
+                key=lambda n: n.chapter_number
+            )
+            episodes_3d = data.get("episodes_3d", [])
+            episodes_2d = data.get("episodes_2d", [])
+            
+            return {
+                "mapping": Mapping.from_dict(data),
+                "novels": novels,
+                "episode_3d": Episode.from_dict(episodes_3d[0]) if episodes_3d else None,
+                "episode_2d": Episode.from_dict(episodes_2d[0]) if episodes_2d else None
+            }
+        except Exception as e:
+            print(f"Error aggregating mapping relations: {e}")
+            return None
+    
+    def _upsert_operation(self, mapping: Mapping) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Filter and update that merge a mapping into the one for its 3D or 2D
+        episode, or insert it (with upsert=True) under a fresh _id
+        """
+        clauses = []
+        fields = {
+            "chapter_start": mapping.chapter_start,
+            "chapter_end": mapping.chapter_end,
+            "updated_at": datetime.utcnow()
+        }
+        on_insert = {"_id": ObjectId(), "created_at": mapping.created_at}
+        for field in ("episode_3d", "episode_2d"):
+            value = getattr(mapping, field)
+            if value:
+                clauses.append({field: value})
+                fields[field] = value
+            else:
+                on_insert[field] = None
+        
+        update = {"$set": fields, "$setOnInsert": on_insert}
+        if mapping.is_contiguous():
+            # Drop a stale explicit list, the range says it all
+            update["$unset"] = {"novel_chapters": ""}
+        else:
+            fields["novel_chapters"] = mapping.novel_chapters
+        
+        return (clauses[0] if len(clauses) == 1 else {"$or": clauses}), update
+    
     def create(self, mapping: Mapping) -> Optional[Mapping]:
-        """Create a new mapping"""
+        """
+        Create a new mapping, or update the one for the same 3D or 2D episode
+        One find_one_and_update with upsert
+        """
         try:
             # Validate that at least one episode is specified
             if not mapping.episode_3d and not mapping.episode_2d:
                 print("Mapping must have at least one episode (3D or 2D)")
                 return None
             
-            # Check for existing mapping to update
-            existing = None
-            if mapping.episode_3d:
-                existing = self.find_by_episode_3d(mapping.episode_3d)
+            if not self._record_spans([mapping]):
+                return None
+            
+            query, update = self._upsert_operation(mapping)
+            # A duplicate key on the first try is a concurrent insert for the same episode,
+            # the retry matches and updates that mapping
+            for attempt in range(2):
+                try:
+                    previous = self.collection.find_one_and_update(
+                        query,
+                        update,
+                        upsert=True,
+                        return_document=ReturnDocument.BEFORE
+                    )
+                    break
+                except DuplicateKeyError:
+                    if attempt:
+                        raise
             
-            if not existing and mapping.episode_2d:
-                existing = self.find_by_episode_2d(mapping.episode_2d)
-                
-            if existing:
-                print(f"Updating existing mapping {existing._id}")
-                # Update fields
+            if previous:
+                print(f"Updated existing mapping {previous['_id']}")
+                existing = Mapping.from_dict(previous)
                 existing.novel_chapters = mapping.novel_chapters
                 if mapping.episode_3d: existing.episode_3d = mapping.episode_3d
                 if mapping.episode_2d: existing.episode_2d = mapping.episode_2d
-                existing.updated_at = datetime.utcnow()
-                
-                self.update(existing._id, existing)
+                existing.updated_at = update["$set"]["updated_at"]
                 return existing
             
-            result = self.collection.insert_one(mapping.to_dict())
-            mapping._id = result.inserted_id
+            mapping._id = update["$setOnInsert"]["_id"]
+            MetaRepository().increment_stats({"mappings": 1})
             return mapping
         except Exception as e:
             print(f"Error creating/updating mapping: {e}")
             return None
     
+    def bulk_upsert(self, mappings: List[Mapping]) -> List[bool]:
+        """
+        create() for many mappings in one ordered bulk_write
+        In order, so a later mapping for the same episode wins.
+        Returns, per input mapping, whether it was applied
+        """
+        applied = [bool(m.episode_3d or m.episode_2d) for m in mappings]
+        indexes = [i for i, valid in enumerate(applied) if valid]
+        if not indexes:
+            return applied
+        try:
+            if not self._record_spans([mappings[i] for i in indexes]):
+                return [False] * len(mappings)
+            ops = {i: UpdateOne(*self._upsert_operation(mappings[i]), upsert=True) for i in indexes}
+            upserted = 0
+            remaining = indexes
+            # Duplicate keys are retried once, like create
+            for attempt in range(2):
+                try:
+                    result = self.collection.bulk_write([ops[i] for i in remaining], ordered=True)
+                    upserted += result.upserted_count
+                    break
+                except BulkWriteError as e:
+                    # Ordered: everything from the failed operation on was not applied
+                    upserted += e.details.get("nUpserted", 0)
+                    error = e.details["writeErrors"][0]
+                    remaining = remaining[error["index"]:]
+                    if error.get("code") == 11000 and attempt == 0:
+                        continue
+                    for i in remaining:
+                        applied[i] = False
+                    break
+            if upserted:
+                MetaRepository().increment_stats({"mappings": upserted})
+            return applied
+        except Exception as e:
+            print(f"Error bulk creating/updating mappings: {e}")
+            return [False] * len(mappings)
+    
     def update(self, mapping_id, mapping: Mapping) -> bool:
         """Update an existing mapping"""
         try:
+            if not self._record_spans([mapping]):
+                return False
             mapping.updated_at = datetime.utcnow()
+            update = {"$set": mapping.to_dict()}
+            if mapping.is_contiguous():
+                # Drop a stale explicit list, the range says it all
+                update["$unset"] = {"novel_chapters": ""}
             result = self.collection.update_one(
                 {"_id": mapping_id},
-                {"$set": mapping.to_dict()}
+                update
             )
             return result.modified_count > 0
         except Exception as e:
@@ -99,34 +338,51 @@ class MappingRepository:
         """Delete a mapping"""
         try:
             result = self.collection.delete_one({"_id": mapping_id})
+            MetaRepository().increment_stats({"mappings": -result.deleted_count})
             return result.deleted_count > 0
         except Exception as e:
             print(f"Error deleting mapping: {e}")
             return False
     
-    def find_all(self) -> List[Mapping]:
-        """Find all mappings"""
+    def find_all(self, fields: Optional[List[str]] = None) -> List[Mapping]:
+        """Find all mappings (only `fields` when given)"""
         try:
-            cursor = self.collection.find()
+            cursor = self.collection.find({}, build_projection(fields))
             return [Mapping.from_dict(data) for data in cursor]
         except Exception as e:
             print(f"Error finding all mappings: {e}")
             return []
             
-    def get_all_mappings_sorted(self, limit: int = 20, offset: int = 0) -> List[Mapping]:
-        """Get all mappings sorted by 3D episode desc"""
+    def get_mappings_page(
+        self,
+        limit: int = 20,
+        after: Optional[Tuple] = None,
+        before: Optional[Tuple] = None,
+        fields: Optional[List[str]] = None
+    ) -> List[Mapping]:
+        """
+        Get one page of mappings sorted by (episode_3d, episode_2d, _id) desc
+        
+        Keyset pagination: `after`/`before` are the (episode_3d, episode_2d, _id)
+        key of the last/first item of the neighbouring page. With neither,
+        returns the first page; `before=LAST_PAGE` returns the last page.
+        Results are always in list order. `fields` limits the returned fields.
+        """
         try:
-            # Sort by episode_3d desc, treating nulls as last (or filtered out if desired, but we want all)
-            # Actually, let's just sort by _id desc as a proxy for recency, 
-            # OR sort by episode_3d using a custom collation if needed. 
-            # Simple sort: episode_3d -1. 
-            cursor = self.collection.find()\
-                .sort([("episode_3d", -1), ("episode_2d", -1)])\
-                .skip(offset)\
-                .limit(limit)
-            return [Mapping.from_dict(data) for data in cursor]
+            if before is not None:
+                query = {} if before is LAST_PAGE else _keyset_filter(before, forward=False)
+                sort = [(field, 1) for field, _ in LIST_SORT]
+            else:
+                query = _keyset_filter(after, forward=True) if after else {}
+                sort = LIST_SORT
+            
+            cursor = self.collection.find(query, build_projection(fields)).sort(sort).limit(limit)
+            mappings = [Mapping.from_dict(data) for data in cursor]
+            if before is not None:
+                mappings.reverse()
+            return mappings
         except Exception as e:
-            print(f"Error getting sorted mappings: {e}")
+            print(f"Error getting mappings page: {e}")
             return []
     
     def count(self) -> int:
@@ -136,3 +392,11 @@ class MappingRepository:
         except Exception as e:
             print(f"Error counting mappings: {e}")
             return 0
+    
+    def estimated_count(self) -> int:
+        """Count total mappings from collection metadata (no scan)"""
+        try:
+            return self.collection.estimated_document_count()
+        except Exception as e:
+            print(f"Error estimating mapping count: {e}")
+            return 0
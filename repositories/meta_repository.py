@@ -0,0 +1,133 @@
+"""
+Meta repository
+Handles shared bot metadata such as the catalog and admin set version
+counters, the materialized statistics counters and the widest mapping range
+"""
+from datetime import datetime
+from typing import Dict, Optional
+from pymongo import ReturnDocument
+from database.connection import get_db
+
+
+CATALOG_VERSION_KEY = "catalog_version"
+ADMIN_VERSION_KEY = "admin_version"
+MAX_CHAPTER_SPAN_KEY = "max_chapter_span"
+STATS_KEY = "stats"
+
+
+class MetaRepository:
+    """Repository for shared metadata documents"""
+    
+    def __init__(self):
+        self.db = get_db()
+        self.collection = self.db.meta
+    
+    def _get_version(self, key: str) -> int:
+        data = self.collection.find_one({"_id": key})
+        return data.get("version", 0) if data else 0
+    
+    def _bump_version(self, key: str) -> int:
+        data = self.collection.find_one_and_update(
+            {"_id": key},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return data.get("version", 0) if data else 0
+    
+    def get_catalog_version(self) -> int:
+        """Get the current catalog version (0 if never bumped)"""
+        try:
+            return self._get_version(CATALOG_VERSION_KEY)
+        except Exception as e:
+            print(f"Error getting catalog version: {e}")
+            return 0
+    
+    def bump_catalog_version(self) -> int:
+        """
+        Increment the catalog version
+        Returns the new version, or 0 on error
+        """
+        try:
+            return self._bump_version(CATALOG_VERSION_KEY)
+        except Exception as e:
+            print(f"Error bumping catalog version: {e}")
+            return 0
+    
+    def get_admin_version(self) -> Optional[int]:
+        """Get the current admin set version (0 if never bumped, None on error)"""
+        try:
+            return self._get_version(ADMIN_VERSION_KEY)
+        except Exception as e:
+            print(f"Error getting admin version: {e}")
+            return None
+    
+    def bump_admin_version(self) -> int:
+        """
+        Increment the admin set version after an admin is added or removed
+        Returns the new version, or 0 on error
+        """
+        try:
+            return self._bump_version(ADMIN_VERSION_KEY)
+        except Exception as e:
+            print(f"Error bumping admin version: {e}")
+            return 0
+    
+    def get_max_chapter_span(self) -> Optional[int]:
+        """Widest chapter_end - chapter_start of any mapping (None if never recorded or on error)"""
+        try:
+            data = self.collection.find_one({"_id": MAX_CHAPTER_SPAN_KEY})
+            return data.get("span") if data else None
+        except Exception as e:
+            print(f"Error getting max chapter span: {e}")
+            return None
+    
+    def raise_max_chapter_span(self, span: int) -> bool:
+        """Record a mapping range width, the stored value only ever grows ($max)"""
+        try:
+            self.collection.update_one(
+                {"_id": MAX_CHAPTER_SPAN_KEY},
+                {"$max": {"span": span}},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            print(f"Error raising max chapter span: {e}")
+            return False
+    
+    def get_stats(self) -> Optional[Dict]:
+        """Get the materialized statistics document (None if never built)"""
+        try:
+            return self.collection.find_one({"_id": STATS_KEY})
+        except Exception as e:
+            print(f"Error getting stats: {e}")
+            return None
+    
+    def increment_stats(self, counters: Dict[str, int]) -> bool:
+        """Apply counter deltas (e.g. {"novels": 1}) to the statistics document"""
+        counters = {key: value for key, value in counters.items() if value}
+        if not counters:
+            return True
+        try:
+            self.collection.update_one(
+                {"_id": STATS_KEY},
+                {"$inc": {f"counters.{key}": value for key, value in counters.items()}},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            print(f"Error incrementing stats: {e}")
+            return False
+    
+    def set_stats(self, counters: Dict[str, int]) -> bool:
+        """Replace all counters after a full recount"""
+        try:
+            self.collection.update_one(
+                {"_id": STATS_KEY},
+                {"$set": {"counters": counters, "rebuilt_at": datetime.utcnow()}},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            print(f"Error setting stats: {e}")
+            return False
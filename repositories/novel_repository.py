@@ -2,10 +2,15 @@
 Novel repository
 Handles database operations for novel chapters
 """
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Tuple
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from database.connection import get_db
 from database.models import Novel, Link
 from datetime import datetime
+from .meta_repository import MetaRepository
+from .projections import build_projection
 
 
 class NovelRepository:
@@ -15,10 +20,10 @@ class NovelRepository:
         self.db = get_db()
         self.collection = self.db.novels
     
-    def find_by_chapter_number(self, chapter_number: int) -> Optional[Novel]:
-        """Find novel chapter by chapter number"""
+    def find_by_chapter_number(self, chapter_number: int, fields: Optional[List[str]] = None) -> Optional[Novel]:
+        """Find novel chapter by chapter number (only `fields` when given)"""
         try:
-            data = self.collection.find_one({"chapter_number": chapter_number})
+            data = self.collection.find_one({"chapter_number": chapter_number}, build_projection(fields))
             if data:
                 return Novel.from_dict(data)
             return None
@@ -26,11 +31,21 @@ class NovelRepository:
             print(f"Error finding novel chapter: {e}")
             return None
     
-    def find_by_chapter_numbers(self, chapter_numbers: List[int]) -> List[Novel]:
-        """Find multiple novel chapters by chapter numbers"""
+    def find_by_chapter_numbers(
+        self,
+        chapter_numbers: List[int],
+        links_limit: Optional[int] = None,
+        fields: Optional[List[str]] = None
+    ) -> List[Novel]:
+        """
+        Find multiple novel chapters by chapter numbers
+        links_limit returns only the first N links of each chapter ($slice),
+        fields only those fields
+        """
         try:
             cursor = self.collection.find(
-                {"chapter_number": {"$in": chapter_numbers}}
+                {"chapter_number": {"$in": chapter_numbers}},
+                build_projection(fields, links_limit)
             ).sort("chapter_number", 1)
             
             return [Novel.from_dict(data) for data in cursor]
@@ -38,17 +53,40 @@ class NovelRepository:
             print(f"Error finding novel chapters: {e}")
             return []
     
+    def find_all(self, fields: Optional[List[str]] = None) -> List[Novel]:
+        """Find all novel chapters (only `fields` when given)"""
+        try:
+            cursor = self.collection.find({}, build_projection(fields))
+            return [Novel.from_dict(data) for data in cursor]
+        except Exception as e:
+            print(f"Error finding all novel chapters: {e}")
+            return []
+    
     def create(self, novel: Novel) -> Optional[Novel]:
-        """Create a new novel chapter"""
+        """
+        Create a new novel chapter
+        One insert-only upsert: an existing novel chapter is returned unchanged
+        """
         try:
-            # Check if chapter already exists
-            existing = self.find_by_chapter_number(novel.chapter_number)
+            data = novel.to_dict()
+            data.setdefault("_id", ObjectId())
+            try:
+                existing = self.collection.find_one_and_update(
+                    {"chapter_number": novel.chapter_number},
+                    {"$setOnInsert": data},
+                    upsert=True,
+                    return_document=ReturnDocument.BEFORE
+                )
+            except DuplicateKeyError:
+                # Inserted concurrently by another writer
+                existing = self.collection.find_one({"chapter_number": novel.chapter_number})
+            
             if existing:
                 print(f"Chapter {novel.chapter_number} already exists")
-                return existing
+                return Novel.from_dict(existing)
             
-            result = self.collection.insert_one(novel.to_dict())
-            novel._id = result.inserted_id
+            novel._id = data["_id"]
+            MetaRepository().increment_stats({"novels": 1})
             return novel
         except Exception as e:
             print(f"Error creating novel chapter: {e}")
@@ -67,44 +105,86 @@ class NovelRepository:
             print(f"Error updating novel chapter: {e}")
             return False
     
+    def _link_update(self, chapter_number: int, link: Link) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Filter and update adding a link unless the chapter already has its URL
+        (exact or normalized). Used with upsert=True, a missing chapter is created;
+        when the URL is there the upsert hits the unique chapter_number index instead
+        """
+        doc = link.to_dict()
+        now = datetime.utcnow()
+        return (
+            {"chapter_number": chapter_number, "links.url": {"$ne": doc["url"]}, "links.url_key": {"$ne": doc["url_key"]}},
+            {
+                "$addToSet": {"links": doc},
+                "$set": {"updated_at": now},
+                "$setOnInsert": {"title": "", "created_at": now}
+            }
+        )
+    
     def add_link(self, chapter_number: int, link: Link) -> bool:
-        """Add a link to a novel chapter"""
+        """
+        Add a link to a novel chapter, creating it if needed, in one atomic upsert
+        Returns True if the link was added (False if the URL is already there)
+        """
         try:
-            # Check if link already exists
-            novel = self.find_by_chapter_number(chapter_number)
-            if novel:
-                # Check for duplicate URL
-                for existing_link in novel.links:
-                    if existing_link.url == link.url:
-                        print(f"Link already exists for chapter {chapter_number}")
-                        return False
-                
-                # Add new link
-                result = self.collection.update_one(
-                    {"chapter_number": chapter_number},
-                    {
-                        "$push": {"links": link.to_dict()},
-                        "$set": {"updated_at": datetime.utcnow()}
-                    }
-                )
-                return result.modified_count > 0
-            else:
-                # Create new chapter with the link
-                new_novel = Novel(
-                    chapter_number=chapter_number,
-                    links=[link]
-                )
-                result = self.create(new_novel)
-                return result is not None
-                
+            query, update = self._link_update(chapter_number, link)
+            # A duplicate key on the first try can also be a concurrent create of the chapter
+            for _ in range(2):
+                try:
+                    result = self.collection.update_one(query, update, upsert=True)
+                except DuplicateKeyError:
+                    continue
+                if result.upserted_id is not None:
+                    MetaRepository().increment_stats({"novels": 1})
+                return result.upserted_id is not None or result.modified_count > 0
+            
+            print(f"Link already exists for chapter {chapter_number}")
+            return False
         except Exception as e:
             print(f"Error adding link to novel chapter: {e}")
             return False
     
+    def bulk_add_links(self, links: List[Tuple[int, Link]]) -> List[bool]:
+        """
+        add_link for many (chapter_number, link) pairs in one unordered bulk_write
+        Returns, per input pair, whether its link was added (False for a URL
+        the chapter already has, or one repeated earlier in the batch)
+        """
+        try:
+            ops = [UpdateOne(*self._link_update(number, link), upsert=True) for number, link in links]
+            added = [True] * len(ops)
+            retry = list(range(len(ops)))
+            
+            # Duplicate keys are retried once, like add_link
+            for attempt in range(2):
+                if not retry:
+                    break
+                indexes, retry = retry, []
+                try:
+                    result = self.collection.bulk_write([ops[i] for i in indexes], ordered=False)
+                    upserted = result.upserted_count
+                except BulkWriteError as e:
+                    upserted = e.details.get("nUpserted", 0)
+                    for error in e.details.get("writeErrors", []):
+                        index = indexes[error["index"]]
+                        if error.get("code") == 11000 and attempt == 0:
+                            retry.append(index)
+                        else:
+                            added[index] = False
+                if upserted:
+                    MetaRepository().increment_stats({"novels": upserted})
+            
+            return added
+        except Exception as e:
+            print(f"Error bulk adding links to novel chapters: {e}")
+            return [False] * len(links)
+    
     def delete_by_chapter_number(self, chapter_number: int) -> bool:
         """Delete a novel chapter"""
         try:
             result = self.collection.delete_one({"chapter_number": chapter_number})
+            MetaRepository().increment_stats({"novels": -result.deleted_count})
             return result.deleted_count > 0
         except Exception as e:
             print(f"Error deleting novel chapter: {e}")
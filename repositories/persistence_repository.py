@@ -0,0 +1,52 @@
+"""
+Persistence repository
+Handles database operations for bot user data and conversation states
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pymongo import ReplaceOne, DeleteOne
+from database.connection import get_db
+
+
+class PersistenceRepository:
+    """Repository for persisted bot state (one document per user / conversation key)"""
+    
+    def __init__(self):
+        self.db = get_db()
+        self.collection = self.db.bot_persistence
+    
+    def load(self, kind: str) -> List[Dict[str, Any]]:
+        """Load every document of a kind ("user_data", "conversation")"""
+        try:
+            return list(self.collection.find({"kind": kind}))
+        except Exception as e:
+            print(f"Error loading persisted {kind}: {e}")
+            return []
+    
+    def get(self, _id: str) -> Optional[Dict[str, Any]]:
+        """Get one stored document by its _id (None if missing or on error)"""
+        try:
+            return self.collection.find_one({"_id": _id})
+        except Exception as e:
+            print(f"Error getting persisted state {_id}: {e}")
+            return None
+    
+    def bulk_save(self, documents: Dict[str, Optional[Dict[str, Any]]]) -> bool:
+        """
+        Write a batch of changes in one unordered bulk_write
+        documents maps _id to the new document, or None to delete it
+        """
+        if not documents:
+            return True
+        try:
+            now = datetime.utcnow()
+            ops = [
+                DeleteOne({"_id": _id}) if doc is None
+                else ReplaceOne({"_id": _id}, dict(doc, updated_at=now), upsert=True)
+                for _id, doc in documents.items()
+            ]
+            self.collection.bulk_write(ops, ordered=False)
+            return True
+        except Exception as e:
+            print(f"Error saving persisted state: {e}")
+            return False
@@ -0,0 +1,32 @@
+"""
+Read projections
+Repository reads accept `fields` (and `links_limit` for link arrays) so
+services fetch only what they render. Models built from partial documents
+are read-only: never pass them to update().
+"""
+from typing import Optional, List, Dict, Any
+
+# Link subfields the bot renders (url_key only matters to writes)
+LINK_FIELDS = ["links.source_name", "links.url"]
+# Enough to check whether a URL is already stored
+LINK_URL_FIELDS = ["links.url"]
+
+NOVEL_VIEW_FIELDS = ["chapter_number", "title"] + LINK_FIELDS
+EPISODE_VIEW_FIELDS = ["episode_number", "title"] + LINK_FIELDS
+MAPPING_VIEW_FIELDS = ["chapter_start", "chapter_end", "novel_chapters", "episode_3d", "episode_2d"]
+
+
+def build_projection(fields: Optional[List[str]] = None, links_limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Mongo projection returning only `fields` (all fields when None) and,
+    with links_limit, only the first N links ($slice)
+    """
+    if fields is None and not links_limit:
+        return None
+
+    projection: Dict[str, Any] = {field: 1 for field in fields or ()}
+    if links_limit:
+        # $slice takes the whole array, links.* paths would collide with it
+        projection = {field: 1 for field in projection if not field.startswith("links.")}
+        projection["links"] = {"$slice": links_limit}
+    return projection
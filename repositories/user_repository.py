@@ -2,11 +2,13 @@
 User Repository
 Handles database operations for users
 """
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 from database.connection import get_db
 from database.models import User
 from datetime import datetime
 from pymongo import UpdateOne
+from .meta_repository import MetaRepository
+from .projections import build_projection
 
 class UserRepository:
     """Repository for user operations"""
@@ -25,20 +27,50 @@ class UserRepository:
             if "_id" in data and data["_id"] is None:
                 del data["_id"]
                 
-            self.collection.update_one(
+            result = self.collection.update_one(
                 {"user_id": user.user_id},
                 {"$set": data},
                 upsert=True
             )
+            if result.upserted_id is not None:
+                MetaRepository().increment_stats({"users": 1})
             return True
         except Exception as e:
             print(f"Error upserting user: {e}")
             return False
             
-    def get_by_id(self, user_id: int) -> Optional[User]:
-        """Get user by Telegram ID"""
+    def bulk_update_activity(self, updates: Dict[int, Dict[str, Any]]) -> bool:
+        """
+        Upsert buffered activity for many users in one unordered bulk_write
+        `updates` maps user_id to the fields to $set (profile, last_active_at)
+        Returns True if successful
+        """
         try:
-            data = self.collection.find_one({"user_id": user_id})
+            now = datetime.utcnow()
+            ops = [
+                UpdateOne(
+                    {"user_id": user_id},
+                    {
+                        # Talking to the bot again means it is no longer blocked
+                        "$set": {**fields, "blocked": False, "updated_at": now},
+                        "$setOnInsert": {"is_admin": False, "exp": 0, "created_at": now}
+                    },
+                    upsert=True
+                )
+                for user_id, fields in updates.items()
+            ]
+            if ops:
+                result = self.collection.bulk_write(ops, ordered=False)
+                MetaRepository().increment_stats({"users": result.upserted_count})
+            return True
+        except Exception as e:
+            print(f"Error writing user activity: {e}")
+            return False
+            
+    def get_by_id(self, user_id: int, fields: Optional[List[str]] = None) -> Optional[User]:
+        """Get user by Telegram ID (only `fields` when given)"""
+        try:
+            data = self.collection.find_one({"user_id": user_id}, build_projection(fields))
             if data:
                 return User.from_dict(data)
             return None
@@ -46,15 +78,62 @@ class UserRepository:
             print(f"Error getting user: {e}")
             return None
             
-    def get_all_users(self) -> List[User]:
-        """Get all users"""
+    def get_all_users(self, fields: Optional[List[str]] = None) -> List[User]:
+        """Get all users (only `fields` when given)"""
         try:
-            cursor = self.collection.find({})
+            cursor = self.collection.find({}, build_projection(fields))
             return [User.from_dict(user) for user in cursor]
         except Exception as e:
             print(f"Error getting all users: {e}")
             return []
             
+    def get_admin_ids(self) -> Optional[List[int]]:
+        """Get Telegram IDs of all admins (None on error)"""
+        try:
+            cursor = self.collection.find({"is_admin": True}, {"user_id": 1, "_id": 0})
+            return [data["user_id"] for data in cursor if "user_id" in data]
+        except Exception as e:
+            print(f"Error getting admin ids: {e}")
+            return None
+            
+    def get_broadcast_recipients(self, after_user_id: Optional[int] = None, limit: int = 100) -> List[int]:
+        """
+        Get the next batch of recipient IDs in user_id order, skipping users
+        who blocked the bot. Keyset read, so a job can resume from any ID.
+        """
+        try:
+            query = {"blocked": {"$ne": True}}
+            if after_user_id is not None:
+                query["user_id"] = {"$gt": after_user_id}
+            cursor = self.collection.find(query, {"user_id": 1, "_id": 0})\
+                .sort("user_id", 1)\
+                .limit(limit)
+            return [data["user_id"] for data in cursor if "user_id" in data]
+        except Exception as e:
+            print(f"Error getting broadcast recipients: {e}")
+            return []
+            
+    def count_broadcast_recipients(self) -> int:
+        """Count users who can receive broadcasts"""
+        try:
+            return self.collection.count_documents({"blocked": {"$ne": True}})
+        except Exception as e:
+            print(f"Error counting broadcast recipients: {e}")
+            return 0
+            
+    def mark_blocked(self, user_ids: List[int]) -> bool:
+        """Mark users who blocked the bot so later broadcasts skip them"""
+        try:
+            if user_ids:
+                self.collection.update_many(
+                    {"user_id": {"$in": user_ids}},
+                    {"$set": {"blocked": True}}
+                )
+            return True
+        except Exception as e:
+            print(f"Error marking blocked users: {e}")
+            return False
+            
     def count(self) -> int:
         """Count total users"""
         try:
@@ -73,6 +152,28 @@ class UserRepository:
             print(f"Error counting active users: {e}")
             return 0
             
+    def count_active_windows(self, windows: Dict[str, datetime]) -> Dict[str, int]:
+        """
+        Count users active since each date in one aggregation
+        Only users inside the widest window are read (last_active_at index)
+        """
+        try:
+            pipeline = [
+                {"$match": {"last_active_at": {"$gte": min(windows.values())}}},
+                {"$group": {
+                    "_id": None,
+                    **{
+                        name: {"$sum": {"$cond": [{"$gte": ["$last_active_at", since]}, 1, 0]}}
+                        for name, since in windows.items()
+                    }
+                }}
+            ]
+            result = next(self.collection.aggregate(pipeline), {})
+            return {name: result.get(name, 0) for name in windows}
+        except Exception as e:
+            print(f"Error counting active users: {e}")
+            return {name: 0 for name in windows}
+            
     def add_exp(self, user_id: int, amount: int) -> bool:
         """
         Add EXP to a user
@@ -87,6 +188,21 @@ class UserRepository:
         except Exception as e:
             print(f"Error adding exp to user {user_id}: {e}")
             return False
+    
+    def bulk_add_exp(self, amounts: Dict[int, int]) -> bool:
+        """Add EXP to many users in one bulk_write: {user_id: amount}"""
+        if not amounts:
+            return True
+        try:
+            self.collection.bulk_write(
+                [UpdateOne({"user_id": user_id}, {"$inc": {"exp": amount}}) for user_id, amount in amounts.items()],
+                ordered=False
+            )
+            return True
+        except Exception as e:
+            print(f"Error bulk adding exp: {e}")
+            return False
+    
     def set_admin(self, user_id: int, is_admin: bool) -> bool:
         """
         Set admin status for a user
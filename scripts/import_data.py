@@ -1,134 +1,190 @@
-
+import argparse
 import json
 import os
 import sys
+from datetime import datetime
 from pathlib import Path
 
 # Add project root to path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from pymongo import UpdateOne
 from database.connection import get_db
-from repositories.episode_repository import EpisodeRepository
-from repositories.novel_repository import NovelRepository
-from database.models import Episode, Novel, Link
+from database.models import Link
+from repositories.meta_repository import MetaRepository
+from services.stats_service import stats_service
 
-def import_3d_data():
-    """Import 3D episodes from JSON"""
-    json_path = "tien_nghich_3d.json"
-    if not os.path.exists(json_path):
-        print(f"File not found: {json_path}")
-        return
+BATCH_SIZE = 1000
+CHUNK_SIZE = 1 << 16
 
-    print(f"Reading {json_path}...")
+
+def iter_json_array(json_path, chunk_size=CHUNK_SIZE):
+    """
+    Yield the items of a top-level JSON array one by one
+    Reads the file in chunks instead of loading it whole with json.load
+    """
+    decoder = json.JSONDecoder()
     with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+        buffer = ""
+        eof = False
+        started = False
 
-    repo = EpisodeRepository(episode_type="3d")
-    count = 0
-    updated = 0
-    
-    print(f"Found {len(data)} items. Starting import...")
-    
-    for item in data:
-        number = item.get('number')
-        url = item.get('url')
-        
-        if not number or not url:
-            continue
-            
-        # Check if episode exists
-        existing = repo.find_by_episode_number(number)
-        
-        if existing:
-            # Check if link exists
-            has_link = False
-            if existing.links:
-                for link in existing.links:
-                    if link.url == url:
-                        has_link = True
-                        break
-            
-            if not has_link:
-                # Add link
-                repo.add_link(number, Link(url=url, source_name="Tram3D"))
-                updated += 1
-                print(f"Updated 3D Episode {number}")
-        else:
-            # Create new
-            episode = Episode(
-                episode_number=number,
-                title=f"Tập {number}",
-                links=[Link(url=url, source_name="Tram3D")]
-            )
-            repo.create(episode)
-            count += 1
-            print(f"Created 3D Episode {number}")
+        while True:
+            buffer = buffer.lstrip()
+            if not started and buffer:
+                if buffer[0] != '[':
+                    raise ValueError(f"{json_path}: expected a JSON array")
+                buffer = buffer[1:].lstrip()
+                started = True
+            if started and buffer.startswith(','):
+                buffer = buffer[1:].lstrip()
+            if started and buffer.startswith(']'):
+                return
 
-    print(f"3D Import finished: {count} created, {updated} updated.")
+            if started and buffer:
+                try:
+                    item, end = decoder.raw_decode(buffer)
+                    rest = buffer[end:].lstrip()
+                    # Only a following "," or "]" proves the item is whole: a number
+                    # cut by the chunk boundary ("45" of "456", "3." of "3.25") decodes too
+                    if rest[:1] in (",", "]"):
+                        yield item
+                        buffer = rest
+                        continue
+                    if rest and eof:
+                        raise ValueError(f"{json_path}: expected ',' or ']' after an item")
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    # Item cut by the chunk boundary, read more
 
+            if eof:
+                raise ValueError(f"{json_path}: unexpected end of file")
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer += chunk
 
-def import_chapter_data():
-    """Import novel chapters from JSON"""
-    json_path = "tien_nghich_chapters.json"
+
+def load_existing_urls(collection, number_field):
+    """One projected scan: number -> set of link URLs already stored"""
+    existing = {}
+    for doc in collection.find({}, {number_field: 1, "links.url": 1, "_id": 0}):
+        number = doc.get(number_field)
+        if number is None:
+            continue
+        existing[number] = {link.get("url") for link in doc.get("links", [])}
+    return existing
+
+
+def import_links(collection, number_field, json_path, source_name, label, title_for, dry_run=False):
+    """
+    Diff a JSON file of {number, url[, title]} items against a collection
+    and apply the new links as batched unordered bulk_write upserts
+    Returns the number of documents created or updated (0 on a dry run)
+    """
     if not os.path.exists(json_path):
         print(f"File not found: {json_path}")
-        return
+        return 0
 
-    print(f"Reading {json_path}...")
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    print(f"Scanning existing {label} links...")
+    existing = load_existing_urls(collection, number_field)
+    print(f"Found {len(existing)} existing {label} entries.")
 
-    repo = NovelRepository()
-    count = 0
+    ops = []
+    created = 0
     updated = 0
-    
-    print(f"Found {len(data)} items. Starting import...")
-    
-    for item in data:
+    unchanged = 0
+    skipped = 0
+    now = datetime.utcnow()
+
+    def flush():
+        if ops and not dry_run:
+            collection.bulk_write(ops, ordered=False)
+        ops.clear()
+
+    print(f"Reading {json_path}...")
+    for item in iter_json_array(json_path):
         number = item.get('number')
         url = item.get('url')
-        title = item.get('title', '')
-        
+
         if not number or not url:
+            skipped += 1
+            continue
+
+        urls = existing.get(number)
+        if urls is not None and url in urls:
+            unchanged += 1
             continue
-            
-        # Check if chapter exists
-        existing = repo.find_by_chapter_number(number)
-        
-        if existing:
-            # Check if link exists
-            has_link = False
-            if existing.links:
-                for link in existing.links:
-                    if link.url == url:
-                        has_link = True
-                        break
-            
-            if not has_link:
-                repo.add_link(number, Link(url=url, source_name="TruyenFull"))
-                updated += 1
-                # print(f"Updated Chapter {number}")
+
+        if urls is None:
+            created += 1
+            existing[number] = {url}
+            if dry_run:
+                print(f"+ {label} {number}: {url}")
         else:
-            # Create new
-            novel = Novel(
-                chapter_number=number,
-                title=title,
-                links=[Link(url=url, source_name="TruyenFull")]
-            )
-            repo.create(novel)
-            count += 1
-            # print(f"Created Chapter {number}")
-            
-        if count % 100 == 0:
-            print(f"Processed {count} chapters...")
-
-    print(f"Chapter Import finished: {count} created, {updated} updated.")
+            updated += 1
+            urls.add(url)
+            if dry_run:
+                print(f"~ {label} {number}: + {url}")
+
+        ops.append(UpdateOne(
+            {number_field: number},
+            {
+                "$addToSet": {"links": Link(url=url, source_name=source_name).to_dict()},
+                "$set": {"updated_at": now},
+                "$setOnInsert": {"title": title_for(item), "created_at": now}
+            },
+            upsert=True
+        ))
+        if len(ops) >= BATCH_SIZE:
+            flush()
+            print(f"Processed {created + updated} changes...")
+
+    flush()
+
+    prefix = "[dry-run] " if dry_run else ""
+    print(
+        f"{prefix}{label} import finished: {created} created, {updated} updated, "
+        f"{unchanged} unchanged, {skipped} skipped."
+    )
+    return 0 if dry_run else created + updated
+
+
+def import_3d_data(db, json_path="tien_nghich_3d.json", dry_run=False):
+    """Import 3D episodes from JSON"""
+    return import_links(
+        db.episodes_3d, "episode_number", json_path, "Tram3D", "3D Episode",
+        lambda item: f"Tập {item.get('number')}", dry_run
+    )
+
+
+def import_chapter_data(db, json_path="tien_nghich_chapters.json", dry_run=False):
+    """Import novel chapters from JSON"""
+    return import_links(
+        db.novels, "chapter_number", json_path, "TruyenFull", "Chapter",
+        lambda item: item.get('title', ''), dry_run
+    )
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import 3D episodes and novel chapters from JSON")
+    parser.add_argument("--dry-run", action="store_true", help="Print the diff without writing")
+    parser.add_argument("--3d-file", dest="file_3d", default="tien_nghich_3d.json")
+    parser.add_argument("--chapters-file", dest="file_chapters", default="tien_nghich_chapters.json")
+    args = parser.parse_args()
+
     db = get_db()
     print("Database connected.")
-    
-    import_3d_data()
-    import_chapter_data()
-    
+
+    changes = import_3d_data(db, args.file_3d, args.dry_run)
+    changes += import_chapter_data(db, args.file_chapters, args.dry_run)
+
+    if changes:
+        # Running bots reload their catalog and inline index on the version bump,
+        # the stats counters are recounted since these writes bypass the repositories
+        version = MetaRepository().bump_catalog_version()
+        stats_service.rebuild()
+        print(f"Catalog version bumped to {version}, stats counters rebuilt.")
+
     print("Import completed.")
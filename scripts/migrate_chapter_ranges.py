@@ -0,0 +1,73 @@
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from pymongo import UpdateOne
+from database.connection import get_db
+from database.models import Mapping
+from repositories.meta_repository import MetaRepository
+
+BATCH_SIZE = 500
+
+
+def migrate_chapter_ranges():
+    """
+    Convert mappings from an expanded novel_chapters list to the compact
+    [chapter_start, chapter_end] range. Lists with gaps are kept alongside the range.
+    Safe to run more than once.
+    """
+    db = get_db()
+    collection = db.mappings
+
+    cursor = collection.find(
+        {"novel_chapters": {"$exists": True}},
+        {"novel_chapters": 1}
+    )
+
+    ops = []
+    converted = 0
+    kept = 0
+    max_span = 0
+    meta = MetaRepository()
+
+    for data in cursor:
+        mapping = Mapping(novel_chapters=data.get("novel_chapters") or [])
+        update = {"$set": {
+            "chapter_start": mapping.chapter_start,
+            "chapter_end": mapping.chapter_end
+        }}
+        if mapping.is_contiguous():
+            update["$unset"] = {"novel_chapters": ""}
+            converted += 1
+        else:
+            kept += 1
+
+        ops.append(UpdateOne({"_id": data["_id"]}, update))
+        if mapping.chapter_start is not None:
+            max_span = max(max_span, mapping.chapter_end - mapping.chapter_start)
+        if len(ops) >= BATCH_SIZE:
+            # The find_by_chapter bound must cover the ranges before they are written
+            meta.raise_max_chapter_span(max_span)
+            collection.bulk_write(ops, ordered=False)
+            ops = []
+
+    if ops:
+        meta.raise_max_chapter_span(max_span)
+        collection.bulk_write(ops, ordered=False)
+
+    print(f"✅ {converted} mappings converted to ranges, {kept} kept an explicit list (gaps).")
+
+    # The multikey index is replaced by the (chapter_start, chapter_end) index
+    if "novel_chapters_1" in collection.index_information():
+        collection.drop_index("novel_chapters_1")
+        print("🗑️ Dropped index novel_chapters_1")
+    collection.create_index([("chapter_start", 1), ("chapter_end", 1)])
+    print("✅ Index (chapter_start, chapter_end) ready")
+
+
+if __name__ == "__main__":
+    print("🚀 MAPPING CHAPTER RANGE MIGRATION")
+    print("--------------------------------")
+    migrate_chapter_ranges()
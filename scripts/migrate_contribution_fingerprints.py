@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from pymongo import UpdateOne
+from database.connection import get_db
+from repositories.contribution_repository import ContributionRepository
+from services.contribution_service import contribution_fingerprint
+from utils.constants import STATUS_PENDING, STATUS_REJECTED
+
+BATCH_SIZE = 500
+MERGED_NOTE = "Trùng lặp, đã gộp vào {}"
+
+
+def migrate_contribution_fingerprints():
+    """
+    Give pending contributions stored before fingerprints existed their
+    fingerprint and submitters list. Pending duplicates are merged into one:
+    the keeper collects every submitter and the rest are rejected, so the
+    partial unique index can be built. Safe to run more than once.
+    """
+    db = get_db()
+    collection = db.contributions
+
+    cursor = collection.find(
+        {"status": STATUS_PENDING},
+        {"user_id": 1, "contribution_type": 1, "data": 1, "fingerprint": 1, "submitters": 1}
+    ).sort([("submitted_at", 1), ("_id", 1)])
+
+    groups = {}
+    for data in cursor:
+        fingerprint = data.get("fingerprint") or contribution_fingerprint(data.get("contribution_type"), data.get("data", {}))
+        groups.setdefault(fingerprint, []).append(data)
+
+    ops = []
+    rejected = {}
+    for fingerprint, docs in groups.items():
+        # Keep the one already fingerprinted (submitted after the upgrade), else the oldest
+        keeper = next((doc for doc in docs if doc.get("fingerprint")), docs[0])
+
+        submitters = []
+        for doc in docs:
+            for user_id in doc.get("submitters") or [doc.get("user_id")]:
+                if user_id not in submitters:
+                    submitters.append(user_id)
+
+        for doc in docs:
+            if doc is not keeper:
+                rejected.setdefault(keeper["_id"], []).append(doc["_id"])
+
+        if keeper.get("fingerprint") != fingerprint or keeper.get("submitters") != submitters:
+            ops.append(UpdateOne(
+                {"_id": keeper["_id"]},
+                {"$set": {"fingerprint": fingerprint, "submitters": submitters}}
+            ))
+
+    # Reject the merged copies (stats counters move with them)
+    repo = ContributionRepository()
+    merged = 0
+    for keeper_id, ids in rejected.items():
+        merged += len(repo.bulk_set_status(ids, STATUS_REJECTED, 0, MERGED_NOTE.format(keeper_id)))
+
+    for i in range(0, len(ops), BATCH_SIZE):
+        collection.bulk_write(ops[i:i + BATCH_SIZE], ordered=False)
+
+    print(f"✅ {len(ops)} pending contributions fingerprinted, {merged} duplicates merged and rejected.")
+
+    collection.create_index(
+        "fingerprint",
+        unique=True,
+        partialFilterExpression={"status": STATUS_PENDING, "fingerprint": {"$exists": True}}
+    )
+    print("✅ Index (fingerprint, pending only) ready")
+
+
+if __name__ == "__main__":
+    print("🚀 CONTRIBUTION FINGERPRINT MIGRATION")
+    print("-------------------------------------")
+    migrate_contribution_fingerprints()
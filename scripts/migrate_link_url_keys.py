@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from pymongo import UpdateOne
+from database.connection import get_db
+from utils.validators import normalize_url
+
+BATCH_SIZE = 500
+COLLECTIONS = ["novels", "episodes_3d", "episodes_2d"]
+
+
+def migrate_link_url_keys():
+    """
+    Give links stored before url_key existed their normalized URL, so the
+    duplicate check of add_link also catches variants of old URLs
+    ("www.", trailing slash, fragment). Safe to run more than once.
+    """
+    db = get_db()
+
+    for name in COLLECTIONS:
+        collection = db[name]
+        cursor = collection.find(
+            {"links": {"$elemMatch": {"url_key": {"$exists": False}}}},
+            {"links": 1}
+        )
+
+        ops = []
+        links_updated = 0
+        for data in cursor:
+            query = {"_id": data["_id"]}
+            keys = {}
+            for i, link in enumerate(data.get("links", [])):
+                # Only write while each link is still at the position it was read from
+                query[f"links.{i}.url"] = link.get("url")
+                if "url_key" not in link:
+                    keys[f"links.{i}.url_key"] = normalize_url(link.get("url", ""))
+            ops.append(UpdateOne(query, {"$set": keys}))
+            links_updated += len(keys)
+
+        for i in range(0, len(ops), BATCH_SIZE):
+            collection.bulk_write(ops[i:i + BATCH_SIZE], ordered=False)
+
+        print(f"✅ {name}: {links_updated} links in {len(ops)} documents given a url_key.")
+
+
+if __name__ == "__main__":
+    print("🚀 LINK URL KEY MIGRATION")
+    print("-------------------------")
+    migrate_link_url_keys()
@@ -0,0 +1,65 @@
+import sys
+import json
+import time
+import argparse
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.settings import settings
+
+
+def load_updates(path):
+    """A JSON array of updates, or one update per line"""
+    text = Path(path).read_text(encoding="utf-8").strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def post_updates(updates, url, secret=None):
+    """
+    POST recorded Telegram updates to the webhook endpoint, like Telegram would
+    Returns a {status: count} summary
+    """
+    statuses = {}
+    started = time.monotonic()
+
+    for update in updates:
+        request = urllib.request.Request(
+            url,
+            data=json.dumps(update).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        if secret:
+            request.add_header("X-Telegram-Bot-Api-Secret-Token", secret)
+
+        try:
+            with urllib.request.urlopen(request, timeout=10) as res:
+                status = res.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        statuses[status] = statuses.get(status, 0) + 1
+
+    elapsed = time.monotonic() - started
+    rate = len(updates) / elapsed if elapsed > 0 else 0.0
+    print(f"📨 Posted {len(updates)} updates in {elapsed:.2f}s ({rate:.0f}/s): {statuses}")
+    return statuses
+
+
+if __name__ == "__main__":
+    default_url = f"http://127.0.0.1:{settings.WEBHOOK_PORT}{settings.WEBHOOK_PATH}"
+
+    parser = argparse.ArgumentParser(description="Replay recorded Telegram updates against the local webhook")
+    parser.add_argument("file", help="JSON array of updates or JSON lines")
+    parser.add_argument("--url", default=default_url)
+    parser.add_argument("--secret", default=settings.WEBHOOK_SECRET)
+    parser.add_argument("--repeat", type=int, default=1, help="Post the whole file this many times")
+    args = parser.parse_args()
+
+    updates = load_updates(args.file) * args.repeat
+    post_updates(updates, args.url, args.secret)
@@ -1,26 +1,33 @@
 import requests
 from bs4 import BeautifulSoup
-import time
+import argparse
+import asyncio
+import hashlib
 import json
+import os
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
 
-BASE_URL = "https://truyenfull.vision/tien-nghich"
+BASE_URL = os.getenv("TIENNGHICH_BASE_URL", "https://truyenfull.vision/tien-nghich")
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"
 }
+OUTPUT_FILE = "tien_nghich_chapters.json"
+CACHE_DIR = ".crawl_cache"
 
 all_chapters = []
 
-def crawl_page(page: int):
+
+def page_url(page: int, base_url: str = None) -> str:
+    base_url = base_url or BASE_URL
     if page == 1:
-        url = f"{BASE_URL}/#list-chapter"
-    else:
-        url = f"{BASE_URL}/trang-{page}/#list-chapter"
+        return f"{base_url}/#list-chapter"
+    return f"{base_url}/trang-{page}/#list-chapter"
 
-    print(f"🔎 Crawling: {url}")
-    res = requests.get(url, headers=HEADERS, timeout=15)
-    res.raise_for_status()
 
-    soup = BeautifulSoup(res.text, "html.parser")
+def parse_chapters(html: str):
+    soup = BeautifulSoup(html, "html.parser")
     items = soup.select("#list-chapter ul.list-chapter li a")
 
     chapters = []
@@ -47,12 +54,26 @@ def crawl_page(page: int):
 
     return chapters
 
-def get_total_pages():
-    res = requests.get(f"{BASE_URL}/#list-chapter", headers=HEADERS, timeout=15)
-    soup = BeautifulSoup(res.text, "html.parser")
+
+def parse_total_pages(html: str) -> int:
+    soup = BeautifulSoup(html, "html.parser")
     total_page_input = soup.select_one("#total-page")
     return int(total_page_input["value"])
 
+
+def crawl_page(page: int):
+    url = page_url(page)
+
+    print(f"🔎 Crawling: {url}")
+    res = requests.get(url, headers=HEADERS, timeout=15)
+    res.raise_for_status()
+
+    return parse_chapters(res.text)
+
+def get_total_pages():
+    res = requests.get(f"{BASE_URL}/#list-chapter", headers=HEADERS, timeout=15)
+    return parse_total_pages(res.text)
+
 def main():
     total_pages = get_total_pages()
     print(f"📘 Tổng số trang: {total_pages}")
@@ -66,11 +87,199 @@ def main():
     all_chapters.sort(key=lambda x: x["number"])
 
     # Lưu ra file JSON
-    with open("tien_nghich_chapters.json", "w", encoding="utf-8") as f:
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
         json.dump(all_chapters, f, ensure_ascii=False, indent=2)
 
     print(f"✅ Đã crawl xong {len(all_chapters)} chương")
-    print("📁 File lưu: tien_nghich_chapters.json")
+    print(f"📁 File lưu: {OUTPUT_FILE}")
+
+
+# ASYNC INCREMENTAL CRAWLER
+
+class ResponseCache:
+    """On-disk cache of page bodies with their ETag / Last-Modified validators"""
+
+    def __init__(self, cache_dir: str = CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url: str) -> Path:
+        return self.cache_dir / (hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url: str):
+        path = self._path(url)
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except ValueError:
+            return None
+
+    def put(self, url: str, body: str, etag, last_modified):
+        entry = {"url": url, "etag": etag, "last_modified": last_modified, "body": body}
+        self._path(url).write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+
+
+class HostThrottle:
+    """
+    Per-host concurrency limit and adaptive delay between requests
+    The delay doubles on 429/503 (or follows Retry-After) and decays back on success
+    """
+
+    def __init__(self, concurrency: int, min_delay: float, max_delay: float = 30.0):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.delay = min_delay
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait_turn(self):
+        async with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_at)
+            self._next_at = start_at + self.delay
+        await asyncio.sleep(start_at - now)
+
+    def slow_down(self, retry_after=None):
+        self.delay = min(self.max_delay, max(self.delay * 2, self.min_delay or 0.5))
+        if retry_after:
+            self._next_at = max(self._next_at, time.monotonic() + retry_after)
+
+    def speed_up(self):
+        self.delay = max(self.min_delay, self.delay * 0.9)
+
+
+class AsyncCrawler:
+    """Fetches listing pages concurrently with conditional requests"""
+
+    MAX_ATTEMPTS = 5
+
+    def __init__(self, client, cache: ResponseCache, concurrency: int, delay: float):
+        self.client = client
+        self.cache = cache
+        self.concurrency = concurrency
+        self.delay = delay
+        self.throttles = {}
+        self.stats = {"fetched": 0, "not_modified": 0, "retries": 0}
+
+    def _throttle(self, url: str) -> HostThrottle:
+        host = urlsplit(url).netloc
+        if host not in self.throttles:
+            self.throttles[host] = HostThrottle(self.concurrency, self.delay)
+        return self.throttles[host]
+
+    async def fetch(self, url: str) -> str:
+        throttle = self._throttle(url)
+        cached = self.cache.get(url)
+
+        headers = dict(HEADERS)
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        async with throttle.semaphore:
+            for _ in range(self.MAX_ATTEMPTS):
+                await throttle.wait_turn()
+                res = await self.client.get(url, headers=headers)
+
+                if res.status_code in (429, 503):
+                    retry_after = res.headers.get("Retry-After")
+                    throttle.slow_down(float(retry_after) if retry_after and retry_after.isdigit() else None)
+                    self.stats["retries"] += 1
+                    continue
+
+                throttle.speed_up()
+                if res.status_code == 304 and cached:
+                    self.stats["not_modified"] += 1
+                    return cached["body"]
+
+                res.raise_for_status()
+                self.stats["fetched"] += 1
+                self.cache.put(url, res.text, res.headers.get("ETag"), res.headers.get("Last-Modified"))
+                return res.text
+
+        raise RuntimeError(f"Gave up on {url} after {self.MAX_ATTEMPTS} attempts")
+
+
+def load_chapters(path: str):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def merge_chapters(existing, crawled):
+    """Merge by chapter number, freshly crawled entries win"""
+    by_number = {item["number"]: item for item in existing}
+    for item in crawled:
+        by_number[item["number"]] = item
+    return [by_number[n] for n in sorted(by_number)]
+
+
+async def crawl_async(base_url: str, output: str, concurrency: int, delay: float, cache_dir: str, full: bool):
+    import httpx
+
+    existing = load_chapters(output)
+    last_known = max((item["number"] for item in existing), default=0)
+
+    async with httpx.AsyncClient(timeout=15, follow_redirects=True) as client:
+        crawler = AsyncCrawler(client, ResponseCache(cache_dir), concurrency, delay)
+
+        first_html = await crawler.fetch(page_url(1, base_url))
+        total_pages = parse_total_pages(first_html)
+        first_page = parse_chapters(first_html)
+        print(f"📘 Tổng số trang: {total_pages}")
+
+        # Listing pages are in chapter order, skip the ones fully known
+        per_page = len(first_page) or 1
+        start_page = 1 if full else max(1, last_known // per_page + 1)
+        pages = [p for p in range(max(2, start_page), total_pages + 1)]
+        print(f"🔎 Crawling pages {start_page}..{total_pages} (last known chapter: {last_known})")
+
+        async def crawl(page: int):
+            html = await crawler.fetch(page_url(page, base_url))
+            return parse_chapters(html)
+
+        results = await asyncio.gather(*(crawl(p) for p in pages))
+
+    crawled = [c for c in first_page if full or c["number"] > last_known]
+    for chapters in results:
+        crawled.extend(chapters)
+
+    merged = merge_chapters(existing, crawled)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(merged, f, ensure_ascii=False, indent=2)
+
+    new_count = len(merged) - len(existing)
+    print(
+        f"✅ {len(pages) + 1} trang ({crawler.stats['fetched']} tải mới, "
+        f"{crawler.stats['not_modified']} không đổi, {crawler.stats['retries']} thử lại)"
+    )
+    print(f"✅ {new_count} chương mới, tổng {len(merged)} chương")
+    print(f"📁 File lưu: {output}")
+
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Crawl Tiên Nghịch chapter list")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Concurrent incremental crawl with conditional requests")
+    parser.add_argument("--base-url", default=BASE_URL,
+                        help="Listing base URL (e.g. a local server with fixture pages)")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--concurrency", type=int, default=4, help="Max parallel requests per host")
+    parser.add_argument("--delay", type=float, default=0.2, help="Initial delay between requests per host")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--full", action="store_true", help="Re-crawl every page (async mode)")
+    args = parser.parse_args()
+
+    if args.use_async:
+        asyncio.run(crawl_async(
+            args.base_url.rstrip("/"), args.output, args.concurrency,
+            args.delay, args.cache_dir, args.full
+        ))
+    else:
+        BASE_URL = args.base_url.rstrip("/")
+        OUTPUT_FILE = args.output
+        main()
@@ -1,11 +1,32 @@
+from .catalog_service import CatalogService, catalog_service
+from .chapter_index_service import ChapterIndexService, chapter_index_service
+from .activity_service import ActivityBuffer, activity_buffer
+from .permission_service import PermissionService, permission_service
+from .stats_service import StatsService, stats_service
 from .search_service import SearchService
 from .contribution_service import ContributionService
 from .admin_service import AdminService
 from .user_service import UserService
+from .broadcast_service import BroadcastService, broadcast_service
+from .persistence_service import MongoPersistence, mongo_persistence
 
 __all__ = [
+    'CatalogService',
+    'catalog_service',
+    'ChapterIndexService',
+    'chapter_index_service',
+    'ActivityBuffer',
+    'activity_buffer',
+    'PermissionService',
+    'permission_service',
+    'StatsService',
+    'stats_service',
     'SearchService',
     'ContributionService',
     'AdminService',
-    'UserService'
+    'UserService',
+    'BroadcastService',
+    'broadcast_service',
+    'MongoPersistence',
+    'mongo_persistence'
 ]
@@ -0,0 +1,118 @@
+"""
+Activity service
+Write-behind buffer for user activity tracking
+"""
+import time
+import asyncio
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+from repositories.user_repository import UserRepository
+from config.settings import settings
+from utils.async_utils import run_blocking
+
+
+class ActivityBuffer:
+    """
+    Collects last_active_at and profile changes in memory and writes them
+    periodically as one unordered bulk_write of upserts
+    
+    A user is recorded at most once per throttle window, unless their
+    profile (username, first/last name) changed.
+    """
+    
+    def __init__(self, throttle_seconds: int = 60, flush_interval: int = 5):
+        self.throttle_seconds = throttle_seconds
+        self.flush_interval = flush_interval
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._last_seen: Dict[int, tuple] = {}  # user_id -> (monotonic time, profile)
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._user_repo = None
+    
+    @property
+    def user_repo(self) -> UserRepository:
+        if self._user_repo is None:
+            self._user_repo = UserRepository()
+        return self._user_repo
+    
+    def record(self, telegram_user) -> bool:
+        """
+        Buffer a user interaction (never touches the database)
+        Returns True if the interaction was recorded, False if throttled
+        """
+        profile = (
+            telegram_user.username or "",
+            telegram_user.first_name or "",
+            telegram_user.last_name or ""
+        )
+        now = time.monotonic()
+        
+        with self._lock:
+            last = self._last_seen.get(telegram_user.id)
+            if last and last[1] == profile and now - last[0] < self.throttle_seconds:
+                return False
+            
+            self._last_seen[telegram_user.id] = (now, profile)
+            self._pending[telegram_user.id] = {
+                "username": profile[0],
+                "first_name": profile[1],
+                "last_name": profile[2],
+                "last_active_at": datetime.utcnow()
+            }
+            return True
+    
+    def flush(self) -> int:
+        """
+        Write buffered activity to the database
+        Returns the number of users written
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            
+            # Forget users outside the throttle window so the map stays small
+            cutoff = time.monotonic() - self.throttle_seconds
+            self._last_seen = {
+                user_id: seen for user_id, seen in self._last_seen.items() if seen[0] >= cutoff
+            }
+        
+        if not pending:
+            return 0
+        
+        if self.user_repo.bulk_update_activity(pending):
+            return len(pending)
+        
+        # Put the batch back for the next flush, newer records win
+        with self._lock:
+            for user_id, update in pending.items():
+                self._pending.setdefault(user_id, update)
+        return 0
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await run_blocking(self.flush)
+            except Exception as e:
+                print(f"Error flushing activity buffer: {e}")
+    
+    def start(self):
+        """Start the periodic flush task (call from the running event loop)"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def stop(self):
+        """Stop the periodic flush and drain the buffer"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        
+        await run_blocking(self.flush)
+
+
+# Create singleton instance
+activity_buffer = ActivityBuffer(settings.ACTIVITY_THROTTLE_SECONDS, settings.ACTIVITY_FLUSH_INTERVAL)
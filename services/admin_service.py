@@ -7,10 +7,14 @@ from repositories import (
     EpisodeRepository,
     MappingRepository,
     ContributionRepository,
-    UserRepository
+    UserRepository,
+    AsyncNovelRepository,
+    AsyncEpisodeRepository,
+    AsyncMappingRepository,
+    AsyncContributionRepository,
+    AsyncUserRepository
 )
-from datetime import datetime, timedelta
-from utils.constants import STATUS_PENDING
+from services.stats_service import stats_service
 
 
 class AdminService:
@@ -23,35 +27,22 @@ class AdminService:
         self.mapping_repo = MappingRepository()
         self.contribution_repo = ContributionRepository()
         self.user_repo = UserRepository()
+        
+        # Async repositories for use from bot handlers
+        self.async_novel_repo = AsyncNovelRepository()
+        self.async_episode_3d_repo = AsyncEpisodeRepository("3d")
+        self.async_episode_2d_repo = AsyncEpisodeRepository("2d")
+        self.async_mapping_repo = AsyncMappingRepository()
+        self.async_contribution_repo = AsyncContributionRepository()
+        self.async_user_repo = AsyncUserRepository()
     
     def get_statistics(self) -> dict:
-        """Get database statistics"""
-        try:
-            now = datetime.utcnow()
-            today_start = datetime(now.year, now.month, now.day)
-            week_ago = now - timedelta(days=7)
-            month_ago = now - timedelta(days=30)
-            
-            stats = {
-                "total_novels": self.novel_repo.count(),
-                "total_episodes_3d": self.episode_3d_repo.count(),
-                "total_episodes_2d": self.episode_2d_repo.count(),
-                "total_mappings": self.mapping_repo.count(),
-                "pending_contributions": self.contribution_repo.count_pending(),
-                
-                # User stats
-                "total_users": self.user_repo.count(),
-                "active_today": self.user_repo.count_active_since(today_start),
-                "active_week": self.user_repo.count_active_since(week_ago),
-                "active_month": self.user_repo.count_active_since(month_ago),
-                
-                # Leaderboard
-                "top_contributors": self.contribution_repo.get_top_contributors(5)
-            }
-            return stats
-        except Exception as e:
-            print(f"Error getting statistics: {e}")
-            return {}
+        """Get database statistics (materialized counters, short-TTL cache)"""
+        return stats_service.get()
+    
+    async def get_statistics_async(self) -> dict:
+        """Async version of get_statistics"""
+        return await stats_service.get_async()
     
     def get_pending_count(self) -> int:
         """Get count of pending contributions"""
@@ -60,3 +51,11 @@ class AdminService:
         except Exception as e:
             print(f"Error getting pending count: {e}")
             return 0
+    
+    async def get_pending_count_async(self) -> int:
+        """Async version of get_pending_count"""
+        try:
+            return await self.async_contribution_repo.count_pending()
+        except Exception as e:
+            print(f"Error getting pending count: {e}")
+            return 0
@@ -0,0 +1,227 @@
+"""
+Broadcast service
+Rate-limited, resumable broadcast jobs
+"""
+import time
+import asyncio
+from datetime import datetime
+from typing import Optional, Set
+from telegram.error import RetryAfter, Forbidden, BadRequest
+from repositories import AsyncBroadcastRepository, AsyncUserRepository
+from database.models import BroadcastJob
+from config.settings import settings
+from utils.constants import BROADCAST_STATUS_COMPLETED
+from utils.formatters import format_broadcast_progress
+
+
+# Outcome of one send
+SEND_OK = "sent"
+SEND_FAILED = "failed"
+SEND_BLOCKED = "blocked"
+
+# Attempts per recipient when Telegram answers with a flood wait
+MAX_SEND_ATTEMPTS = 3
+
+
+def _retry_after_seconds(error: RetryAfter) -> float:
+    retry_after = error.retry_after
+    # int in PTB 20, timedelta in newer versions
+    if hasattr(retry_after, "total_seconds"):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+class TokenBucket:
+    """
+    Async token bucket shared by all concurrent senders of a job
+    The default capacity of one token spaces sends evenly (no bursts).
+    pause() empties the bucket for a flood wait, so every sender backs off
+    """
+    
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+    
+    def pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+
+class BroadcastService:
+    """
+    Runs broadcast jobs in the background
+    
+    Recipients are read in user_id order in batches. Sends run concurrently
+    under a token bucket (Telegram allows ~30 msg/s per bot), and the job
+    checkpoints the last user_id after every batch so it can resume after a
+    restart. Users who blocked the bot are marked and skipped next time.
+    """
+    
+    def __init__(self):
+        self._tasks: Set[asyncio.Task] = set()
+        self._broadcast_repo = None
+        self._user_repo = None
+    
+    @property
+    def broadcast_repo(self) -> AsyncBroadcastRepository:
+        # Created on first use: the singleton is built when services is imported
+        if self._broadcast_repo is None:
+            self._broadcast_repo = AsyncBroadcastRepository()
+        return self._broadcast_repo
+    
+    @property
+    def user_repo(self) -> AsyncUserRepository:
+        if self._user_repo is None:
+            self._user_repo = AsyncUserRepository()
+        return self._user_repo
+    
+    async def count_recipients(self) -> int:
+        return await self.user_repo.count_broadcast_recipients()
+    
+    async def start_job(self, bot, text: str, admin_chat_id: int, status_message_id: Optional[int] = None) -> Optional[BroadcastJob]:
+        """Create a job and start sending in the background"""
+        job = BroadcastJob(
+            text=text,
+            admin_chat_id=admin_chat_id,
+            total=await self.count_recipients(),
+            status_message_id=status_message_id
+        )
+        job = await self.broadcast_repo.create(job)
+        if job:
+            self._spawn(bot, job)
+        return job
+    
+    async def resume_jobs(self, bot) -> int:
+        """Resume jobs interrupted by a restart, returns how many"""
+        jobs = await self.broadcast_repo.find_running()
+        for job in jobs:
+            self._spawn(bot, job)
+        return len(jobs)
+    
+    async def stop(self):
+        """Cancel running jobs, their last checkpoint is kept for resume"""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def _spawn(self, bot, job: BroadcastJob):
+        task = asyncio.get_running_loop().create_task(self.run(bot, job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def run(self, bot, job: BroadcastJob):
+        """Send a job to every remaining recipient"""
+        bucket = TokenBucket(settings.BROADCAST_RATE_LIMIT)
+        semaphore = asyncio.Semaphore(settings.BROADCAST_CONCURRENCY)
+        
+        started = time.monotonic()
+        processed_at_start = job.processed_count
+        last_report = 0.0
+        
+        def throughput() -> float:
+            elapsed = time.monotonic() - started
+            return (job.processed_count - processed_at_start) / elapsed if elapsed > 0 else 0.0
+        
+        try:
+            while True:
+                batch = await self.user_repo.get_broadcast_recipients(job.last_user_id, settings.BROADCAST_BATCH_SIZE)
+                if not batch:
+                    break
+                
+                results = await asyncio.gather(
+                    *(self._send(bot, bucket, semaphore, user_id, job.text) for user_id in batch)
+                )
+                
+                blocked = [user_id for user_id, result in zip(batch, results) if result == SEND_BLOCKED]
+                if blocked:
+                    await self.user_repo.mark_blocked(blocked)
+                
+                job.sent_count += results.count(SEND_OK)
+                job.failed_count += results.count(SEND_FAILED)
+                job.blocked_count += len(blocked)
+                job.last_user_id = batch[-1]
+                await self.broadcast_repo.save_checkpoint(job)
+                
+                if time.monotonic() - last_report >= settings.BROADCAST_PROGRESS_INTERVAL:
+                    last_report = time.monotonic()
+                    await self._report(bot, job, throughput())
+            
+            job.status = BROADCAST_STATUS_COMPLETED
+            job.finished_at = datetime.utcnow()
+            await self.broadcast_repo.save_checkpoint(job)
+            await self._report(bot, job, throughput())
+            
+            try:
+                await bot.send_message(
+                    chat_id=job.admin_chat_id,
+                    text=format_broadcast_progress(job, throughput()),
+                    parse_mode='Markdown'
+                )
+            except Exception as e:
+                print(f"Error sending broadcast result: {e}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Left as running, resumes from the last checkpoint on restart
+            print(f"Error running broadcast job {job._id}: {e}")
+    
+    async def _send(self, bot, bucket: TokenBucket, semaphore: asyncio.Semaphore, user_id: int, text: str) -> str:
+        async with semaphore:
+            for _ in range(MAX_SEND_ATTEMPTS):
+                await bucket.acquire()
+                try:
+                    await bot.send_message(chat_id=user_id, text=text, parse_mode='Markdown')
+                    return SEND_OK
+                except RetryAfter as e:
+                    bucket.pause(_retry_after_seconds(e))
+                except Forbidden:
+                    # Bot blocked or user deactivated
+                    return SEND_BLOCKED
+                except BadRequest as e:
+                    if "chat not found" in str(e).lower():
+                        return SEND_BLOCKED
+                    print(f"Failed to send to {user_id}: {e}")
+                    return SEND_FAILED
+                except Exception as e:
+                    print(f"Failed to send to {user_id}: {e}")
+                    return SEND_FAILED
+            return SEND_FAILED
+    
+    async def _report(self, bot, job: BroadcastJob, rate: float):
+        """Edit the admin's status message with live progress"""
+        if not job.status_message_id:
+            return
+        try:
+            await bot.edit_message_text(
+                chat_id=job.admin_chat_id,
+                message_id=job.status_message_id,
+                text=format_broadcast_progress(job, rate),
+                parse_mode='Markdown'
+            )
+        except Exception:
+            pass  # Message not modified
+
+
+# Create singleton instance
+broadcast_service = BroadcastService()
@@ -0,0 +1,303 @@
+"""
+Catalog service
+In-memory copy of novels, episodes and mappings for zero-I/O lookups
+"""
+import time
+import bisect
+import threading
+from typing import Dict, List, Optional, Tuple
+from repositories import (
+    NovelRepository,
+    EpisodeRepository,
+    MappingRepository,
+    MetaRepository
+)
+from repositories.mapping_repository import LAST_PAGE
+from repositories.projections import NOVEL_VIEW_FIELDS, EPISODE_VIEW_FIELDS, MAPPING_VIEW_FIELDS
+from database.models import Novel, Episode, Mapping, Contribution
+from config.settings import settings
+from utils.constants import (
+    CONTRIBUTION_TYPE_MAPPING,
+    CONTRIBUTION_TYPE_NOVEL_LINK,
+    CONTRIBUTION_TYPE_EPISODE_3D_LINK,
+    CONTRIBUTION_TYPE_EPISODE_2D_LINK
+)
+
+
+def _list_sort_key(key: Tuple):
+    """
+    Ascending sort key for an (episode_3d, episode_2d, _id) list key
+    Same order as Mongo, where nulls sort lowest
+    """
+    episode_3d, episode_2d, _id = key
+    return (
+        episode_3d is not None, episode_3d or 0,
+        episode_2d is not None, episode_2d or 0,
+        str(_id)
+    )
+
+
+def _mapping_sort_key(mapping: Mapping):
+    return _list_sort_key((mapping.episode_3d, mapping.episode_2d, mapping._id))
+
+
+class ChapterIntervalIndex:
+    """
+    Answers "which mappings cover chapter N" with one binary search
+    
+    The chapter axis is cut at every range boundary into disjoint segments,
+    each holding the mappings that cover it. Size depends on the number of
+    mappings, not on how many chapters their ranges span.
+    """
+    
+    def __init__(self, mappings: List[Mapping]):
+        events: Dict[int, List[tuple]] = {}
+        for position, mapping in enumerate(mappings):
+            if mapping.chapter_start is None:
+                continue
+            events.setdefault(mapping.chapter_start, []).append((position, True))
+            events.setdefault(mapping.chapter_end + 1, []).append((position, False))
+        
+        self._bounds: List[int] = []
+        self._segments: List[List[Mapping]] = []
+        
+        active = set()
+        for bound in sorted(events):
+            for position, opens in events[bound]:
+                if opens:
+                    active.add(position)
+                else:
+                    active.discard(position)
+            self._bounds.append(bound)
+            # Keep the stored order of mappings, like a Mongo find would
+            self._segments.append([mappings[p] for p in sorted(active)])
+    
+    def find(self, chapter_number: int) -> List[Mapping]:
+        i = bisect.bisect_right(self._bounds, chapter_number) - 1
+        if i < 0:
+            return []
+        return [m for m in self._segments[i] if m.covers(chapter_number)]
+
+
+class CatalogSnapshot:
+    """Immutable set of indexed catalog data, swapped as a whole on reload"""
+    
+    def __init__(
+        self,
+        novels: Dict[int, Novel],
+        episodes_3d: Dict[int, Episode],
+        episodes_2d: Dict[int, Episode],
+        mappings: List[Mapping]
+    ):
+        self.novels = novels
+        self.episodes_3d = episodes_3d
+        self.episodes_2d = episodes_2d
+        self.mappings = mappings
+        
+        self.by_chapter = ChapterIntervalIndex(mappings)
+        self.by_episode_3d: Dict[int, Mapping] = {}
+        self.by_episode_2d: Dict[int, Mapping] = {}
+        
+        for mapping in mappings:
+            # Keep the first match, like find_one would
+            if mapping.episode_3d and mapping.episode_3d not in self.by_episode_3d:
+                self.by_episode_3d[mapping.episode_3d] = mapping
+            if mapping.episode_2d and mapping.episode_2d not in self.by_episode_2d:
+                self.by_episode_2d[mapping.episode_2d] = mapping
+        
+        # /list order is descending, kept ascending here for bisect
+        self.list_ascending = sorted(mappings, key=_mapping_sort_key)
+        self.list_keys = [_mapping_sort_key(m) for m in self.list_ascending]
+
+
+class CatalogService:
+    """
+    In-memory catalog engine
+    Loaded once at startup and reloaded when the shared catalog version changes
+    """
+    
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self._stale = False
+        self.version = 0
+    
+    @property
+    def loaded(self) -> bool:
+        return self._snapshot is not None
+    
+    def is_enabled(self) -> bool:
+        """True when the catalog is enabled and ready to answer lookups"""
+        if not settings.CATALOG_CACHE_ENABLED:
+            return False
+        if not self.loaded:
+            return False
+        self.ensure_fresh()
+        return self.loaded
+    
+    def load(self) -> bool:
+        """Load the whole catalog from the database"""
+        try:
+            with self._lock:
+                version = MetaRepository().get_catalog_version()
+                
+                # Only the fields lookups render (no timestamps, no url_key)
+                novels = {n.chapter_number: n for n in NovelRepository().find_all(NOVEL_VIEW_FIELDS)}
+                episodes_3d = {e.episode_number: e for e in EpisodeRepository("3d").find_all(EPISODE_VIEW_FIELDS)}
+                episodes_2d = {e.episode_number: e for e in EpisodeRepository("2d").find_all(EPISODE_VIEW_FIELDS)}
+                mappings = MappingRepository().find_all(MAPPING_VIEW_FIELDS)
+                
+                self._snapshot = CatalogSnapshot(novels, episodes_3d, episodes_2d, mappings)
+                self.version = version
+                self._stale = False
+                self._last_check = time.monotonic()
+            
+            print(
+                f"✅ Catalog loaded (v{version}): {len(novels)} chapters, "
+                f"{len(episodes_3d)} 3D, {len(episodes_2d)} 2D, {len(mappings)} mappings"
+            )
+            return True
+        except Exception as e:
+            print(f"Error loading catalog: {e}")
+            return False
+    
+    def check_due(self) -> bool:
+        """True when the next lookup should re-check the shared version"""
+        return self._stale or time.monotonic() - self._last_check >= settings.CATALOG_VERSION_CHECK_INTERVAL
+    
+    def ensure_fresh(self):
+        """
+        Pick up version bumps from other processes (throttled)
+        Reloads the data if the catalog is loaded, otherwise only tracks the version
+        """
+        if not self.check_due():
+            return
+        
+        self._last_check = time.monotonic()
+        try:
+            current = MetaRepository().get_catalog_version()
+        except Exception as e:
+            print(f"Error checking catalog version: {e}")
+            return
+        
+        if self._stale or current != self.version:
+            if self.loaded:
+                self.load()
+            else:
+                self.version = current
+                self._stale = False
+    
+    def on_contribution_applied(self, contribution: Contribution):
+        """
+        Patch the catalog after an approved contribution changed the data
+        and bump the shared version so other processes reload
+        """
+        self.on_contributions_applied([contribution])
+    
+    def on_contributions_applied(self, contributions: List[Contribution]):
+        """Same as on_contribution_applied for a batch, with a single version bump"""
+        if not contributions:
+            return
+        try:
+            new_version = MetaRepository().bump_catalog_version()
+            
+            if self.loaded:
+                self._patch(contributions)
+            
+            if new_version == self.version + 1:
+                self.version = new_version
+            else:
+                # Another process changed the catalog meanwhile
+                self._stale = True
+        except Exception as e:
+            print(f"Error refreshing catalog: {e}")
+            self._stale = True
+    
+    def _patch(self, contributions: List[Contribution]):
+        """Re-read only the documents touched by the contributions (one query per collection)"""
+        targets = {}
+        for contribution in contributions:
+            targets.setdefault(contribution.contribution_type, set()).add(contribution.data.get("target_number"))
+        
+        with self._lock:
+            snapshot = self._snapshot
+            novels = snapshot.novels
+            episodes_3d = snapshot.episodes_3d
+            episodes_2d = snapshot.episodes_2d
+            mappings = snapshot.mappings
+            
+            if CONTRIBUTION_TYPE_MAPPING in targets:
+                mappings = MappingRepository().find_all(MAPPING_VIEW_FIELDS)
+            
+            numbers = list(targets.get(CONTRIBUTION_TYPE_NOVEL_LINK, ()))
+            if numbers:
+                novels = dict(novels)
+                for novel in NovelRepository().find_by_chapter_numbers(numbers, fields=NOVEL_VIEW_FIELDS):
+                    novels[novel.chapter_number] = novel
+            
+            numbers = list(targets.get(CONTRIBUTION_TYPE_EPISODE_3D_LINK, ()))
+            if numbers:
+                episodes_3d = dict(episodes_3d)
+                for episode in EpisodeRepository("3d").find_by_episode_numbers(numbers, fields=EPISODE_VIEW_FIELDS):
+                    episodes_3d[episode.episode_number] = episode
+            
+            numbers = list(targets.get(CONTRIBUTION_TYPE_EPISODE_2D_LINK, ()))
+            if numbers:
+                episodes_2d = dict(episodes_2d)
+                for episode in EpisodeRepository("2d").find_by_episode_numbers(numbers, fields=EPISODE_VIEW_FIELDS):
+                    episodes_2d[episode.episode_number] = episode
+            
+            self._snapshot = CatalogSnapshot(novels, episodes_3d, episodes_2d, mappings)
+    
+    # Lookups (callers must check is_enabled() first)
+    
+    def get_novel(self, chapter_number: int) -> Optional[Novel]:
+        return self._snapshot.novels.get(chapter_number)
+    
+    def get_novels(self, chapter_numbers: List[int]) -> List[Novel]:
+        novels = self._snapshot.novels
+        return [novels[n] for n in sorted(set(chapter_numbers)) if n in novels]
+    
+    def get_episode(self, episode_type: str, episode_number: int) -> Optional[Episode]:
+        episodes = self._snapshot.episodes_3d if episode_type == "3d" else self._snapshot.episodes_2d
+        return episodes.get(episode_number)
+    
+    def get_episodes(self, episode_type: str, episode_numbers: List[int]) -> List[Episode]:
+        episodes = self._snapshot.episodes_3d if episode_type == "3d" else self._snapshot.episodes_2d
+        return [episodes[n] for n in sorted(set(episode_numbers)) if n in episodes]
+    
+    def find_mappings_by_chapter(self, chapter_number: int) -> List[Mapping]:
+        return self._snapshot.by_chapter.find(chapter_number)
+    
+    def find_mapping_by_episode_3d(self, episode_number: int) -> Optional[Mapping]:
+        return self._snapshot.by_episode_3d.get(episode_number)
+    
+    def find_mapping_by_episode_2d(self, episode_number: int) -> Optional[Mapping]:
+        return self._snapshot.by_episode_2d.get(episode_number)
+    
+    def get_mappings_page(
+        self,
+        limit: int = 20,
+        after: Optional[Tuple] = None,
+        before: Optional[Tuple] = None
+    ) -> List[Mapping]:
+        """Same contract as MappingRepository.get_mappings_page"""
+        snapshot = self._snapshot
+        ascending = snapshot.list_ascending
+        
+        if before is not None:
+            start = 0 if before is LAST_PAGE else bisect.bisect_right(snapshot.list_keys, _list_sort_key(before))
+            page = ascending[start:start + limit]
+        else:
+            end = bisect.bisect_left(snapshot.list_keys, _list_sort_key(after)) if after else len(ascending)
+            page = ascending[max(0, end - limit):end]
+        
+        return page[::-1]
+    
+    def count_mappings(self) -> int:
+        return len(self._snapshot.mappings)
+
+
+# Create singleton instance
+catalog_service = CatalogService()
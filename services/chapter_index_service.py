@@ -0,0 +1,159 @@
+"""
+Chapter index service
+In-memory prefix index over chapter numbers and titles for inline queries
+"""
+import time
+import bisect
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from repositories import NovelRepository, MetaRepository
+from repositories.projections import NOVEL_VIEW_FIELDS
+from database.models import Novel
+from config.settings import settings
+from utils.validators import fold_text
+
+# Most matches kept per query (Telegram pages through them with offsets)
+MAX_MATCHES = 200
+
+# Folded words users put before a chapter number ("chuong 12", "c12")
+NUMBER_PREFIXES = ("chuong", "chap", "ch", "c")
+
+
+def _title_keys(title: str) -> List[str]:
+    """Folded title from each word on: "ly huong" -> ["ly huong", "huong"]"""
+    words = fold_text(title).split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def _number_query(folded: str) -> Optional[str]:
+    """Digits of a chapter number query ("123", "chuong 12", "c12"), else None"""
+    for prefix in NUMBER_PREFIXES:
+        if folded.startswith(prefix) and folded[len(prefix):].strip().isdigit():
+            return folded[len(prefix):].strip()
+    return folded if folded.isdigit() else None
+
+
+def _prefix_range(keys: List[str], prefix: str) -> Tuple[int, int]:
+    """Slice of the sorted keys that start with prefix"""
+    start = bisect.bisect_left(keys, prefix)
+    # U+FFFF sorts after every character used in folded text
+    return start, bisect.bisect_right(keys, prefix + "\uffff", start)
+
+
+class ChapterIndexService:
+    """
+    Chapters by number prefix and diacritic-folded title prefix
+    
+    Built from the novels collection (titles seeded from tien_nghich_chapters.json)
+    and rebuilt when the shared catalog version changes. Lookups are a bisect
+    over sorted keys; results are kept per folded query in a small LRU.
+    """
+    
+    def __init__(self, cache_size: int = 2000):
+        self.cache_size = cache_size
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._novels: Dict[int, Novel] = {}
+        self._number_keys: List[str] = []
+        self._number_values: List[int] = []
+        self._title_keys: List[str] = []
+        self._title_values: List[int] = []
+        self._cache: "OrderedDict[str, Tuple[int, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+    
+    @property
+    def loaded(self) -> bool:
+        return self.version is not None
+    
+    def load(self) -> bool:
+        """Build the index from the database"""
+        try:
+            version = MetaRepository().get_catalog_version()
+            novels = {n.chapter_number: n for n in NovelRepository().find_all(NOVEL_VIEW_FIELDS)}
+            
+            numbers = sorted((str(number), number) for number in novels)
+            titles = sorted(
+                (key, novel.chapter_number)
+                for novel in novels.values() if novel.title
+                for key in _title_keys(novel.title)
+            )
+            
+            with self._lock:
+                self._novels = novels
+                self._number_keys = [key for key, _ in numbers]
+                self._number_values = [number for _, number in numbers]
+                self._title_keys = [key for key, _ in titles]
+                self._title_values = [number for _, number in titles]
+                self._cache.clear()
+                self.version = version
+                self._last_check = time.monotonic()
+            
+            print(f"✅ Chapter index built (v{version}): {len(novels)} chapters, {len(titles)} title keys")
+            return True
+        except Exception as e:
+            print(f"Error building chapter index: {e}")
+            return False
+    
+    def check_due(self) -> bool:
+        """True when the next lookup should re-check the shared version"""
+        return time.monotonic() - self._last_check >= settings.CATALOG_VERSION_CHECK_INTERVAL
+    
+    def ensure_fresh(self):
+        """Build the index, or rebuild it after a catalog version bump (throttled)"""
+        if not self.loaded:
+            self.load()
+            return
+        if not self.check_due():
+            return
+        
+        self._last_check = time.monotonic()
+        try:
+            current = MetaRepository().get_catalog_version()
+        except Exception as e:
+            print(f"Error checking catalog version: {e}")
+            return
+        if current != self.version:
+            self.load()
+    
+    def _match(self, folded: str) -> Tuple[int, ...]:
+        if not folded:
+            return tuple(sorted(self._novels)[:MAX_MATCHES])
+        
+        digits = _number_query(folded)
+        if digits is not None:
+            start, end = _prefix_range(self._number_keys, digits)
+            # Numeric order: "12" itself before "120".."129"
+            return tuple(sorted(self._number_values[start:end])[:MAX_MATCHES])
+        
+        start, end = _prefix_range(self._title_keys, folded)
+        # A chapter can match through several of its words
+        return tuple(sorted(set(self._title_values[start:end]))[:MAX_MATCHES])
+    
+    def search(self, query: str) -> Tuple[int, ...]:
+        """Chapter numbers matching a number or title prefix, in chapter order"""
+        folded = fold_text(query)
+        with self._lock:
+            matches = self._cache.get(folded)
+            if matches is not None:
+                self._cache.move_to_end(folded)
+                self.hits += 1
+                return matches
+            
+            self.misses += 1
+            matches = self._match(folded)
+            self._cache[folded] = matches
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return matches
+    
+    def get_novels(self, chapter_numbers) -> List[Novel]:
+        """Indexed chapters for the given numbers (titles and links)"""
+        novels = self._novels
+        return [novels[number] for number in chapter_numbers if number in novels]
+
+
+# Create singleton instance
+chapter_index_service = ChapterIndexService(cache_size=settings.INLINE_CACHE_SIZE)
@@ -2,16 +2,68 @@
 Contribution service
 Business logic for handling user contributions
 """
-from typing import Optional, Tuple
+import hashlib
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
 from repositories import (
     ContributionRepository,
     MappingRepository,
     NovelRepository,
-    EpisodeRepository
+    EpisodeRepository,
+    UserRepository
 )
+from repositories.contribution_repository import SUBMIT_CREATED, SUBMIT_MERGED
+from repositories.projections import LINK_URL_FIELDS
 from database.models import Contribution, Mapping, Link
 from utils.constants import *
-from datetime import datetime
+from services.catalog_service import catalog_service
+from services.stats_service import stats_service
+from utils.render_cache import render_cache, contribution_cache_tags
+from utils.validators import normalize_url
+from datetime import datetime, timedelta
+from bson import ObjectId
+
+
+EPOCH = datetime(1970, 1, 1)
+
+# Link contribution type -> episode type of the repository it is applied to
+LINK_EPISODE_TYPES = {
+    CONTRIBUTION_TYPE_EPISODE_3D_LINK: "3d",
+    CONTRIBUTION_TYPE_EPISODE_2D_LINK: "2d"
+}
+
+
+def encode_pending_cursor(contribution: Contribution) -> str:
+    """Compact queue key for callback data: <submitted_at ms>.<_id>"""
+    millis = (contribution.submitted_at - EPOCH) // timedelta(milliseconds=1)
+    return f"{millis}.{contribution._id}"
+
+
+def decode_pending_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Inverse of encode_pending_cursor, raises ValueError if malformed"""
+    millis, _id = cursor.split(".")
+    if not ObjectId.is_valid(_id):
+        raise ValueError(f"Invalid contribution id in cursor: {_id}")
+    return EPOCH + timedelta(milliseconds=int(millis)), ObjectId(_id)
+
+
+def contribution_fingerprint(contribution_type: str, data: dict) -> str:
+    """
+    Hash of what a contribution changes: type, target and normalized URL for
+    links; episodes and chapter range for mappings. Equal for duplicates
+    """
+    if contribution_type == CONTRIBUTION_TYPE_MAPPING:
+        target = f"{data.get('episode_3d') or ''}/{data.get('episode_2d') or ''}"
+        chapters = sorted(set(data.get("novel_chapters", [])))
+        if chapters and chapters[-1] - chapters[0] + 1 == len(chapters):
+            content = f"{chapters[0]}-{chapters[-1]}"
+        else:
+            content = ",".join(map(str, chapters))
+    else:
+        target = str(data.get("target_number"))
+        content = normalize_url(data.get("link", {}).get("url", ""))
+    
+    return hashlib.sha1(f"{contribution_type}|{target}|{content}".encode("utf-8")).hexdigest()
 
 
 class ContributionService:
@@ -23,6 +75,7 @@ class ContributionService:
         self.novel_repo = NovelRepository()
         self.episode_3d_repo = EpisodeRepository("3d")
         self.episode_2d_repo = EpisodeRepository("2d")
+        self.user_repo = UserRepository()
     
     def submit_mapping_contribution(
         self,
@@ -44,24 +97,24 @@ class ContributionService:
                 return False, "Phải có ít nhất một tập phim (3D hoặc 2D)", None
             
             # Create contribution
+            data = {
+                "novel_chapters": novel_chapters,
+                "episode_3d": episode_3d,
+                "episode_2d": episode_2d
+            }
             contribution = Contribution(
                 user_id=user_id,
                 username=username,
                 contribution_type=CONTRIBUTION_TYPE_MAPPING,
-                data={
-                    "novel_chapters": novel_chapters,
-                    "episode_3d": episode_3d,
-                    "episode_2d": episode_2d
-                }
+                data=data,
+                fingerprint=contribution_fingerprint(CONTRIBUTION_TYPE_MAPPING, data)
             )
             
-            # Save to database
-            result = self.contribution_repo.create(contribution)
-            
-            if result:
-                return True, "Cống hiến của đạo hữu đã được gửi và đang chờ chưởng môn thẩm định!", result
-            else:
-                return False, "Có lỗi khi lưu cống hiến. Xin đạo hữu thử lại sau.", None
+            # Save to database (or merge into the same pending contribution)
+            return self._submit(
+                contribution,
+                "Cống hiến của đạo hữu đã được gửi và đang chờ chưởng môn thẩm định!"
+            )
                 
         except Exception as e:
             print(f"Error submitting mapping contribution: {e}")
@@ -93,33 +146,72 @@ class ContributionService:
             else:
                 return False, "Loại cống hiến không hợp lệ", None
             
+            if self._has_link(contribution_type, target_number, url):
+                return False, "Ngọc giản này đã có trong tông môn, đa tạ đạo hữu!", None
+            
             # Create contribution
+            data = {
+                "target_type": target_type,
+                "target_number": target_number,
+                "link": {
+                    "source_name": source_name,
+                    "url": url
+                }
+            }
             contribution = Contribution(
                 user_id=user_id,
                 username=username,
                 contribution_type=contribution_type,
-                data={
-                    "target_type": target_type,
-                    "target_number": target_number,
-                    "link": {
-                        "source_name": source_name,
-                        "url": url
-                    }
-                }
+                data=data,
+                fingerprint=contribution_fingerprint(contribution_type, data)
             )
             
-            # Save to database
-            result = self.contribution_repo.create(contribution)
-            
-            if result:
-                return True, "Ngọc giản cống hiến của đạo hữu đã được gửi và đang chờ chưởng môn thẩm định!", result
-            else:
-                return False, "Có lỗi khi lưu cống hiến. Xin đạo hữu thử lại sau.", None
+            # Save to database (or merge into the same pending contribution)
+            return self._submit(
+                contribution,
+                "Ngọc giản cống hiến của đạo hữu đã được gửi và đang chờ chưởng môn thẩm định!"
+            )
                 
         except Exception as e:
             print(f"Error submitting link contribution: {e}")
             return False, f"Lỗi hệ thống: {str(e)}", None
     
+    def _submit(self, contribution: Contribution, created_message: str) -> Tuple[bool, str, Optional[Contribution]]:
+        """
+        Store a new contribution, merging it into a pending duplicate
+        The contribution is only returned when it is new (admins are notified once)
+        """
+        result, outcome = self.contribution_repo.submit(contribution)
+        
+        if result is None:
+            return False, "Có lỗi khi lưu cống hiến. Xin đạo hữu thử lại sau.", None
+        if outcome == SUBMIT_CREATED:
+            return True, created_message, result
+        if outcome == SUBMIT_MERGED:
+            return True, (f"Manh mối này đã có đạo hữu khác cống hiến và đang chờ thẩm định. "
+                          f"Tên đạo hữu đã được ghi cùng ({len(result.submitters)} người gửi)!"), None
+        return False, "Đạo hữu đã cống hiến manh mối này rồi, xin chờ chưởng môn thẩm định.", None
+    
+    def _has_link(self, contribution_type: str, target_number: int, url: str) -> bool:
+        """Whether the chapter/episode already has this URL (normalized)"""
+        if contribution_type == CONTRIBUTION_TYPE_NOVEL_LINK:
+            if catalog_service.is_enabled():
+                target = catalog_service.get_novel(target_number)
+            else:
+                target = self.novel_repo.find_by_chapter_number(target_number, LINK_URL_FIELDS)
+        else:
+            episode_type = LINK_EPISODE_TYPES[contribution_type]
+            if catalog_service.is_enabled():
+                target = catalog_service.get_episode(episode_type, target_number)
+            else:
+                repo = self.episode_3d_repo if episode_type == "3d" else self.episode_2d_repo
+                target = repo.find_by_episode_number(target_number, LINK_URL_FIELDS)
+        
+        if not target:
+            return False
+        normalized = normalize_url(url)
+        return any(normalize_url(link.url) == normalized for link in target.links)
+    
     def get_pending_contributions(self):
         """Get all pending contributions"""
         try:
@@ -128,6 +220,27 @@ class ContributionService:
             print(f"Error getting pending contributions: {e}")
             return []
     
+    def get_pending_page(
+        self,
+        limit: int = 10,
+        after: Optional[Tuple] = None,
+        before: Optional[Tuple] = None
+    ) -> dict:
+        """
+        Get one keyset page of the review queue (list fields only)
+        Returns {"items": [...], "has_more": bool}, where has_more tells if
+        there are items beyond the page in the direction it was read
+        """
+        try:
+            items = self.contribution_repo.find_pending_page(limit + 1, after, before)
+            has_more = len(items) > limit
+            if has_more:
+                items = items[-limit:] if before is not None else items[:limit]
+            return {"items": items, "has_more": has_more}
+        except Exception as e:
+            print(f"Error getting pending page: {e}")
+            return {"items": [], "has_more": False}
+    
     def get_contribution_by_id(self, contribution_id: str):
         """Get contribution by ID"""
         try:
@@ -136,6 +249,216 @@ class ContributionService:
             print(f"Error getting contribution: {e}")
             return None
     
+    def get_contributions_by_ids(self, contribution_ids: List[str]) -> List[Contribution]:
+        """Get many contributions by ID"""
+        try:
+            return self.contribution_repo.find_by_ids(contribution_ids)
+        except Exception as e:
+            print(f"Error getting contributions: {e}")
+            return []
+    
+    def get_pending_links_by_user(self, user_id: int) -> List[Contribution]:
+        """Get a user's pending link contributions"""
+        try:
+            return self.contribution_repo.find_pending_by_user(user_id, [
+                CONTRIBUTION_TYPE_NOVEL_LINK,
+                CONTRIBUTION_TYPE_EPISODE_3D_LINK,
+                CONTRIBUTION_TYPE_EPISODE_2D_LINK
+            ])
+        except Exception as e:
+            print(f"Error getting pending links of user {user_id}: {e}")
+            return []
+    
+    def find_duplicate_contributions(self) -> List[Contribution]:
+        """
+        Pending contributions that would change nothing: a repeat of an older
+        pending contribution (left from before fingerprints were stored), or a
+        link the chapter/episode already has
+        """
+        try:
+            pending = list(reversed(self.contribution_repo.find_pending()))
+            
+            # Fingerprints of the links already stored, one query per collection
+            stored = set()
+            numbers = {}
+            for contribution in pending:
+                if contribution.contribution_type != CONTRIBUTION_TYPE_MAPPING:
+                    numbers.setdefault(contribution.contribution_type, set()).add(contribution.data.get("target_number"))
+            
+            def add_stored(contribution_type: str, number: int, links: List[Link]):
+                stored.update(
+                    contribution_fingerprint(contribution_type, {"target_number": number, "link": {"url": link.url}})
+                    for link in links
+                )
+            
+            if numbers.get(CONTRIBUTION_TYPE_NOVEL_LINK):
+                for novel in self.novel_repo.find_by_chapter_numbers(
+                    list(numbers[CONTRIBUTION_TYPE_NOVEL_LINK]), fields=["chapter_number"] + LINK_URL_FIELDS
+                ):
+                    add_stored(CONTRIBUTION_TYPE_NOVEL_LINK, novel.chapter_number, novel.links)
+            for contribution_type, episode_type in LINK_EPISODE_TYPES.items():
+                if numbers.get(contribution_type):
+                    repo = self.episode_3d_repo if episode_type == "3d" else self.episode_2d_repo
+                    for episode in repo.find_by_episode_numbers(
+                        list(numbers[contribution_type]), fields=["episode_number"] + LINK_URL_FIELDS
+                    ):
+                        add_stored(contribution_type, episode.episode_number, episode.links)
+            
+            duplicates = []
+            seen = set()
+            for contribution in pending:
+                fingerprint = contribution_fingerprint(contribution.contribution_type, contribution.data)
+                if fingerprint in seen or fingerprint in stored:
+                    duplicates.append(contribution)
+                seen.add(fingerprint)
+            return duplicates
+        except Exception as e:
+            print(f"Error finding duplicate contributions: {e}")
+            return []
+    
+    def bulk_approve(self, contributions: List[Contribution], admin_id: int) -> Dict[str, list]:
+        """
+        Approve many contributions in one pass
+        Writes are grouped into one bulk_write per collection, EXP is granted
+        once per user and caches are refreshed once for the whole batch.
+        
+        Returns:
+            {"done": [approved contributions], "skipped": [(contribution, reason)]}
+        """
+        result = {"done": [], "skipped": []}
+        pending = []
+        for contribution in contributions:
+            if contribution.status != STATUS_PENDING:
+                result["skipped"].append((contribution, f"đã được xử lý ({contribution.status})"))
+            else:
+                pending.append(contribution)
+        
+        claimed = []
+        applied = None
+        try:
+            # Claim first: only the ones this call moves out of pending are applied,
+            # so a parallel review never sees its contribution's data written
+            changed = set(self.contribution_repo.bulk_set_status([c._id for c in pending], STATUS_APPROVED, admin_id))
+            for contribution in pending:
+                if contribution._id in changed:
+                    claimed.append(contribution)
+                else:
+                    result["skipped"].append((contribution, "đã được xử lý"))
+            if not claimed:
+                return result
+            
+            # Oldest first, so a later submission for the same target wins
+            claimed.sort(key=lambda c: (c.submitted_at, c._id))
+            applied = self._apply_contributions(claimed)
+            approved = []
+            failed = []
+            for contribution, success in zip(claimed, applied):
+                if success:
+                    approved.append(contribution)
+                else:
+                    failed.append(contribution)
+                    result["skipped"].append((contribution, "không áp dụng được (ngọc giản đã tồn tại?)"))
+            
+            # Not applied: back in the queue
+            self.contribution_repo.release([c._id for c in failed], admin_id)
+            stats_service.invalidate()
+            if not approved:
+                return result
+            
+            # Refresh in-memory catalog and notify other processes
+            catalog_service.on_contributions_applied(approved)
+            tags = set()
+            for contribution in approved:
+                tags |= contribution_cache_tags(contribution)
+            render_cache.invalidate(tags, catalog_service.version)
+            
+            # Award 1 EXP per approved contribution, one update per user
+            exp = Counter(contribution.user_id for contribution in approved)
+            if self.user_repo.bulk_add_exp(dict(exp)):
+                print(f"Awarded EXP to {len(exp)} users")
+            
+            result["done"] = approved
+            return result
+        except Exception as e:
+            print(f"Error bulk approving contributions: {e}")
+            if applied is None:
+                # Claimed but the writes did not finish
+                self.contribution_repo.release([c._id for c in claimed], admin_id)
+                stats_service.invalidate()
+            skipped = {id(contribution) for contribution, _ in result["skipped"]}
+            result["skipped"].extend(
+                (contribution, f"lỗi hệ thống: {e}") for contribution in pending if id(contribution) not in skipped
+            )
+            result["done"] = []
+            return result
+    
+    def bulk_reject(self, contributions: List[Contribution], admin_id: int, note: str = "") -> Dict[str, list]:
+        """
+        Reject many contributions with one update
+        
+        Returns:
+            {"done": [rejected contributions], "skipped": [(contribution, reason)]}
+        """
+        result = {"done": [], "skipped": []}
+        for contribution in contributions:
+            if contribution.status != STATUS_PENDING:
+                result["skipped"].append((contribution, f"đã được xử lý ({contribution.status})"))
+            else:
+                result["done"].append(contribution)
+        
+        try:
+            if result["done"]:
+                changed = set(self.contribution_repo.bulk_set_status(
+                    [c._id for c in result["done"]], STATUS_REJECTED, admin_id, note
+                ))
+                stats_service.invalidate()
+                result["skipped"].extend((c, "đã được xử lý") for c in result["done"] if c._id not in changed)
+                result["done"] = [c for c in result["done"] if c._id in changed]
+            return result
+        except Exception as e:
+            print(f"Error bulk rejecting contributions: {e}")
+            result["skipped"].extend((contribution, f"lỗi hệ thống: {e}") for contribution in result["done"])
+            result["done"] = []
+            return result
+    
+    def _apply_contributions(self, contributions: List[Contribution]) -> List[bool]:
+        """Apply many contributions with one bulk write per collection, returns success per contribution"""
+        applied = [False] * len(contributions)
+        groups: Dict[str, List[int]] = {}
+        for index, contribution in enumerate(contributions):
+            groups.setdefault(contribution.contribution_type, []).append(index)
+        
+        def link_of(contribution: Contribution) -> Tuple[int, Link]:
+            link_data = contribution.data.get("link", {})
+            return contribution.data.get("target_number"), Link(
+                source_name=link_data.get("source_name", ""),
+                url=link_data.get("url", "")
+            )
+        
+        for contribution_type, indexes in groups.items():
+            batch = [contributions[i] for i in indexes]
+            
+            if contribution_type == CONTRIBUTION_TYPE_MAPPING:
+                results = self.mapping_repo.bulk_upsert([
+                    Mapping(
+                        novel_chapters=c.data.get("novel_chapters", []),
+                        episode_3d=c.data.get("episode_3d"),
+                        episode_2d=c.data.get("episode_2d")
+                    )
+                    for c in batch
+                ])
+            elif contribution_type == CONTRIBUTION_TYPE_NOVEL_LINK:
+                results = self.novel_repo.bulk_add_links([link_of(c) for c in batch])
+            elif contribution_type in LINK_EPISODE_TYPES:
+                repo = self.episode_3d_repo if LINK_EPISODE_TYPES[contribution_type] == "3d" else self.episode_2d_repo
+                results = repo.bulk_add_links([link_of(c) for c in batch])
+            else:
+                continue
+            
+            for i, success in zip(indexes, results):
+                applied[i] = success
+        return applied
+    
     def approve_contribution(
         self,
         contribution_id: str,
@@ -157,37 +480,48 @@ class ContributionService:
             if contribution.status != STATUS_PENDING:
                 return False, f"Cống hiến này đã được xử lý ({contribution.status})"
             
+            # Claim it first: of parallel approvals and rejections only one gets
+            # past this, so data is only ever written for an approved contribution
+            if not self.contribution_repo.approve(contribution_id, admin_id):
+                return False, "Cống hiến này đã được xử lý"
+            
             # Apply the contribution based on type
             success = False
+            try:
+                if contribution.contribution_type == CONTRIBUTION_TYPE_MAPPING:
+                    success = self._apply_mapping_contribution(contribution)
+                
+                elif contribution.contribution_type == CONTRIBUTION_TYPE_NOVEL_LINK:
+                    success = self._apply_novel_link_contribution(contribution)
+                
+                elif contribution.contribution_type == CONTRIBUTION_TYPE_EPISODE_3D_LINK:
+                    success = self._apply_episode_link_contribution(contribution, "3d")
+                
+                elif contribution.contribution_type == CONTRIBUTION_TYPE_EPISODE_2D_LINK:
+                    success = self._apply_episode_link_contribution(contribution, "2d")
+            finally:
+                if not success:
+                    # Not applied: back in the queue
+                    self.contribution_repo.release([contribution_id], admin_id)
+                stats_service.invalidate()
             
-            if contribution.contribution_type == CONTRIBUTION_TYPE_MAPPING:
-                success = self._apply_mapping_contribution(contribution)
-            
-            elif contribution.contribution_type == CONTRIBUTION_TYPE_NOVEL_LINK:
-                success = self._apply_novel_link_contribution(contribution)
-            
-            elif contribution.contribution_type == CONTRIBUTION_TYPE_EPISODE_3D_LINK:
-                success = self._apply_episode_link_contribution(contribution, "3d")
+            if not success:
+                return False, "Lỗi khi áp dụng cống hiến"
             
-            elif contribution.contribution_type == CONTRIBUTION_TYPE_EPISODE_2D_LINK:
-                success = self._apply_episode_link_contribution(contribution, "2d")
+            # Refresh in-memory catalog and notify other processes
+            catalog_service.on_contribution_applied(contribution)
+            render_cache.invalidate(contribution_cache_tags(contribution), catalog_service.version)
             
-            if success:
-                # Mark as approved
-                self.contribution_repo.approve(contribution_id, admin_id)
+            # Award EXP to user
+            try:
+                from repositories.user_repository import UserRepository
+                user_repo = UserRepository()
+                user_repo.add_exp(contribution.user_id, 1)
+                print(f"Awarded 1 EXP to user {contribution.user_id}")
+            except Exception as e:
+                print(f"Error awarding EXP: {e}")
                 
-                # Award EXP to user
-                try:
-                    from repositories.user_repository import UserRepository
-                    user_repo = UserRepository()
-                    user_repo.add_exp(contribution.user_id, 1)
-                    print(f"Awarded 1 EXP to user {contribution.user_id}")
-                except Exception as e:
-                    print(f"Error awarding EXP: {e}")
-                    
-                return True, "Cống hiến đã được duyệt, áp dụng thành công và cộng 1 điểm công đức (EXP)!"
-            else:
-                return False, "Lỗi khi áp dụng cống hiến"
+            return True, "Cống hiến đã được duyệt, áp dụng thành công và cộng 1 điểm công đức (EXP)!"
                 
         except Exception as e:
             print(f"Error approving contribution: {e}")
@@ -215,7 +549,9 @@ class ContributionService:
                 return False, f"Cống hiến này đã được xử lý ({contribution.status})"
             
             # Mark as rejected
-            self.contribution_repo.reject(contribution_id, admin_id, note)
+            if not self.contribution_repo.reject(contribution_id, admin_id, note):
+                return False, "Cống hiến này đã được xử lý"
+            stats_service.invalidate()
             return True, "Cống hiến đã bị từ chối"
             
         except Exception as e:
@@ -0,0 +1,128 @@
+"""
+Permission service
+In-memory set of admin user IDs for I/O-free permission checks
+"""
+import time
+import asyncio
+import threading
+from typing import Optional, Set
+from repositories.user_repository import UserRepository
+from repositories.meta_repository import MetaRepository
+from config.settings import settings
+from utils.async_utils import run_blocking
+
+
+class PermissionService:
+    """
+    Admin set loaded at startup and refreshed periodically
+    add/remove admin go through set_admin, which updates the set immediately
+    and bumps the shared admin version so other workers reload theirs
+    """
+    
+    def __init__(self, refresh_interval: int = 300):
+        self.refresh_interval = refresh_interval
+        self._admin_ids: Optional[Set[int]] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._user_repo = None
+        self._meta_repo = None
+        self.version = None
+        self._last_check = 0.0
+    
+    @property
+    def user_repo(self) -> UserRepository:
+        if self._user_repo is None:
+            self._user_repo = UserRepository()
+        return self._user_repo
+    
+    @property
+    def meta_repo(self) -> MetaRepository:
+        if self._meta_repo is None:
+            self._meta_repo = MetaRepository()
+        return self._meta_repo
+    
+    @property
+    def loaded(self) -> bool:
+        return self._admin_ids is not None
+    
+    def load(self) -> bool:
+        """Load admin IDs from the database"""
+        # Version first: a change made during the read is picked up by the next check
+        version = self.meta_repo.get_admin_version()
+        admin_ids = self.user_repo.get_admin_ids()
+        if admin_ids is None:
+            return False
+        with self._lock:
+            self._admin_ids = set(admin_ids)
+            self.version = version
+            self._last_check = time.monotonic()
+        return True
+    
+    def check_due(self) -> bool:
+        """True when the next permission check should re-check the shared version"""
+        return time.monotonic() - self._last_check >= settings.CATALOG_VERSION_CHECK_INTERVAL
+    
+    def ensure_fresh(self):
+        """Load the admin set, or reload it after an admin version bump (throttled)"""
+        if not self.loaded:
+            self.load()
+            return
+        if not self.check_due():
+            return
+        
+        self._last_check = time.monotonic()
+        current = self.meta_repo.get_admin_version()
+        if current is not None and current != self.version:
+            self.load()
+    
+    def is_admin(self, user_id: int) -> bool:
+        """Check if user is admin (including superuser)"""
+        if user_id == settings.ADMIN_ID:
+            return True
+        if not self.loaded:
+            # Only before startup finished loading the set
+            self.load()
+        return user_id in (self._admin_ids or ())
+    
+    def set_admin(self, user_id: int, is_admin: bool) -> bool:
+        """Set admin status in the database and in the cached set"""
+        if not self.user_repo.set_admin(user_id, is_admin):
+            return False
+        # Our own version is left as is: the next check reloads, which also
+        # picks up changes other workers made in between
+        self.meta_repo.bump_admin_version()
+        with self._lock:
+            if self._admin_ids is None:
+                self._admin_ids = set()
+            if is_admin:
+                self._admin_ids.add(user_id)
+            else:
+                self._admin_ids.discard(user_id)
+        return True
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await run_blocking(self.load)
+            except Exception as e:
+                print(f"Error refreshing admin set: {e}")
+    
+    def start(self):
+        """Start the periodic refresh task (call from the running event loop)"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def stop(self):
+        """Stop the periodic refresh"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Create singleton instance
+permission_service = PermissionService(settings.ADMIN_REFRESH_INTERVAL)
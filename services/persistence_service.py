@@ -0,0 +1,188 @@
+"""
+Persistence service
+Mongo-backed python-telegram-bot persistence for user_data and conversation states
+"""
+import time
+import uuid
+import asyncio
+from copy import deepcopy
+from typing import Any, Dict, Optional, Tuple
+from telegram.ext import BasePersistence, PersistenceInput
+from repositories.persistence_repository import PersistenceRepository
+from config.settings import settings
+from utils.async_utils import run_blocking
+
+
+KIND_USER_DATA = "user_data"
+KIND_CONVERSATION = "conversation"
+
+
+def _conversation_id(name: str, key: Tuple) -> str:
+    return f"{KIND_CONVERSATION}:{name}:" + ":".join(str(part) for part in key)
+
+
+class MongoPersistence(BasePersistence):
+    """
+    Stores user_data and ConversationHandler states in the bot_persistence collection
+    
+    Everything is loaded once at startup and served from memory. The application
+    hands over changed users every update_interval; entries equal to what is
+    already stored are skipped and the rest of the round is written as one
+    bulk_write.
+    
+    Each write stamps a new revision. Before a handler runs, a user's document
+    is re-read (at most every refresh_interval) and replaces the in-memory
+    user_data when another process wrote a newer revision.
+    
+    Conversation states are only shared through webhook chat routing:
+    python-telegram-bot reads them once when the application starts and has
+    no hook to re-read a key. Each chat is always handled by the same worker,
+    and workers flush on shutdown before the next ones load, so no two
+    processes hold the same conversation at once. Do not run a second bot
+    instance next to them.
+    """
+    
+    def __init__(self, update_interval: float = 5, refresh_interval: float = 5):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=True, callback_data=False),
+            update_interval=update_interval
+        )
+        self.refresh_interval = refresh_interval
+        self._user_data: Optional[Dict[int, Dict[Any, Any]]] = None
+        # Revision of each document as last read or written by this process
+        self._revisions: Dict[str, Optional[str]] = {}
+        self._checked_at: Dict[int, float] = {}
+        self._conversations: Optional[Dict[str, Dict[Tuple, object]]] = None
+        self._dirty: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._repo = None
+    
+    @property
+    def repo(self) -> PersistenceRepository:
+        if self._repo is None:
+            self._repo = PersistenceRepository()
+        return self._repo
+    
+    def _mark(self, _id: str, doc: Optional[Dict[str, Any]]):
+        """Queue a document change and make sure a write is scheduled"""
+        if doc is not None:
+            doc["revision"] = uuid.uuid4().hex
+        self._revisions[_id] = doc["revision"] if doc is not None else None
+        self._dirty[_id] = doc
+        if self._flush_task is None or self._flush_task.done():
+            # Runs after the application's current update round has queued all its changes
+            self._flush_task = asyncio.get_running_loop().create_task(self._write())
+    
+    async def _write(self):
+        while self._dirty:
+            pending, self._dirty = self._dirty, {}
+            if not await run_blocking(self.repo.bulk_save, pending):
+                # Put the batch back for the next round, newer changes win
+                for _id, doc in pending.items():
+                    self._dirty.setdefault(_id, doc)
+                return
+    
+    async def flush(self):
+        """Write everything still pending (called by the application on shutdown)"""
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+        await self._write()
+    
+    async def get_user_data(self) -> Dict[int, Dict[Any, Any]]:
+        if self._user_data is None:
+            docs = await run_blocking(self.repo.load, KIND_USER_DATA)
+            self._user_data = {doc["key"]: doc.get("data", {}) for doc in docs}
+            for doc in docs:
+                self._revisions[doc["_id"]] = doc.get("revision")
+        return deepcopy(self._user_data)
+    
+    async def update_user_data(self, user_id: int, data: Dict[Any, Any]):
+        if self._user_data is None:
+            self._user_data = {}
+        if self._user_data.get(user_id, {}) == data:
+            return
+        self._user_data[user_id] = data
+        self._mark(f"{KIND_USER_DATA}:{user_id}", {"kind": KIND_USER_DATA, "key": user_id, "data": data})
+    
+    async def drop_user_data(self, user_id: int):
+        if self._user_data is not None and self._user_data.pop(user_id, None) is None:
+            return
+        self._mark(f"{KIND_USER_DATA}:{user_id}", None)
+    
+    async def refresh_user_data(self, user_id: int, user_data: Dict[Any, Any]):
+        """Pick up user_data another process stored since we last read or wrote it"""
+        now = time.monotonic()
+        if now - self._checked_at.get(user_id, float("-inf")) < self.refresh_interval:
+            return
+        self._checked_at[user_id] = now
+        
+        _id = f"{KIND_USER_DATA}:{user_id}"
+        if _id in self._dirty:
+            # Our own change is newer and not written yet
+            return
+        doc = await run_blocking(self.repo.get, _id)
+        if doc is None or doc.get("revision") == self._revisions.get(_id):
+            return
+        
+        data = doc.get("data", {})
+        self._revisions[_id] = doc.get("revision")
+        if self._user_data is not None:
+            self._user_data[user_id] = deepcopy(data)
+        user_data.clear()
+        user_data.update(deepcopy(data))
+    
+    async def get_conversations(self, name: str) -> Dict[Tuple, object]:
+        if self._conversations is None:
+            docs = await run_blocking(self.repo.load, KIND_CONVERSATION)
+            self._conversations = {}
+            for doc in docs:
+                self._conversations.setdefault(doc["name"], {})[tuple(doc["key"])] = doc.get("state")
+        return dict(self._conversations.get(name, {}))
+    
+    async def update_conversation(self, name: str, key: Tuple, new_state: Optional[object]):
+        if self._conversations is None:
+            self._conversations = {}
+        states = self._conversations.setdefault(name, {})
+        if states.get(key) == new_state:
+            return
+        
+        _id = _conversation_id(name, key)
+        if new_state is None:
+            states.pop(key, None)
+            self._mark(_id, None)
+        else:
+            states[key] = new_state
+            self._mark(_id, {"kind": KIND_CONVERSATION, "name": name, "key": list(key), "state": new_state})
+    
+    # Not stored (see store_data)
+    
+    async def get_chat_data(self) -> Dict[int, Dict[Any, Any]]:
+        return {}
+    
+    async def update_chat_data(self, chat_id: int, data: Dict[Any, Any]):
+        pass
+    
+    async def drop_chat_data(self, chat_id: int):
+        pass
+    
+    async def refresh_chat_data(self, chat_id: int, chat_data: Dict[Any, Any]):
+        pass
+    
+    async def get_bot_data(self) -> Dict[Any, Any]:
+        return {}
+    
+    async def update_bot_data(self, data: Dict[Any, Any]):
+        pass
+    
+    async def refresh_bot_data(self, bot_data: Dict[Any, Any]):
+        pass
+    
+    async def get_callback_data(self):
+        return None
+    
+    async def update_callback_data(self, data):
+        pass
+
+
+# Create singleton instance
+mongo_persistence = MongoPersistence(settings.PERSISTENCE_UPDATE_INTERVAL, settings.PERSISTENCE_REFRESH_INTERVAL)
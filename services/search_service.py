@@ -2,10 +2,210 @@
 Search service
 Business logic for searching novels and episodes
 """
-from typing import Tuple, List, Dict, Any
-from repositories import NovelRepository, EpisodeRepository, MappingRepository
+import asyncio
+from bson import ObjectId
+from typing import Tuple, List, Dict, Any, Optional
+from repositories import (
+    NovelRepository,
+    EpisodeRepository,
+    MappingRepository,
+    AsyncNovelRepository,
+    AsyncEpisodeRepository,
+    AsyncMappingRepository
+)
+from repositories.projections import NOVEL_VIEW_FIELDS, EPISODE_VIEW_FIELDS, MAPPING_VIEW_FIELDS
 from database.models import Novel, Episode, Mapping
-from utils.constants import SEARCH_TYPE_CHAPTER, SEARCH_TYPE_3D, SEARCH_TYPE_2D
+from utils.constants import SEARCH_TYPE_CHAPTER, SEARCH_TYPE_3D, SEARCH_TYPE_2D, SEARCH_QUERY_MODE_AGGREGATE
+from utils.async_utils import run_blocking, noop
+from services.catalog_service import catalog_service
+from config.settings import settings
+
+
+def _empty_result(search_type: str, search_value: int) -> Dict[str, Any]:
+    """Search result with nothing found"""
+    return {
+        "novels": [],
+        "episodes_3d": [],
+        "episodes_2d": [],
+        "mappings": [],
+        "search_type": search_type,
+        "search_value": search_value
+    }
+
+
+def _with_episode_placeholders(found: List[Episode], numbers) -> List[Episode]:
+    """Found episodes followed by placeholders for the missing numbers"""
+    episodes = list(found)
+    found_ids = {e.episode_number for e in found}
+    for num in numbers:
+        if num not in found_ids:
+            episodes.append(Episode(episode_number=num))
+    return episodes
+
+
+def _with_novel_placeholders(found: List[Novel], numbers) -> List[Novel]:
+    """Found chapters followed by placeholders for the missing numbers"""
+    novels = list(found)
+    found_ids = {n.chapter_number for n in found}
+    for num in numbers:
+        if num not in found_ids:
+            novels.append(Novel(chapter_number=num))
+    return novels
+
+
+def _episode_numbers(mappings: List[Mapping]) -> Tuple[set, set]:
+    """Unique 3D and 2D episode numbers referenced by mappings"""
+    episode_3d_numbers = set()
+    episode_2d_numbers = set()
+    
+    for mapping in mappings:
+        if mapping.episode_3d:
+            episode_3d_numbers.add(mapping.episode_3d)
+        if mapping.episode_2d:
+            episode_2d_numbers.add(mapping.episode_2d)
+    
+    return episode_3d_numbers, episode_2d_numbers
+
+
+def _build_chapter_result(
+    chapter_number: int,
+    novel: Optional[Novel],
+    mappings: List[Mapping],
+    found_3d: List[Episode],
+    found_2d: List[Episode]
+) -> Dict[str, Any]:
+    """Assemble the result of a chapter search"""
+    novels = [novel] if novel else []
+    
+    # If no novel doc but mapping exists, create placeholder
+    if not novels and mappings:
+        novels.append(Novel(chapter_number=chapter_number))
+    
+    episode_3d_numbers, episode_2d_numbers = _episode_numbers(mappings)
+    
+    return {
+        "novels": novels,
+        "episodes_3d": _with_episode_placeholders(found_3d, episode_3d_numbers),
+        "episodes_2d": _with_episode_placeholders(found_2d, episode_2d_numbers),
+        "mappings": mappings,
+        "search_type": SEARCH_TYPE_CHAPTER,
+        "search_value": chapter_number
+    }
+
+
+def _build_episode_result(
+    episode_type: str,
+    episode_number: int,
+    episode: Optional[Episode],
+    mapping: Optional[Mapping],
+    found_novels: List[Novel],
+    other_episode: Optional[Episode]
+) -> Dict[str, Any]:
+    """
+    Assemble the result of a 3D/2D episode search
+    other_episode is the episode of the opposite format from the mapping
+    """
+    episodes = [episode] if episode else []
+    mappings = [mapping] if mapping else []
+    
+    # If no episode doc but mapping exists, create placeholder
+    if not episodes and mapping:
+        episodes.append(Episode(episode_number=episode_number))
+    
+    novels = []
+    other_episodes = []
+    
+    if mapping:
+        if mapping.novel_chapters:
+            novels = _with_novel_placeholders(found_novels, mapping.novel_chapters)
+        
+        other_number = mapping.episode_2d if episode_type == "3d" else mapping.episode_3d
+        if other_number:
+            other_episodes = [other_episode or Episode(episode_number=other_number)]
+    
+    if episode_type == "3d":
+        episodes_3d, episodes_2d, search_type = episodes, other_episodes, SEARCH_TYPE_3D
+    else:
+        episodes_3d, episodes_2d, search_type = other_episodes, episodes, SEARCH_TYPE_2D
+    
+    return {
+        "novels": novels,
+        "episodes_3d": episodes_3d,
+        "episodes_2d": episodes_2d,
+        "mappings": mappings,
+        "search_type": search_type,
+        "search_value": episode_number
+    }
+
+
+def _list_numbers(mappings: List[Mapping]) -> Tuple[List[int], List[int], List[int]]:
+    """3D episodes, 2D episodes and first chapters referenced by a list page"""
+    episode_3d_numbers, episode_2d_numbers = _episode_numbers(mappings)
+    first_chapters = {m.chapter_start for m in mappings if m.chapter_start is not None}
+    return list(episode_3d_numbers), list(episode_2d_numbers), list(first_chapters)
+
+
+def _build_list_items(
+    mappings: List[Mapping],
+    episodes_3d: List[Episode],
+    episodes_2d: List[Episode],
+    novels: List[Novel]
+) -> List[Dict[str, Any]]:
+    """Join a list page's mappings with their batched episodes and chapters in memory"""
+    episodes_3d_by_number = {e.episode_number: e for e in episodes_3d}
+    episodes_2d_by_number = {e.episode_number: e for e in episodes_2d}
+    novels_by_number = {n.chapter_number: n for n in novels}
+    
+    return [
+        {
+            "mapping": mapping,
+            "episode_3d": episodes_3d_by_number.get(mapping.episode_3d) if mapping.episode_3d else None,
+            "episode_2d": episodes_2d_by_number.get(mapping.episode_2d) if mapping.episode_2d else None,
+            # Just the first chapter for link purposes
+            "novel": novels_by_number.get(mapping.chapter_start)
+        }
+        for mapping in mappings
+    ]
+
+
+def _trim_page(mappings: List[Mapping], limit: int, before: Optional[Tuple]) -> Tuple[List[Mapping], bool]:
+    """
+    Drop the extra item read to detect more pages
+    Pages read backwards (before=...) get it at the front
+    """
+    if len(mappings) <= limit:
+        return mappings, False
+    if before is not None:
+        return mappings[-limit:], True
+    return mappings[:limit], True
+
+
+def encode_list_cursor(mapping: Mapping) -> str:
+    """Compact list key for callback data: "<3d>.<2d>.<_id>" (empty for null)"""
+    episode_3d = mapping.episode_3d if mapping.episode_3d is not None else ""
+    episode_2d = mapping.episode_2d if mapping.episode_2d is not None else ""
+    return f"{episode_3d}.{episode_2d}.{mapping._id}"
+
+
+def decode_list_cursor(cursor: str) -> Tuple:
+    """Inverse of encode_list_cursor, raises ValueError if malformed"""
+    episode_3d, episode_2d, _id = cursor.split(".")
+    return (
+        int(episode_3d) if episode_3d else None,
+        int(episode_2d) if episode_2d else None,
+        ObjectId(_id) if ObjectId.is_valid(_id) else _id
+    )
+
+
+def _default_round_trips(episode_type: str, mapping: Optional[Mapping]) -> int:
+    """Round trips the default (one query per relation) episode search would make"""
+    round_trips = 2  # episode + mapping
+    if mapping:
+        if mapping.chapter_start is not None:
+            round_trips += 1
+        if mapping.episode_2d if episode_type == "3d" else mapping.episode_3d:
+            round_trips += 1
+    return round_trips
 
 
 class SearchService:
@@ -16,6 +216,131 @@ class SearchService:
         self.episode_3d_repo = EpisodeRepository("3d")
         self.episode_2d_repo = EpisodeRepository("2d")
         self.mapping_repo = MappingRepository()
+        
+        # Async repositories for use from bot handlers
+        self.async_novel_repo = AsyncNovelRepository()
+        self.async_episode_3d_repo = AsyncEpisodeRepository("3d")
+        self.async_episode_2d_repo = AsyncEpisodeRepository("2d")
+        self.async_mapping_repo = AsyncMappingRepository()
+        
+        # Aggregate mode statistics
+        self.aggregate_requests = 0
+        self.round_trips_saved = 0
+    
+    # Data sources: in-memory catalog when enabled, repositories otherwise
+    
+    def _find_novel(self, chapter_number: int):
+        if catalog_service.is_enabled():
+            return catalog_service.get_novel(chapter_number)
+        return self.novel_repo.find_by_chapter_number(chapter_number, NOVEL_VIEW_FIELDS)
+    
+    def _find_novels(self, chapter_numbers: List[int], links_limit: Optional[int] = None) -> List[Novel]:
+        if catalog_service.is_enabled():
+            return catalog_service.get_novels(chapter_numbers)
+        return self.novel_repo.find_by_chapter_numbers(chapter_numbers, links_limit, NOVEL_VIEW_FIELDS)
+    
+    def _find_episode(self, episode_type: str, episode_number: int):
+        if catalog_service.is_enabled():
+            return catalog_service.get_episode(episode_type, episode_number)
+        repo = self.episode_3d_repo if episode_type == "3d" else self.episode_2d_repo
+        return repo.find_by_episode_number(episode_number, EPISODE_VIEW_FIELDS)
+    
+    def _find_episodes(
+        self,
+        episode_type: str,
+        episode_numbers: List[int],
+        links_limit: Optional[int] = None
+    ) -> List[Episode]:
+        if catalog_service.is_enabled():
+            return catalog_service.get_episodes(episode_type, episode_numbers)
+        repo = self.episode_3d_repo if episode_type == "3d" else self.episode_2d_repo
+        return repo.find_by_episode_numbers(episode_numbers, links_limit, EPISODE_VIEW_FIELDS)
+    
+    def _find_mappings_by_chapter(self, chapter_number: int) -> List[Mapping]:
+        if catalog_service.is_enabled():
+            return catalog_service.find_mappings_by_chapter(chapter_number)
+        return self.mapping_repo.find_by_chapter(chapter_number, MAPPING_VIEW_FIELDS)
+    
+    def _find_mapping_by_episode(self, episode_type: str, episode_number: int):
+        if catalog_service.is_enabled():
+            if episode_type == "3d":
+                return catalog_service.find_mapping_by_episode_3d(episode_number)
+            return catalog_service.find_mapping_by_episode_2d(episode_number)
+        if episode_type == "3d":
+            return self.mapping_repo.find_by_episode_3d(episode_number, MAPPING_VIEW_FIELDS)
+        return self.mapping_repo.find_by_episode_2d(episode_number, MAPPING_VIEW_FIELDS)
+    
+    def _get_mappings_page(self, limit: int, after: Optional[Tuple], before: Optional[Tuple]) -> List[Mapping]:
+        if catalog_service.is_enabled():
+            return catalog_service.get_mappings_page(limit, after, before)
+        return self.mapping_repo.get_mappings_page(limit, after, before, MAPPING_VIEW_FIELDS)
+    
+    async def _catalog_ready(self) -> bool:
+        """Async version of catalog_service.is_enabled() that never blocks the loop"""
+        if not settings.CATALOG_CACHE_ENABLED or not catalog_service.loaded:
+            return False
+        if catalog_service.check_due():
+            await run_blocking(catalog_service.ensure_fresh)
+        return catalog_service.loaded
+    
+    def _async_episode_repo(self, episode_type: str):
+        return self.async_episode_3d_repo if episode_type == "3d" else self.async_episode_2d_repo
+    
+    def _use_aggregate(self) -> bool:
+        return settings.SEARCH_QUERY_MODE == SEARCH_QUERY_MODE_AGGREGATE
+    
+    def _aggregated_result(
+        self,
+        episode_type: str,
+        episode_number: int,
+        relations: Optional[Dict[str, Any]],
+        fallback_episode: Optional[Episode] = None
+    ) -> Dict[str, Any]:
+        """
+        Build an episode search result from find_relations_by_episode output
+        and record how many round trips the single pipeline saved
+        """
+        if relations:
+            mapping = relations["mapping"]
+            other_key = "episode_2d" if episode_type == "3d" else "episode_3d"
+            episode = relations["episode_3d" if episode_type == "3d" else "episode_2d"]
+            result = _build_episode_result(
+                episode_type, episode_number, episode, mapping,
+                relations["novels"], relations[other_key]
+            )
+            round_trips = 1
+        else:
+            # No mapping: the pipeline found nothing, the episode needed its own query
+            mapping = None
+            result = _build_episode_result(episode_type, episode_number, fallback_episode, None, [], None)
+            round_trips = 2
+        
+        saved = _default_round_trips(episode_type, mapping) - round_trips
+        self.aggregate_requests += 1
+        self.round_trips_saved += saved
+        result["round_trips_saved"] = saved
+        return result
+    
+    def _search_by_episode_aggregated(self, episode_type: str, episode_number: int) -> Dict[str, Any]:
+        """Episode search resolved with a single $lookup pipeline"""
+        relations = self.mapping_repo.find_relations_by_episode(episode_type, episode_number)
+        fallback_episode = None
+        if not relations:
+            repo = self.episode_3d_repo if episode_type == "3d" else self.episode_2d_repo
+            fallback_episode = repo.find_by_episode_number(episode_number, EPISODE_VIEW_FIELDS)
+        return self._aggregated_result(episode_type, episode_number, relations, fallback_episode)
+    
+    async def _search_by_episode_aggregated_async(self, episode_type: str, episode_number: int) -> Dict[str, Any]:
+        """Async version of _search_by_episode_aggregated"""
+        relations = await self.async_mapping_repo.find_relations_by_episode(episode_type, episode_number)
+        fallback_episode = None
+        if not relations:
+            fallback_episode = await self._async_episode_repo(episode_type).find_by_episode_number(
+                episode_number, EPISODE_VIEW_FIELDS
+            )
+        return self._aggregated_result(episode_type, episode_number, relations, fallback_episode)
+    
+    # Blocking API
     
     def search_by_chapter(self, chapter_number: int) -> Dict[str, Any]:
         """
@@ -23,67 +348,38 @@ class SearchService:
         Returns related novels, 3D episodes, 2D episodes, and mappings
         """
         try:
-            # Find the novel chapter
-            novel = self.novel_repo.find_by_chapter_number(chapter_number)
-            novels = [novel] if novel else []
-            
-            # Find mappings that include this chapter
-            mappings = self.mapping_repo.find_by_chapter(chapter_number)
+            novel = self._find_novel(chapter_number)
+            mappings = self._find_mappings_by_chapter(chapter_number)
             
-            # If no novel doc but mapping exists, create placeholder
-            if not novels and mappings:
-                novels.append(Novel(chapter_number=chapter_number))
+            episode_3d_numbers, episode_2d_numbers = _episode_numbers(mappings)
+            found_3d = self._find_episodes("3d", list(episode_3d_numbers)) if episode_3d_numbers else []
+            found_2d = self._find_episodes("2d", list(episode_2d_numbers)) if episode_2d_numbers else []
             
-            # Extract unique episode numbers
-            episode_3d_numbers = set()
-            episode_2d_numbers = set()
-            
-            for mapping in mappings:
-                if mapping.episode_3d:
-                    episode_3d_numbers.add(mapping.episode_3d)
-                if mapping.episode_2d:
-                    episode_2d_numbers.add(mapping.episode_2d)
-            
-            # Find episodes
-            episodes_3d = []
-            if episode_3d_numbers:
-                found = self.episode_3d_repo.find_by_episode_numbers(list(episode_3d_numbers))
-                episodes_3d.extend(found)
-                # Add placeholders for missing
-                found_ids = {e.episode_number for e in found}
-                for num in episode_3d_numbers:
-                    if num not in found_ids:
-                        episodes_3d.append(Episode(episode_number=num))
-            
-            episodes_2d = []
-            if episode_2d_numbers:
-                found = self.episode_2d_repo.find_by_episode_numbers(list(episode_2d_numbers))
-                episodes_2d.extend(found)
-                # Add placeholders
-                found_ids = {e.episode_number for e in found}
-                for num in episode_2d_numbers:
-                    if num not in found_ids:
-                        episodes_2d.append(Episode(episode_number=num))
-            
-            return {
-                "novels": novels,
-                "episodes_3d": episodes_3d,
-                "episodes_2d": episodes_2d,
-                "mappings": mappings,
-                "search_type": SEARCH_TYPE_CHAPTER,
-                "search_value": chapter_number
-            }
+            return _build_chapter_result(chapter_number, novel, mappings, found_3d, found_2d)
             
         except Exception as e:
             print(f"Error in search_by_chapter: {e}")
-            return {
-                "novels": [],
-                "episodes_3d": [],
-                "episodes_2d": [],
-                "mappings": [],
-                "search_type": SEARCH_TYPE_CHAPTER,
-                "search_value": chapter_number
-            }
+            return _empty_result(SEARCH_TYPE_CHAPTER, chapter_number)
+    
+    def _search_by_episode(self, episode_type: str, episode_number: int) -> Dict[str, Any]:
+        """Shared implementation of search_by_episode_3d / search_by_episode_2d"""
+        other_type = "2d" if episode_type == "3d" else "3d"
+        
+        episode = self._find_episode(episode_type, episode_number)
+        mapping = self._find_mapping_by_episode(episode_type, episode_number)
+        
+        found_novels = []
+        other_episode = None
+        
+        if mapping:
+            if mapping.novel_chapters:
+                found_novels = self._find_novels(mapping.novel_chapters)
+            
+            other_number = mapping.episode_2d if episode_type == "3d" else mapping.episode_3d
+            if other_number:
+                other_episode = self._find_episode(other_type, other_number)
+        
+        return _build_episode_result(episode_type, episode_number, episode, mapping, found_novels, other_episode)
     
     def search_by_episode_3d(self, episode_number: int) -> Dict[str, Any]:
         """
@@ -91,60 +387,12 @@ class SearchService:
         Returns related novels, episodes, and mappings
         """
         try:
-            # Find the episode
-            episode = self.episode_3d_repo.find_by_episode_number(episode_number)
-            episodes_3d = [episode] if episode else []
-            
-            # Find mapping for this episode
-            mapping = self.mapping_repo.find_by_episode_3d(episode_number)
-            mappings = [mapping] if mapping else []
-            
-            # If no episode doc but mapping exists, create placeholder
-            if not episodes_3d and mapping:
-                episodes_3d.append(Episode(episode_number=episode_number))
-            
-            # Find related chapters and 2D episode
-            novels = []
-            episodes_2d = []
-            
-            if mapping:
-                # Find novel chapters
-                if mapping.novel_chapters:
-                    found = self.novel_repo.find_by_chapter_numbers(mapping.novel_chapters)
-                    novels.extend(found)
-                    # Add placeholders
-                    found_ids = {n.chapter_number for n in found}
-                    for num in mapping.novel_chapters:
-                        if num not in found_ids:
-                            novels.append(Novel(chapter_number=num))
-                
-                # Find 2D episode if exists
-                if mapping.episode_2d:
-                    episode_2d = self.episode_2d_repo.find_by_episode_number(mapping.episode_2d)
-                    if episode_2d:
-                        episodes_2d = [episode_2d]
-                    else:
-                        episodes_2d.append(Episode(episode_number=mapping.episode_2d))
-            
-            return {
-                "novels": novels,
-                "episodes_3d": episodes_3d,
-                "episodes_2d": episodes_2d,
-                "mappings": mappings,
-                "search_type": SEARCH_TYPE_3D,
-                "search_value": episode_number
-            }
-            
+            if self._use_aggregate() and not catalog_service.is_enabled():
+                return self._search_by_episode_aggregated("3d", episode_number)
+            return self._search_by_episode("3d", episode_number)
         except Exception as e:
             print(f"Error in search_by_episode_3d: {e}")
-            return {
-                "novels": [],
-                "episodes_3d": [],
-                "episodes_2d": [],
-                "mappings": [],
-                "search_type": SEARCH_TYPE_3D,
-                "search_value": episode_number
-            }
+            return _empty_result(SEARCH_TYPE_3D, episode_number)
     
     def search_by_episode_2d(self, episode_number: int) -> Dict[str, Any]:
         """
@@ -152,92 +400,166 @@ class SearchService:
         Returns related novels, episodes, and mappings
         """
         try:
-            # Find the episode
-            episode = self.episode_2d_repo.find_by_episode_number(episode_number)
-            episodes_2d = [episode] if episode else []
-            
-            # Find mapping for this episode
-            mapping = self.mapping_repo.find_by_episode_2d(episode_number)
-            mappings = [mapping] if mapping else []
-            
-            # If no episode doc but mapping exists, placeholder
-            if not episodes_2d and mapping:
-                episodes_2d.append(Episode(episode_number=episode_number))
-            
-            # Find related chapters and 3D episode
-            novels = []
-            episodes_3d = []
+            if self._use_aggregate() and not catalog_service.is_enabled():
+                return self._search_by_episode_aggregated("2d", episode_number)
+            return self._search_by_episode("2d", episode_number)
+        except Exception as e:
+            print(f"Error in search_by_episode_2d: {e}")
+            return _empty_result(SEARCH_TYPE_2D, episode_number)
+    
+    def get_list_page(
+        self,
+        limit: int = 20,
+        after: Optional[Tuple] = None,
+        before: Optional[Tuple] = None
+    ) -> Dict[str, Any]:
+        """
+        Get one keyset page of mappings with details
+        Sorted by 3D episode desc, see MappingRepository.get_mappings_page
+        Each collection is fetched once for the whole page with $in
+        
+        Returns {"items": [...], "has_more": bool}, where has_more tells if
+        there are items beyond the page in the direction it was read
+        """
+        try:
+            mappings, has_more = _trim_page(self._get_mappings_page(limit + 1, after, before), limit, before)
+            episode_3d_numbers, episode_2d_numbers, chapter_numbers = _list_numbers(mappings)
             
-            if mapping:
-                # Find novel chapters
-                if mapping.novel_chapters:
-                    found = self.novel_repo.find_by_chapter_numbers(mapping.novel_chapters)
-                    novels.extend(found)
-                    # Placeholders
-                    found_ids = {n.chapter_number for n in found}
-                    for num in mapping.novel_chapters:
-                        if num not in found_ids:
-                            novels.append(Novel(chapter_number=num))
-                
-                # Find 3D episode if exists
-                if mapping.episode_3d:
-                    episode_3d = self.episode_3d_repo.find_by_episode_number(mapping.episode_3d)
-                    if episode_3d:
-                        episodes_3d = [episode_3d]
-                    else:
-                        episodes_3d.append(Episode(episode_number=mapping.episode_3d))
+            # The list only renders the first link of each item
+            episodes_3d = self._find_episodes("3d", episode_3d_numbers, links_limit=1) if episode_3d_numbers else []
+            episodes_2d = self._find_episodes("2d", episode_2d_numbers, links_limit=1) if episode_2d_numbers else []
+            novels = self._find_novels(chapter_numbers, links_limit=1) if chapter_numbers else []
             
             return {
-                "novels": novels,
-                "episodes_3d": episodes_3d,
-                "episodes_2d": episodes_2d,
-                "mappings": mappings,
-                "search_type": SEARCH_TYPE_2D,
-                "search_value": episode_number
+                "items": _build_list_items(mappings, episodes_3d, episodes_2d, novels),
+                "has_more": has_more
             }
+        except Exception as e:
+            print(f"Error getting list page: {e}")
+            return {"items": [], "has_more": False}
+    
+    def count_mappings(self) -> int:
+        """Total number of mappings (from metadata, no scan)"""
+        if catalog_service.is_enabled():
+            return catalog_service.count_mappings()
+        return self.mapping_repo.estimated_count()
+    
+    # Async API (independent queries run concurrently)
+    
+    async def search_by_chapter_async(self, chapter_number: int) -> Dict[str, Any]:
+        """Async version of search_by_chapter"""
+        if await self._catalog_ready():
+            return self.search_by_chapter(chapter_number)
+        
+        try:
+            novel, mappings = await asyncio.gather(
+                self.async_novel_repo.find_by_chapter_number(chapter_number, NOVEL_VIEW_FIELDS),
+                self.async_mapping_repo.find_by_chapter(chapter_number, MAPPING_VIEW_FIELDS)
+            )
+            
+            episode_3d_numbers, episode_2d_numbers = _episode_numbers(mappings)
+            found_3d, found_2d = await asyncio.gather(
+                self.async_episode_3d_repo.find_by_episode_numbers(list(episode_3d_numbers), fields=EPISODE_VIEW_FIELDS)
+                if episode_3d_numbers else noop([]),
+                self.async_episode_2d_repo.find_by_episode_numbers(list(episode_2d_numbers), fields=EPISODE_VIEW_FIELDS)
+                if episode_2d_numbers else noop([])
+            )
+            
+            return _build_chapter_result(chapter_number, novel, mappings, found_3d, found_2d)
             
         except Exception as e:
-            print(f"Error in search_by_episode_2d: {e}")
-            return {
-                "novels": [],
-                "episodes_3d": [],
-                "episodes_2d": [],
-                "mappings": [],
-                "search_type": SEARCH_TYPE_2D,
-                "search_value": episode_number
-            }
+            print(f"Error in search_by_chapter_async: {e}")
+            return _empty_result(SEARCH_TYPE_CHAPTER, chapter_number)
     
-    def get_full_list(self, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
-        """
-        Get full list of mappings with details
-        Sorted by 3D episode desc
-        """
+    async def _search_by_episode_async(self, episode_type: str, episode_number: int) -> Dict[str, Any]:
+        """Shared implementation of the async episode searches"""
+        other_type = "2d" if episode_type == "3d" else "3d"
+        find_mapping = (
+            self.async_mapping_repo.find_by_episode_3d if episode_type == "3d"
+            else self.async_mapping_repo.find_by_episode_2d
+        )
+        
+        episode, mapping = await asyncio.gather(
+            self._async_episode_repo(episode_type).find_by_episode_number(episode_number, EPISODE_VIEW_FIELDS),
+            find_mapping(episode_number, MAPPING_VIEW_FIELDS)
+        )
+        
+        found_novels = []
+        other_episode = None
+        
+        if mapping:
+            other_number = mapping.episode_2d if episode_type == "3d" else mapping.episode_3d
+            found_novels, other_episode = await asyncio.gather(
+                self.async_novel_repo.find_by_chapter_numbers(mapping.novel_chapters, fields=NOVEL_VIEW_FIELDS)
+                if mapping.novel_chapters else noop([]),
+                self._async_episode_repo(other_type).find_by_episode_number(other_number, EPISODE_VIEW_FIELDS)
+                if other_number else noop(None)
+            )
+        
+        return _build_episode_result(episode_type, episode_number, episode, mapping, found_novels, other_episode)
+    
+    async def search_by_episode_3d_async(self, episode_number: int) -> Dict[str, Any]:
+        """Async version of search_by_episode_3d"""
+        if await self._catalog_ready():
+            return self.search_by_episode_3d(episode_number)
+        
         try:
-            mappings = self.mapping_repo.get_all_mappings_sorted(limit, offset)
-            result = []
+            if self._use_aggregate():
+                return await self._search_by_episode_aggregated_async("3d", episode_number)
+            return await self._search_by_episode_async("3d", episode_number)
+        except Exception as e:
+            print(f"Error in search_by_episode_3d_async: {e}")
+            return _empty_result(SEARCH_TYPE_3D, episode_number)
+    
+    async def search_by_episode_2d_async(self, episode_number: int) -> Dict[str, Any]:
+        """Async version of search_by_episode_2d"""
+        if await self._catalog_ready():
+            return self.search_by_episode_2d(episode_number)
+        
+        try:
+            if self._use_aggregate():
+                return await self._search_by_episode_aggregated_async("2d", episode_number)
+            return await self._search_by_episode_async("2d", episode_number)
+        except Exception as e:
+            print(f"Error in search_by_episode_2d_async: {e}")
+            return _empty_result(SEARCH_TYPE_2D, episode_number)
+    
+    async def get_list_page_async(
+        self,
+        limit: int = 20,
+        after: Optional[Tuple] = None,
+        before: Optional[Tuple] = None
+    ) -> Dict[str, Any]:
+        """Async version of get_list_page, the three $in queries run concurrently"""
+        if await self._catalog_ready():
+            return self.get_list_page(limit, after, before)
+        
+        try:
+            mappings, has_more = _trim_page(
+                await self.async_mapping_repo.get_mappings_page(limit + 1, after, before, MAPPING_VIEW_FIELDS),
+                limit, before
+            )
+            episode_3d_numbers, episode_2d_numbers, chapter_numbers = _list_numbers(mappings)
+            
+            episodes_3d, episodes_2d, novels = await asyncio.gather(
+                self.async_episode_3d_repo.find_by_episode_numbers(episode_3d_numbers, 1, EPISODE_VIEW_FIELDS)
+                if episode_3d_numbers else noop([]),
+                self.async_episode_2d_repo.find_by_episode_numbers(episode_2d_numbers, 1, EPISODE_VIEW_FIELDS)
+                if episode_2d_numbers else noop([]),
+                self.async_novel_repo.find_by_chapter_numbers(chapter_numbers, 1, NOVEL_VIEW_FIELDS)
+                if chapter_numbers else noop([])
+            )
             
-            for mapping in mappings:
-                item = {
-                    "mapping": mapping,
-                    "episode_3d": None,
-                    "episode_2d": None,
-                    "novel": None
-                }
-                
-                # Fetch details
-                if mapping.episode_3d:
-                    item["episode_3d"] = self.episode_3d_repo.find_by_episode_number(mapping.episode_3d)
-                
-                if mapping.episode_2d:
-                    item["episode_2d"] = self.episode_2d_repo.find_by_episode_number(mapping.episode_2d)
-                
-                if mapping.novel_chapters:
-                    # Just get the first chapter for link purposes
-                    item["novel"] = self.novel_repo.find_by_chapter_number(mapping.novel_chapters[0])
-                    
-                result.append(item)
-                
-            return result
+            return {
+                "items": _build_list_items(mappings, episodes_3d, episodes_2d, novels),
+                "has_more": has_more
+            }
         except Exception as e:
-            print(f"Error getting full list: {e}")
-            return []
+            print(f"Error getting list page: {e}")
+            return {"items": [], "has_more": False}
+    
+    async def count_mappings_async(self) -> int:
+        """Async version of count_mappings"""
+        if await self._catalog_ready():
+            return self.count_mappings()
+        return await self.async_mapping_repo.estimated_count()
@@ -0,0 +1,107 @@
+"""
+Stats service
+Statistics for /stats and the admin dashboard from materialized counters
+"""
+import time
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from repositories.meta_repository import MetaRepository
+from repositories.novel_repository import NovelRepository
+from repositories.episode_repository import EpisodeRepository
+from repositories.mapping_repository import MappingRepository
+from repositories.contribution_repository import ContributionRepository, status_counter
+from repositories.user_repository import UserRepository
+from config.settings import settings
+from utils.async_utils import run_blocking
+from utils.constants import STATUS_PENDING, STATUS_APPROVED, STATUS_REJECTED
+
+
+def _activity_windows() -> Dict[str, datetime]:
+    """Start dates for the today / 7 days / 30 days activity counters"""
+    now = datetime.utcnow()
+    return {
+        "active_today": datetime(now.year, now.month, now.day),
+        "active_week": now - timedelta(days=7),
+        "active_month": now - timedelta(days=30)
+    }
+
+
+class StatsService:
+    """
+    Serves statistics from a short-TTL cache
+    
+    Collection totals come from the counters document in meta, kept current by
+    $inc on insert, approve, reject and delete. Writes that bypass the
+    repositories (import scripts) are healed by a periodic full recount.
+    A cache miss costs three round trips: the counters, one aggregation for the
+    activity windows and one for the leaderboard with EXP looked up from users.
+    """
+    
+    def __init__(self, ttl: int = 30, rebuild_interval: int = 3600):
+        self.ttl = ttl
+        self.rebuild_interval = rebuild_interval
+        self._cached: Optional[Dict[str, Any]] = None
+        self._cached_at = 0.0
+        self._lock = threading.Lock()
+    
+    def rebuild(self) -> Dict[str, int]:
+        """Recount every collection and store the counters"""
+        db_counts = {
+            "novels": NovelRepository().collection.estimated_document_count(),
+            "episodes_3d": EpisodeRepository("3d").collection.estimated_document_count(),
+            "episodes_2d": EpisodeRepository("2d").collection.estimated_document_count(),
+            "mappings": MappingRepository().collection.estimated_document_count(),
+            "users": UserRepository().collection.estimated_document_count()
+        }
+        by_status = ContributionRepository().count_all_by_status()
+        for status in (STATUS_PENDING, STATUS_APPROVED, STATUS_REJECTED):
+            db_counts[status_counter(status)] = by_status.get(status, 0)
+        
+        MetaRepository().set_stats(db_counts)
+        return db_counts
+    
+    def _counters(self) -> Dict[str, int]:
+        doc = MetaRepository().get_stats()
+        rebuilt_at = doc.get("rebuilt_at") if doc else None
+        if not rebuilt_at or datetime.utcnow() - rebuilt_at > timedelta(seconds=self.rebuild_interval):
+            return self.rebuild()
+        return doc.get("counters", {})
+    
+    def _compute(self) -> Dict[str, Any]:
+        counters = self._counters()
+        stats = {
+            "total_novels": counters.get("novels", 0),
+            "total_episodes_3d": counters.get("episodes_3d", 0),
+            "total_episodes_2d": counters.get("episodes_2d", 0),
+            "total_mappings": counters.get("mappings", 0),
+            "pending_contributions": counters.get(status_counter(STATUS_PENDING), 0),
+            "total_users": counters.get("users", 0)
+        }
+        stats.update(UserRepository().count_active_windows(_activity_windows()))
+        stats["top_contributors"] = ContributionRepository().get_top_contributors(5)
+        return stats
+    
+    def get(self) -> Dict[str, Any]:
+        """Get statistics, recomputed at most once per TTL (concurrent callers share it)"""
+        try:
+            with self._lock:
+                if self._cached is None or time.monotonic() - self._cached_at > self.ttl:
+                    self._cached = self._compute()
+                    self._cached_at = time.monotonic()
+                return self._cached
+        except Exception as e:
+            print(f"Error getting statistics: {e}")
+            return {}
+    
+    async def get_async(self) -> Dict[str, Any]:
+        """Async version of get"""
+        return await run_blocking(self.get)
+    
+    def invalidate(self):
+        """Drop the cached statistics after a local change"""
+        self._cached = None
+
+
+# Create singleton instance
+stats_service = StatsService(settings.STATS_CACHE_TTL, settings.STATS_REBUILD_INTERVAL)
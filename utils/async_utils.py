@@ -0,0 +1,23 @@
+"""
+Async helpers
+Run blocking (pymongo) calls without stalling the bot event loop
+"""
+import asyncio
+import functools
+import contextvars
+from typing import Any, Callable
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """
+    Run a blocking function in the default thread pool and await its result
+    The caller's context variables (e.g. per-update metrics) carry over to the thread
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(None, context.run, functools.partial(func, *args, **kwargs))
+
+
+async def noop(value: Any = None) -> Any:
+    """Awaitable placeholder for optional branches of asyncio.gather"""
+    return value
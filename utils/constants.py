@@ -13,6 +13,10 @@ STATUS_PENDING = "pending"
 STATUS_APPROVED = "approved"
 STATUS_REJECTED = "rejected"
 
+# Broadcast job statuses
+BROADCAST_STATUS_RUNNING = "running"
+BROADCAST_STATUS_COMPLETED = "completed"
+
 # Target types for link contributions
 TARGET_TYPE_NOVEL = "novel"
 TARGET_TYPE_EPISODE_3D = "episode_3d"
@@ -23,6 +27,10 @@ SEARCH_TYPE_CHAPTER = "chapter"
 SEARCH_TYPE_3D = "3d"
 SEARCH_TYPE_2D = "2d"
 
+# Search query modes
+SEARCH_QUERY_MODE_DEFAULT = "default"
+SEARCH_QUERY_MODE_AGGREGATE = "aggregate"
+
 # Emojis for better UX
 EMOJI_BOOK = "📖"
 EMOJI_FILM_3D = "🎬"
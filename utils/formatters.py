@@ -38,6 +38,14 @@ def format_novel_info(novel: Novel) -> str:
     return "\n".join(result)
 
 
+def format_inline_description(novel: Novel) -> str:
+    """One-line summary of a chapter's links for an inline result"""
+    if not novel.links:
+        return "Chưa tìm thấy ngọc giản"
+    sources = ", ".join(link.source_name for link in novel.links[:3])
+    return f"{len(novel.links)} ngọc giản: {sources}"
+
+
 def format_episode_3d_info(episode: Episode) -> str:
     """Format 3D episode information"""
     title = f" - {episode.title}" if episode.title else ""
@@ -172,6 +180,7 @@ def format_contribution_for_admin(contribution) -> str:
         "",
         f"**ID:** `{contribution._id}`",
         f"**Người gửi:** {contribution.username} (ID: {contribution.user_id})",
+        f"**Số người gửi:** {len(contribution.submitters)}",
         f"**Loại:** {contribution.contribution_type}",
         f"**Thời gian:** {contribution.submitted_at.strftime('%Y-%m-%d %H:%M:%S')}",
         "",
@@ -213,17 +222,23 @@ def format_contribution_for_admin(contribution) -> str:
     return "\n".join(result)
 
 
-def format_contribution_list(contributions: list) -> str:
-    """Format list of pending contributions"""
+def format_contribution_list(
+    contributions: list,
+    total: Optional[int] = None,
+    start: int = 1,
+    page: int = 0,
+    total_pages: int = 1
+) -> str:
+    """Format one page of pending contributions, numbered from `start`"""
     if not contributions:
         return f"{EMOJI_INFO} Không có đóng góp nào đang chờ duyệt"
     
-    result = [
-        f"{EMOJI_PENDING} **DANH SÁCH ĐÓNG GÓP CHỜ DUYỆT** ({len(contributions)})",
-        ""
-    ]
+    header = f"{EMOJI_PENDING} **DANH SÁCH ĐÓNG GÓP CHỜ DUYỆT** ({total if total is not None else len(contributions)})"
+    if total_pages > 1:
+        header += f"\n(Trang {page + 1}/{total_pages})"
+    result = [header, ""]
     
-    for i, contrib in enumerate(contributions, 1):
+    for i, contrib in enumerate(contributions, start):
         contrib_type_display = {
             CONTRIBUTION_TYPE_MAPPING: "Mapping",
             CONTRIBUTION_TYPE_NOVEL_LINK: "Link tiểu thuyết",
@@ -233,10 +248,130 @@ def format_contribution_list(contributions: list) -> str:
         
         result.append(f"**{i}.** `{contrib._id}`")
         result.append(f"   • Loại: {contrib_type_display}")
-        result.append(f"   • Người gửi: {contrib.username}")
+        others = len(contrib.submitters) - 1
+        result.append(f"   • Người gửi: {contrib.username}" + (f" (+{others} người gửi trùng)" if others > 0 else ""))
         result.append(f"   • Thời gian: {contrib.submitted_at.strftime('%Y-%m-%d %H:%M')}")
         result.append("")
     
     result.append("Sử dụng /review\\_<ID> để xem chi tiết")
     
     return "\n".join(result)
+
+
+def format_bulk_review_result(approved: bool, result: dict, limit: int = 10) -> str:
+    """Format the outcome of a bulk approve/reject for the admin"""
+    done = result.get("done", [])
+    skipped = result.get("skipped", [])
+    action = "Đã duyệt" if approved else "Đã từ chối"
+    
+    lines = [
+        f"{EMOJI_CHECK if approved else EMOJI_CROSS} **{action} {len(done)} đóng góp**",
+        f"Người gửi: {len({c.user_id for c in done})}"
+    ]
+    
+    if skipped:
+        lines.append("")
+        lines.append(f"{EMOJI_INFO} Bỏ qua {len(skipped)}:")
+        for contribution, reason in skipped[:limit]:
+            lines.append(f"  • `{contribution._id}` - {reason}")
+        if len(skipped) > limit:
+            lines.append(f"  • ... và {len(skipped) - limit} đóng góp khác")
+    
+    return "\n".join(lines)
+
+
+def format_review_notification(approved_count: int, rejected_count: int) -> str:
+    """One notice telling a contributor how a batch of their contributions was reviewed"""
+    lines = []
+    if approved_count:
+        lines.append(f"{EMOJI_CHECK} {approved_count} cống hiến của đạo hữu đã được chưởng môn phê duyệt!")
+    if rejected_count:
+        lines.append(f"{EMOJI_CROSS} {rejected_count} cống hiến của đạo hữu đã bị từ chối.")
+    
+    lines.append("")
+    if approved_count:
+        lines.append("Đa tạ đạo hữu đã cống hiến cho tông môn! 🎉")
+    else:
+        lines.append("Xin đạo hữu kiểm tra lại manh mối.")
+    
+    return "\n".join(lines)
+
+
+def format_broadcast_progress(job, rate: float) -> str:
+    """Format live progress / final result of a broadcast job"""
+    if job.status == BROADCAST_STATUS_COMPLETED:
+        header = f"{EMOJI_CHECK} **KẾT QUẢ GỬI THÔNG BÁO**"
+    else:
+        header = "⏳ **ĐANG GỬI THÔNG BÁO**"
+    
+    processed = job.processed_count
+    total = max(job.total, processed)
+    percent = processed / total * 100 if total else 100.0
+    
+    return "\n".join([
+        header,
+        "",
+        f"📊 Tiến độ: {processed}/{total} ({percent:.1f}%)",
+        f"✅ Thành công: {job.sent_count}",
+        f"❌ Thất bại: {job.failed_count}",
+        f"🚫 Đã chặn bot: {job.blocked_count}",
+        f"⚡ Tốc độ: {rate:.1f} tin/giây"
+    ])
+
+
+def format_statistics(stats: dict, cache_stats: dict) -> str:
+    """Format the admin statistics message (/stats and the dashboard button)"""
+    top_users = stats.get('top_contributors', [])
+    leaderboard_text = ""
+    if top_users:
+        leaderboard_text = "\n🏆 **TOP ĐÓNG GÓP:**\n"
+        for i, user in enumerate(top_users, 1):
+            leaderboard_text += f"{i}. {user.get('username', 'Unknown')} - {user.get('count', 0)} lần ({user.get('exp', 0)} EXP)\n"
+    
+    return f"""
+{EMOJI_ADMIN} **THỐNG KÊ HỆ THỐNG**
+
+📊 **Dữ liệu:**
+{EMOJI_BOOK} **Tiểu thuyết:** {stats.get('total_novels', 0)} chương
+{EMOJI_FILM_3D} **Phim 3D:** {stats.get('total_episodes_3d', 0)} tập
+{EMOJI_FILM_2D} **Phim 2D:** {stats.get('total_episodes_2d', 0)} tập
+{EMOJI_LINK} **Mappings:** {stats.get('total_mappings', 0)} liên kết
+{EMOJI_PENDING} **Đóng góp chờ duyệt:** {stats.get('pending_contributions', 0)}
+
+👥 **Người dùng:**
+• Tổng số: {stats.get('total_users', 0)}
+• Hôm nay: {stats.get('active_today', 0)}
+• 7 ngày qua: {stats.get('active_week', 0)}
+• 30 ngày qua: {stats.get('active_month', 0)}
+{leaderboard_text}
+⚡ **Cache tra cứu:** {cache_stats['size']}/{cache_stats['max_size']} • {cache_stats['hits']} hit / {cache_stats['misses']} miss ({cache_stats['hit_rate']:.1f}%)
+"""
+
+
+def format_metrics(snapshot: dict, limit: int = 10) -> str:
+    """Format handler and Mongo query metrics for the admin /metrics command"""
+    uptime_minutes = int(snapshot["uptime_seconds"] // 60)
+    lines = [f"📈 **HIỆU NĂNG** (uptime {uptime_minutes // 60}h{uptime_minutes % 60:02d}m)", ""]
+    
+    lines.append("⏱ **Handler** (p50 / p95 / p99 ms • lượt • Mongo ops/lượt):")
+    if not snapshot["handlers"]:
+        lines.append("Chưa có dữ liệu")
+    for h in snapshot["handlers"][:limit]:
+        errors = f" • ❌ {h['errors']}" if h["errors"] else ""
+        lines.append(
+            f"`{h['label']}` {h['p50_ms']:.0f} / {h['p95_ms']:.0f} / {h['p99_ms']:.0f} "
+            f"• {h['count']} • {h['ops_per_call']:.1f}{errors}"
+        )
+    
+    lines.append("")
+    lines.append("🗄 **Mongo** (tổng ms • lượt • avg / p95 ms):")
+    if not snapshot["queries"]:
+        lines.append("Chưa có dữ liệu")
+    for q in snapshot["queries"][:limit]:
+        failures = f" • ❌ {q['failures']}" if q["failures"] else ""
+        lines.append(
+            f"`{q['collection']}.{q['command']}` {q['avg_ms'] * q['count']:.0f} "
+            f"• {q['count']} • {q['avg_ms']:.1f} / {q['p95_ms']:.0f}{failures}"
+        )
+    
+    return "\n".join(lines)
@@ -0,0 +1,295 @@
+"""
+Instrumentation
+Handler latency histograms, Mongo command timings and a Prometheus text endpoint
+"""
+import time
+import bisect
+import functools
+import threading
+import contextvars
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo import monitoring
+from telegram.ext import ApplicationHandlerStop, CallbackQueryHandler, CommandHandler, ConversationHandler
+
+
+# Upper bounds in milliseconds, the last bucket is +Inf
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Mongo commands sent while the current update is being handled
+_update_ops: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar("update_ops", default=None)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (not thread-safe, guarded by MetricsRegistry)"""
+    
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+    
+    def observe(self, ms: float):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+    
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile, capped at the max seen"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return min(BUCKETS_MS[i], self.max_ms) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+    
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "avg_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": self.max_ms
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-wide metrics store
+    Handlers are observed on the event loop, Mongo commands from any thread
+    """
+    
+    def __init__(self):
+        self.started_at = time.time()
+        self.handlers: Dict[str, Histogram] = {}
+        self.handler_errors: Dict[str, int] = {}
+        self.handler_ops: Dict[str, int] = {}
+        self.queries: Dict[Tuple[str, str], Histogram] = {}
+        self.query_failures: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+    
+    def observe_handler(self, label: str, ms: float, ops: int, error: bool = False):
+        with self._lock:
+            self.handlers.setdefault(label, Histogram()).observe(ms)
+            self.handler_ops[label] = self.handler_ops.get(label, 0) + ops
+            if error:
+                self.handler_errors[label] = self.handler_errors.get(label, 0) + 1
+    
+    def observe_query(self, collection: str, command: str, ms: float, failed: bool = False):
+        key = (collection, command)
+        with self._lock:
+            self.queries.setdefault(key, Histogram()).observe(ms)
+            if failed:
+                self.query_failures[key] = self.query_failures.get(key, 0) + 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Summaries for the admin /metrics command"""
+        with self._lock:
+            handlers = []
+            for label, histogram in self.handlers.items():
+                summary = histogram.summary()
+                summary["label"] = label
+                summary["errors"] = self.handler_errors.get(label, 0)
+                summary["ops_per_call"] = self.handler_ops.get(label, 0) / histogram.count
+                handlers.append(summary)
+            
+            queries = []
+            for (collection, command), histogram in self.queries.items():
+                summary = histogram.summary()
+                summary["collection"] = collection
+                summary["command"] = command
+                summary["failures"] = self.query_failures.get((collection, command), 0)
+                queries.append(summary)
+        
+        handlers.sort(key=lambda h: h["p95_ms"], reverse=True)
+        queries.sort(key=lambda q: q["avg_ms"] * q["count"], reverse=True)
+        return {
+            "uptime_seconds": time.time() - self.started_at,
+            "handlers": handlers,
+            "queries": queries
+        }
+    
+    def prometheus_text(self) -> str:
+        """Prometheus text exposition format (durations in seconds)"""
+        lines = []
+        
+        def histogram_lines(name: str, labels: str, histogram: Histogram):
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS_MS + (None,), histogram.counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound is None else repr(bound / 1000)
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.total_ms / 1000}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        
+        with self._lock:
+            lines.append("# HELP bot_handler_duration_seconds Update handler latency")
+            lines.append("# TYPE bot_handler_duration_seconds histogram")
+            for label, histogram in self.handlers.items():
+                histogram_lines("bot_handler_duration_seconds", f'handler="{_escape(label)}"', histogram)
+            
+            lines.append("# HELP bot_handler_errors_total Update handlers that raised")
+            lines.append("# TYPE bot_handler_errors_total counter")
+            for label, errors in self.handler_errors.items():
+                lines.append(f'bot_handler_errors_total{{handler="{_escape(label)}"}} {errors}')
+            
+            lines.append("# HELP bot_handler_mongo_ops_total Mongo commands sent by update handlers")
+            lines.append("# TYPE bot_handler_mongo_ops_total counter")
+            for label, ops in self.handler_ops.items():
+                lines.append(f'bot_handler_mongo_ops_total{{handler="{_escape(label)}"}} {ops}')
+            
+            lines.append("# HELP bot_mongo_command_duration_seconds Mongo command latency")
+            lines.append("# TYPE bot_mongo_command_duration_seconds histogram")
+            for (collection, command), histogram in self.queries.items():
+                labels = f'collection="{_escape(collection)}",command="{_escape(command)}"'
+                histogram_lines("bot_mongo_command_duration_seconds", labels, histogram)
+            
+            lines.append("# HELP bot_mongo_command_failures_total Failed Mongo commands")
+            lines.append("# TYPE bot_mongo_command_failures_total counter")
+            for (collection, command), failures in self.query_failures.items():
+                labels = f'collection="{_escape(collection)}",command="{_escape(command)}"'
+                lines.append(f"bot_mongo_command_failures_total{{{labels}}} {failures}")
+        
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Times every command per (collection, command) and counts it against the current update"""
+    
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self._in_flight: Dict[Tuple[Any, int], Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+    
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        collection = target if isinstance(target, str) else "-"
+        
+        with self._lock:
+            self._in_flight[(event.connection_id, event.request_id)] = (collection, event.command_name)
+        
+        ops = _update_ops.get()
+        if ops is not None:
+            ops[0] += 1
+    
+    def _finish(self, event, failed: bool):
+        with self._lock:
+            key = self._in_flight.pop((event.connection_id, event.request_id), None)
+        if key is not None:
+            self.registry.observe_query(key[0], key[1], event.duration_micros / 1000, failed)
+    
+    def succeeded(self, event):
+        self._finish(event, False)
+    
+    def failed(self, event):
+        self._finish(event, True)
+
+
+def handler_label(handler) -> str:
+    """Metric label of a handler: its commands, callback pattern or type"""
+    if isinstance(handler, CommandHandler):
+        return "/" + "|".join(sorted(handler.commands))
+    if isinstance(handler, CallbackQueryHandler):
+        pattern = getattr(handler.pattern, "pattern", handler.pattern)
+        return f"callback:{pattern}" if pattern else "callback"
+    return f"{type(handler).__name__}:{handler.callback.__name__}"
+
+
+def instrument(callback, label: str, registry: "MetricsRegistry"):
+    """Wrap a handler callback to record its latency and Mongo commands"""
+    
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        ops = [0]
+        token = _update_ops.set(ops)
+        error = False
+        start = time.perf_counter()
+        try:
+            return await callback(update, context)
+        except ApplicationHandlerStop:
+            raise
+        except Exception:
+            error = True
+            raise
+        finally:
+            _update_ops.reset(token)
+            registry.observe_handler(label, (time.perf_counter() - start) * 1000, ops[0], error)
+    
+    wrapper._instrumented = True
+    return wrapper
+
+
+def instrument_handlers(application, registry: "MetricsRegistry" = None):
+    """Wrap every registered handler, including the ones inside conversations"""
+    registry = registry or metrics
+    
+    def visit(handler):
+        if isinstance(handler, ConversationHandler):
+            for inner in handler.entry_points + handler.fallbacks:
+                visit(inner)
+            for state_handlers in handler.states.values():
+                for inner in state_handlers:
+                    visit(inner)
+            return
+        if getattr(handler.callback, "_instrumented", False):
+            return
+        handler.callback = instrument(handler.callback, handler_label(handler), registry)
+    
+    for handlers in application.handlers.values():
+        for handler in handlers:
+            visit(handler)
+
+
+class MetricsServer:
+    """Embedded HTTP server exposing /metrics in Prometheus format"""
+    
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self, host: str, port: int):
+        registry = self.registry
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
+
+
+# Create singleton instances
+metrics = MetricsRegistry()
+mongo_listener = MongoCommandListener(metrics)
+metrics_server = MetricsServer(metrics)
@@ -0,0 +1,147 @@
+"""
+Rendered response cache
+Bounded LRU of fully rendered (text, keyboard) search responses
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+from config.settings import settings
+from utils.constants import (
+    SEARCH_TYPE_CHAPTER,
+    SEARCH_TYPE_3D,
+    SEARCH_TYPE_2D,
+    CONTRIBUTION_TYPE_MAPPING,
+    CONTRIBUTION_TYPE_NOVEL_LINK,
+    CONTRIBUTION_TYPE_EPISODE_3D_LINK,
+    CONTRIBUTION_TYPE_EPISODE_2D_LINK
+)
+
+
+Tag = Tuple[str, int]
+
+
+def result_cache_tags(result: Dict[str, Any]) -> Set[Tag]:
+    """Every chapter/episode shown in a search result (plus the searched key itself)"""
+    tags = {(result["search_type"], result["search_value"])}
+    tags.update((SEARCH_TYPE_CHAPTER, n.chapter_number) for n in result["novels"])
+    tags.update((SEARCH_TYPE_3D, e.episode_number) for e in result["episodes_3d"])
+    tags.update((SEARCH_TYPE_2D, e.episode_number) for e in result["episodes_2d"])
+    return tags
+
+
+def contribution_cache_tags(contribution) -> Set[Tag]:
+    """Chapters/episodes whose rendered responses an approved contribution changes"""
+    data = contribution.data
+    contribution_type = contribution.contribution_type
+    
+    if contribution_type == CONTRIBUTION_TYPE_MAPPING:
+        tags = {(SEARCH_TYPE_CHAPTER, n) for n in data.get("novel_chapters", [])}
+        if data.get("episode_3d"):
+            tags.add((SEARCH_TYPE_3D, data["episode_3d"]))
+        if data.get("episode_2d"):
+            tags.add((SEARCH_TYPE_2D, data["episode_2d"]))
+        return tags
+    
+    search_type = {
+        CONTRIBUTION_TYPE_NOVEL_LINK: SEARCH_TYPE_CHAPTER,
+        CONTRIBUTION_TYPE_EPISODE_3D_LINK: SEARCH_TYPE_3D,
+        CONTRIBUTION_TYPE_EPISODE_2D_LINK: SEARCH_TYPE_2D
+    }.get(contribution_type)
+    
+    if search_type and data.get("target_number"):
+        return {(search_type, data["target_number"])}
+    return set()
+
+
+class RenderCache:
+    """
+    LRU cache keyed by (search type, number) within one catalog version
+    
+    Entries remember which chapters/episodes they display, so an approved
+    contribution only evicts the responses it actually changes. A version
+    change made by another process clears the whole cache.
+    """
+    
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Set[Tag]]]" = OrderedDict()
+        self._by_tag: Dict[Tag, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+    
+    def _sync_version(self, version):
+        if version != self.version:
+            self._entries.clear()
+            self._by_tag.clear()
+            self.version = version
+    
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[1]:
+            keys = self._by_tag.get(tag)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+    
+    def get(self, key: Hashable, version) -> Optional[Any]:
+        """Get a rendered value, or None on miss"""
+        with self._lock:
+            self._sync_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key: Hashable, value: Any, tags: Iterable[Tag], version):
+        """Store a rendered value with the chapters/episodes it depends on"""
+        with self._lock:
+            self._sync_version(version)
+            self._remove(key)
+            
+            tags = set(tags)
+            self._entries[key] = (value, tags)
+            for tag in tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+    
+    def invalidate(self, tags: Iterable[Tag], version):
+        """
+        Evict entries that display any of the tags after a local change
+        The remaining entries stay valid under the new version
+        """
+        with self._lock:
+            for tag in set(tags):
+                for key in list(self._by_tag.get(tag, ())):
+                    self._remove(key)
+            self.version = version
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_tag.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the admin dashboard"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total * 100) if total else 0.0
+        }
+
+
+# Create singleton instance
+render_cache = RenderCache(settings.RENDER_CACHE_SIZE)
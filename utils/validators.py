@@ -2,7 +2,9 @@
 Input validation utilities
 """
 import validators
+import unicodedata
 from typing import Tuple, Optional
+from urllib.parse import urlsplit, urlunsplit
 
 
 def validate_chapter_number(chapter_str: str) -> Tuple[bool, Optional[int], str]:
@@ -154,3 +156,29 @@ def validate_title(title: str) -> Tuple[bool, str]:
         return False, "Tiêu đề quá dài, không được vượt quá 200 ký tự"
     
     return True, ""
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for duplicate detection: lowercase scheme and
+    host without "www." or the default port, no fragment, no trailing slash
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/")
+    
+    return urlunsplit((scheme, host, path, parts.query, ""))
+
+
+def fold_text(text: str) -> str:
+    """
+    Search form of Vietnamese text: lowercase, diacritics removed
+    ("Ly hương" -> "ly huong", "Đạo" -> "dao"), single spaces
+    """
+    decomposed = unicodedata.normalize("NFD", text.lower().replace("đ", "d"))
+    return " ".join("".join(ch for ch in decomposed if not unicodedata.combining(ch)).split())
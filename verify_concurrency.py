@@ -0,0 +1,170 @@
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from config.settings import settings
+from database.connection import db_connection
+from database.models import Episode, Link, User
+from repositories import NovelRepository, EpisodeRepository, UserRepository, ContributionRepository
+from services import ContributionService, stats_service
+
+WORKERS = 16
+TEST_CHAPTER = 20001
+TEST_CHAPTER_2 = 20002
+TEST_EPISODE = 20001
+TEST_USER = 999000001
+
+failures = []
+
+
+def check(ok: bool, message: str):
+    print(f"{'✅' if ok else '❌'} {message}")
+    if not ok:
+        failures.append(message)
+
+
+def run_parallel(fn, args_list):
+    """Run fn(*args) for every args tuple at the same moment, return the results"""
+    barrier = threading.Barrier(len(args_list))
+
+    def call(args):
+        barrier.wait()
+        return fn(*args)
+
+    with ThreadPoolExecutor(max_workers=len(args_list)) as pool:
+        return list(pool.map(call, args_list))
+
+
+def cleanup(db):
+    db.novels.delete_many({"chapter_number": {"$in": [TEST_CHAPTER, TEST_CHAPTER_2]}})
+    db.episodes_3d.delete_many({"episode_number": TEST_EPISODE})
+    db.mappings.delete_many({"episode_3d": TEST_EPISODE})
+    db.contributions.delete_many({"user_id": TEST_USER})
+    db.users.delete_many({"user_id": TEST_USER})
+
+
+def verify_concurrency():
+    print("🚀 Starting concurrency verification for repository writes...")
+
+    # Separate database: the checks bump the catalog version and recount the stats counters
+    if not settings.MONGODB_DATABASE.endswith("_test"):
+        settings.MONGODB_DATABASE += "_test"
+
+    # Connect to DB
+    try:
+        db_connection.connect()
+        print("✅ Connected to MongoDB")
+    except Exception as e:
+        print(f"❌ Failed to connect to MongoDB: {e}")
+        return False
+
+    db = db_connection.get_database()
+    cleanup(db)
+
+    novel_repo = NovelRepository()
+
+    # 1. Same link added to a missing chapter by every worker
+    print(f"\n🔗 {WORKERS} parallel add_link of one URL to new chapter {TEST_CHAPTER}...")
+    link = Link("Test", f"http://test.com/chap/{TEST_CHAPTER}")
+    results = run_parallel(novel_repo.add_link, [(TEST_CHAPTER, link)] * WORKERS)
+    docs = list(db.novels.find({"chapter_number": TEST_CHAPTER}))
+    check(len(docs) == 1, f"One chapter document (found {len(docs)})")
+    check(len(docs[0]["links"]) == 1 if docs else False, f"One link stored (found {len(docs[0]['links']) if docs else 0})")
+    check(results.count(True) == 1, f"Exactly one add_link reported the change ({results.count(True)})")
+
+    # 2. Different links to a missing chapter: all kept, still one document
+    print(f"\n🔗 {WORKERS} parallel add_link of different URLs to new chapter {TEST_CHAPTER_2}...")
+    args = [(TEST_CHAPTER_2, Link("Test", f"http://test.com/chap/{TEST_CHAPTER_2}/{i}")) for i in range(WORKERS)]
+    results = run_parallel(novel_repo.add_link, args)
+    docs = list(db.novels.find({"chapter_number": TEST_CHAPTER_2}))
+    check(len(docs) == 1, f"One chapter document (found {len(docs)})")
+    check(len(docs[0]["links"]) == WORKERS if docs else False, f"{WORKERS} links stored")
+    check(all(results), "Every add_link reported the change")
+
+    # 3. Same episode created by every worker
+    print(f"\n🎬 {WORKERS} parallel create of 3D episode {TEST_EPISODE}...")
+    episode_repo = EpisodeRepository("3d")
+    results = run_parallel(episode_repo.create, [(Episode(episode_number=TEST_EPISODE),) for _ in range(WORKERS)])
+    count = db.episodes_3d.count_documents({"episode_number": TEST_EPISODE})
+    check(count == 1, f"One episode document (found {count})")
+    check(len({str(episode._id) for episode in results if episode}) == 1, "Every create returned the same episode")
+
+    # 4. One contribution approved by every worker
+    print(f"\n👨‍💼 {WORKERS} parallel approvals of one link contribution...")
+    UserRepository().upsert_user(User(user_id=TEST_USER, username="concurrency_test"))
+    service = ContributionService()
+    success, message, contribution = service.submit_link_contribution(
+        TEST_USER, "concurrency_test", "episode_3d", TEST_EPISODE, "Test", "http://test.com/3d/approve"
+    )
+    check(success and contribution is not None, f"Contribution submitted ({message})")
+    if contribution:
+        results = run_parallel(service.approve_contribution, [(str(contribution._id), 1)] * WORKERS)
+        approvals = [ok for ok, _ in results].count(True)
+        episode = db.episodes_3d.find_one({"episode_number": TEST_EPISODE})
+        exp = db.users.find_one({"user_id": TEST_USER}).get("exp", 0)
+        check(approvals == 1, f"Exactly one approval succeeded ({approvals})")
+        check(len(episode.get("links", [])) == 1, f"One link stored (found {len(episode.get('links', []))})")
+        check(exp == 1, f"EXP awarded once (exp = {exp})")
+        check(ContributionRepository().find_by_id(str(contribution._id)).status == "approved", "Contribution is approved")
+
+    # 5. Different mappings for one new 3D episode approved at once: merged into one mapping
+    print(f"\n🗺️ {WORKERS} parallel approvals of mappings for new 3D episode {TEST_EPISODE}...")
+    contributions = []
+    for i in range(WORKERS):
+        success, message, contribution = service.submit_mapping_contribution(
+            TEST_USER, "concurrency_test", [TEST_CHAPTER + i], episode_3d=TEST_EPISODE
+        )
+        if contribution:
+            contributions.append(contribution)
+    check(len(contributions) == WORKERS, f"{WORKERS} mapping contributions submitted ({len(contributions)})")
+    if contributions:
+        exp_before = db.users.find_one({"user_id": TEST_USER}).get("exp", 0)
+        results = run_parallel(service.approve_contribution, [(str(c._id), 1) for c in contributions])
+        approvals = [ok for ok, _ in results].count(True)
+        count = db.mappings.count_documents({"episode_3d": TEST_EPISODE})
+        exp = db.users.find_one({"user_id": TEST_USER}).get("exp", 0)
+        check(approvals == len(contributions), f"Every approval succeeded ({approvals})")
+        check(count == 1, f"One mapping document (found {count})")
+        check(exp - exp_before == approvals, f"EXP awarded per approval (+{exp - exp_before})")
+
+    # 6. Approvals racing rejections: the link is stored only if an approval won
+    print(f"\n⚖️ {WORKERS} parallel approvals and rejections of link contributions...")
+    contribution_repo = ContributionRepository()
+    mismatches = 0
+    for i in range(WORKERS):
+        url = f"http://test.com/3d/race/{i}"
+        success, message, contribution = service.submit_link_contribution(
+            TEST_USER, "concurrency_test", "episode_3d", TEST_EPISODE, "Test", url
+        )
+        if not contribution:
+            mismatches += 1
+            continue
+        run_parallel(
+            lambda approve: service.approve_contribution(str(contribution._id), 1) if approve
+            else service.reject_contribution(str(contribution._id), 1),
+            [(True,), (False,)] * (WORKERS // 2)
+        )
+        status = contribution_repo.find_by_id(str(contribution._id)).status
+        stored = db.episodes_3d.count_documents({"episode_number": TEST_EPISODE, "links.url": url}) == 1
+        if stored != (status == "approved"):
+            mismatches += 1
+    check(mismatches == 0, f"Link stored exactly when the contribution ended approved ({mismatches} mismatches)")
+
+    # Cleanup
+    print("\n🧹 Cleaning up test data...")
+    cleanup(db)
+    stats_service.rebuild()
+    print("✅ Cleanup complete")
+
+    db_connection.close()
+
+    print(f"\n{'✅ All checks passed' if not failures else f'❌ {len(failures)} checks failed'}")
+    return not failures
+
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_concurrency() else 1)
@@ -0,0 +1,110 @@
+import sys
+import os
+import json
+import time
+import shutil
+import asyncio
+import tempfile
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from scripts.tiennghich import crawl_async
+
+# Listing pages served offline (fixtures/tiennghich/site, 3 chapters per page)
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "tiennghich")
+
+failures = []
+
+
+def check(ok: bool, message: str):
+    print(f"{'✅' if ok else '❌'} {message}")
+    if not ok:
+        failures.append(message)
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Static fixture pages with Last-Modified / If-Modified-Since support"""
+
+    responses = {}
+
+    def send_response(self, code, message=None):
+        QuietHandler.responses[self.path] = int(code)
+        super().send_response(code, message)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(site_dir):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=site_dir))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def crawl(base_url, output, cache_dir):
+    """One incremental crawl, returns the chapters written to output"""
+    QuietHandler.responses = {}
+    asyncio.run(crawl_async(base_url, output, concurrency=2, delay=0, cache_dir=cache_dir, full=False))
+    with open(output, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verify_crawler():
+    print("🚀 Starting offline verification for the async chapter crawler...")
+
+    work_dir = tempfile.mkdtemp(prefix="crawler_")
+    site_dir = os.path.join(work_dir, "site")
+    output = os.path.join(work_dir, "chapters.json")
+    cache_dir = os.path.join(work_dir, "cache")
+    shutil.copytree(os.path.join(FIXTURES, "site"), site_dir)
+    shutil.copy(os.path.join(FIXTURES, "existing.json"), output)
+
+    server = start_server(site_dir)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"✅ Serving fixture pages at {base_url}")
+
+    try:
+        # 1. Chapters 1-5 already known: page 1 only for the page count, then pages 2-3
+        print("\n📚 Incremental crawl merged into an existing file (chapters 1-5)...")
+        chapters = crawl(base_url, output, cache_dir)
+        numbers = [c["number"] for c in chapters]
+        check(numbers == list(range(1, 9)), f"Chapters 1-8 in order (found {numbers})")
+        check(chapters[0]["title"] == "Ly hương (bản sửa tay)", "Known chapter 1 kept from the existing file")
+        check(chapters[5]["title"] == "Lợi thế", "New chapter 6 parsed with its title")
+        check(QuietHandler.responses == {"/": 200, "/trang-2/": 200, "/trang-3/": 200},
+              f"Pages 1-3 fetched (responses: {QuietHandler.responses})")
+
+        # 2. Nothing changed: the server answers 304 and the cached bodies are reused
+        print("\n💾 Second crawl with nothing new...")
+        chapters = crawl(base_url, output, cache_dir)
+        check(len(chapters) == 8, f"Still 8 chapters (found {len(chapters)})")
+        check(QuietHandler.responses == {"/": 304, "/trang-3/": 304},
+              f"Page 1 and the last page answered 304 from the cache (responses: {QuietHandler.responses})")
+
+        # 3. Chapter 9 published on the last page
+        print("\n🆕 Crawl after chapter 9 is published...")
+        updated_page = os.path.join(site_dir, "trang-3", "index.html")
+        shutil.copy(os.path.join(FIXTURES, "updated", "trang-3", "index.html"), updated_page)
+        # Last-Modified has one-second resolution
+        later = time.time() + 10
+        os.utime(updated_page, (later, later))
+        chapters = crawl(base_url, output, cache_dir)
+        numbers = [c["number"] for c in chapters]
+        check(numbers == list(range(1, 10)), f"Chapters 1-9 in order (found {numbers})")
+        check(chapters[8]["title"] == "Hạ nhai", "New chapter 9 parsed with its title")
+        check(QuietHandler.responses == {"/": 304, "/trang-3/": 200},
+              f"Only the changed page downloaded again (responses: {QuietHandler.responses})")
+    finally:
+        server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"\n{'✅ All checks passed' if not failures else f'❌ {len(failures)} checks failed'}")
+    return not failures
+
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_crawler() else 1)
@@ -0,0 +1,46 @@
+import sys
+import os
+import json
+import tempfile
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from scripts.import_data import iter_json_array
+
+SAMPLES = [
+    [1, 23, 456],
+    [-12, 3.25, 1e10, 7890123],
+    ["a", "chương \"12\"", "", "xyz"],
+    [True, False, None, 10],
+    [{"number": 1, "title": "Ly hương", "url": "https://a.vn/1/"}, {"number": 22, "url": "https://a.vn/22"}],
+    [[1, 2], [], [345]],
+    []
+]
+
+
+def verify_json_stream():
+    print("🚀 Checking iter_json_array against json.load at every chunk size...")
+    failures = 0
+    
+    for sample in SAMPLES:
+        for text in (json.dumps(sample, ensure_ascii=False), json.dumps(sample, ensure_ascii=False, indent=2)):
+            with tempfile.NamedTemporaryFile("w", suffix=".json", encoding="utf-8", delete=False) as f:
+                f.write(text)
+                path = f.name
+            try:
+                for chunk_size in range(1, len(text) + 2):
+                    items = list(iter_json_array(path, chunk_size=chunk_size))
+                    if items != sample:
+                        failures += 1
+                        print(f"❌ {text!r} with chunk_size={chunk_size}: {items}")
+                        break
+            finally:
+                os.remove(path)
+    
+    print(f"\n{'✅ All samples decoded correctly' if not failures else f'❌ {failures} samples failed'}")
+    return not failures
+
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_json_stream() else 1)
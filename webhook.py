@@ -0,0 +1,193 @@
+"""
+Webhook mode
+Receives Telegram updates over HTTP and spreads them over worker processes
+
+Every update of a chat goes to the same worker (chat id modulo worker count),
+so per-user ordering and ConversationHandler state stay in one process.
+"""
+import json
+import queue
+import signal
+import asyncio
+import logging
+import threading
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from config.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Updates waiting per worker before the endpoint answers 503 (Telegram retries later)
+QUEUE_SIZE = 1000
+QUEUE_PUT_TIMEOUT = 5
+ALLOWED_UPDATES = ["message", "callback_query", "inline_query"]
+
+
+def update_chat_id(data: Dict[str, Any]) -> int:
+    """Chat an update belongs to, falling back to the sender or the update id"""
+    for key in ("message", "edited_message", "channel_post", "callback_query"):
+        payload = data.get(key)
+        if not payload:
+            continue
+        message = payload.get("message", payload) if key == "callback_query" else payload
+        chat = message.get("chat") or {}
+        if "id" in chat:
+            return chat["id"]
+        sender = payload.get("from") or {}
+        if "id" in sender:
+            return sender["id"]
+    return data.get("update_id", 0)
+
+
+def worker_for(data: Dict[str, Any], workers: int) -> int:
+    return update_chat_id(data) % workers
+
+
+def run_worker(index: int, updates: multiprocessing.Queue):
+    """Process entry point: one bot Application fed from the queue"""
+    # Ctrl+C reaches the whole process group, the dispatcher stops workers with a sentinel
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(
+        format=f'%(asctime)s - worker {index} - %(name)s - %(levelname)s - %(message)s',
+        level=logging.INFO
+    )
+    asyncio.run(_worker_loop(index, updates))
+
+
+async def _worker_loop(index: int, updates: multiprocessing.Queue):
+    from telegram import Update
+    from main import build_application
+    
+    application = build_application()
+    application.bot_data["worker_index"] = index
+    loop = asyncio.get_running_loop()
+    
+    async with application:
+        # post_init/post_shutdown are only called by run_polling/run_webhook
+        await application.post_init(application)
+        await application.start()
+        logger.info(f"✅ Worker {index} ready")
+        
+        while True:
+            data = await loop.run_in_executor(None, updates.get)
+            if data is None:
+                break
+            try:
+                await application.update_queue.put(Update.de_json(data, application.bot))
+            except Exception as e:
+                print(f"Error decoding update in worker {index}: {e}")
+        
+        await application.stop()
+    
+    # After __aexit__ ran shutdown() (persistence flush), as in run_polling:
+    # post_shutdown closes the database connection
+    await application.post_shutdown(application)
+
+
+class UpdateDispatcher:
+    """HTTP endpoint in the parent process, routes each update to its worker queue"""
+    
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.context = multiprocessing.get_context("spawn")
+        self.queues: List[multiprocessing.Queue] = []
+        self.processes: List[multiprocessing.Process] = []
+        self.server: Optional[ThreadingHTTPServer] = None
+    
+    def start_workers(self):
+        for index in range(self.workers):
+            updates = self.context.Queue(QUEUE_SIZE)
+            process = self.context.Process(target=run_worker, args=(index, updates), name=f"bot-worker-{index}")
+            process.start()
+            self.queues.append(updates)
+            self.processes.append(process)
+    
+    def dispatch(self, data: Dict[str, Any]) -> bool:
+        """Queue an update for its worker, False if that worker is backed up"""
+        try:
+            self.queues[worker_for(data, self.workers)].put(data, timeout=QUEUE_PUT_TIMEOUT)
+            return True
+        except queue.Full:
+            return False
+    
+    def serve(self, host: str, port: int, path: str, secret: Optional[str]):
+        dispatcher = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path.split("?", 1)[0] != path:
+                    self.send_error(404)
+                    return
+                if secret and self.headers.get("X-Telegram-Bot-Api-Secret-Token") != secret:
+                    self.send_error(403)
+                    return
+                
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    data = json.loads(self.rfile.read(length))
+                except ValueError:
+                    self.send_error(400)
+                    return
+                
+                if not isinstance(data, dict) or not dispatcher.dispatch(data):
+                    self.send_error(400 if not isinstance(data, dict) else 503)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.serve_forever()
+    
+    def stop(self):
+        if self.server:
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+    
+    def join(self):
+        """Let every worker drain its queue and shut down"""
+        for updates in self.queues:
+            updates.put(None)
+        for process in self.processes:
+            process.join()
+
+
+async def _set_webhook():
+    from telegram import Bot
+    
+    async with Bot(settings.TELEGRAM_BOT_TOKEN) as bot:
+        await bot.set_webhook(
+            url=settings.WEBHOOK_URL,
+            secret_token=settings.WEBHOOK_SECRET or None,
+            allowed_updates=ALLOWED_UPDATES,
+            max_connections=max(40, settings.WEBHOOK_WORKERS * 10)
+        )
+
+
+def run_webhook():
+    """Register the webhook (if WEBHOOK_URL is set), start workers and serve until interrupted"""
+    if settings.WEBHOOK_URL:
+        asyncio.run(_set_webhook())
+        logger.info(f"✅ Webhook set to {settings.WEBHOOK_URL}")
+    else:
+        logger.warning("⚠️  WEBHOOK_URL is empty, webhook not registered (local testing only)")
+    
+    dispatcher = UpdateDispatcher(settings.WEBHOOK_WORKERS)
+    dispatcher.start_workers()
+    signal.signal(signal.SIGTERM, lambda *_: dispatcher.stop())
+    
+    logger.info(
+        f"🚀 Listening on http://{settings.WEBHOOK_LISTEN}:{settings.WEBHOOK_PORT}{settings.WEBHOOK_PATH} "
+        f"with {settings.WEBHOOK_WORKERS} worker(s)"
+    )
+    try:
+        dispatcher.serve(settings.WEBHOOK_LISTEN, settings.WEBHOOK_PORT, settings.WEBHOOK_PATH, settings.WEBHOOK_SECRET)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info("🛑 Stopping workers...")
+        dispatcher.join()